@@ -4,14 +4,18 @@
 """
 
 import streamlit as st
-import pandas as pd
-import joblib
+import functools
+import io
 import os
-import matplotlib.pyplot as plt
-import numpy as np
+import time
 import warnings
-from pathlib import Path
-from datetime import datetime
+
+# الوحدات الثقيلة (pandas و numpy و sklearn) تُستورد داخل الصفحات التي تحتاجها فقط،
+# حتى لا تدفع كل إعادة تشغيل أو عملية جديدة كلفة استيرادها
+from model_backends import BACKENDS, available_backends, get_backend
+from local_fonts import SYSTEM_FONTS, font_links
+from model_cache import get_model_cache
+from perf_stats import DEFAULT_EXPORT_PATH, get_perf_registry, timed_stage
 
 warnings.filterwarnings('ignore')
 
@@ -41,13 +45,19 @@ class DesignConfig:
 # ============================================================================
 # 2. تطبيق CSS متكامل مع دعم RTL وتصميم متجاوب
 # ============================================================================
-def apply_comprehensive_css():
+def compact_html(html):
+    """حذف المسافات البادئة والأسطر الفارغة (تبقى الأسطر منفصلة حتى لا تتأثر تعليقات JavaScript)"""
+    return '\n'.join(line.strip() for line in html.splitlines() if line.strip())
+
+@functools.lru_cache(maxsize=None)
+def build_comprehensive_css():
+    """نص CSS الكامل؛ ثابت طوال عمر العملية فيُبنى مرة واحدة"""
     css = f"""
     <style>
     /* ========== إعدادات RTL الأساسية ========== */
     :root {{
         --rtl: true;
-        --font-primary: 'Tajawal', 'Cairo', sans-serif;
+        --font-primary: 'Tajawal', 'Cairo', {SYSTEM_FONTS};
     }}
     
     html, body, .stApp {{
@@ -266,13 +276,14 @@ def apply_comprehensive_css():
     }}
     </style>
     
-    <!-- تحميل خطوط اللغة العربية -->
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Tajawal:wght@300;400;500;600;700;800&family=Cairo:wght@400;600;700&display=swap" rel="stylesheet">
     """
     
-    st.markdown(css, unsafe_allow_html=True)
+    # خطوط اللغة العربية من الملفات المحلية، أو خطوط النظام إذا لم تُنزّل بعد
+    return compact_html(font_links() + css)
+
+@timed_stage('apply_comprehensive_css')
+def apply_comprehensive_css():
+    st.markdown(build_comprehensive_css(), unsafe_allow_html=True)
 
 # ============================================================================
 # 3. وظائف المساعدة
@@ -285,6 +296,10 @@ def setup_page_config():
         initial_sidebar_state="expanded"
     )
 
+def get_active_backend():
+    """واجهة النموذج المختارة في جلسة المستخدم الحالية"""
+    return get_backend(st.session_state.get('model_backend'))
+
 def build_gauge(score, color):
     """بناء مؤشر سرعة متحرك"""
     rotation = (score / 100) * 180
@@ -341,6 +356,50 @@ def build_gauge(score, color):
 # ============================================================================
 # 4. إنشاء القائمة الجانبية المتجاوبة
 # ============================================================================
+# كتل HTML الثابتة تُضغط مرة واحدة عند الاستيراد، وكل إعادة تشغيل ترسلها كما هي
+# JavaScript لإدارة القائمة في الجوال
+SIDEBAR_SCRIPT_HTML = compact_html("""
+    <script>
+    function closeSidebar() {
+        const sidebar = document.querySelector('section[data-testid="stSidebar"]');
+        if (window.innerWidth <= 768) {
+            sidebar.style.transform = 'translateX(100%)';
+            setTimeout(() => { sidebar.style.display = 'none'; }, 300);
+        }
+    }
+
+    function openSidebar() {
+        const sidebar = document.querySelector('section[data-testid="stSidebar"]');
+        sidebar.style.display = 'block';
+        setTimeout(() => { sidebar.style.transform = 'translateX(0)'; }, 10);
+    }
+
+    // زر لفتح القائمة في الجوال
+    if (window.innerWidth <= 768) {
+        const openBtn = document.createElement('button');
+        openBtn.innerHTML = '☰';
+        openBtn.style.cssText = `
+            position: fixed;
+            top: 15px;
+            right: 15px;
+            background: #006666;
+            color: white;
+            border: none;
+            border-radius: 50%;
+            width: 50px;
+            height: 50px;
+            font-size: 24px;
+            cursor: pointer;
+            z-index: 999998;
+            box-shadow: 0 4px 12px rgba(0,0,0,0.3);
+        `;
+        openBtn.onclick = openSidebar;
+        document.body.appendChild(openBtn);
+    }
+    </script>
+""")
+
+@timed_stage('create_sidebar')
 def create_sidebar():
     """إنشاء القائمة الجانبية مع دعم كامل للجوال"""
     
@@ -390,52 +449,14 @@ def create_sidebar():
         """, unsafe_allow_html=True)
         
         # JavaScript لإدارة القائمة في الجوال
-        st.markdown("""
-        <script>
-        function closeSidebar() {{
-            const sidebar = document.querySelector('section[data-testid="stSidebar"]');
-            if (window.innerWidth <= 768) {{
-                sidebar.style.transform = 'translateX(100%)';
-                setTimeout(() => {{ sidebar.style.display = 'none'; }}, 300);
-            }}
-        }}
-        
-        function openSidebar() {{
-            const sidebar = document.querySelector('section[data-testid="stSidebar"]');
-            sidebar.style.display = 'block';
-            setTimeout(() => {{ sidebar.style.transform = 'translateX(0)'; }}, 10);
-        }}
-        
-        // زر لفتح القائمة في الجوال
-        if (window.innerWidth <= 768) {{
-            const openBtn = document.createElement('button');
-            openBtn.innerHTML = '☰';
-            openBtn.style.cssText = `
-                position: fixed;
-                top: 15px;
-                right: 15px;
-                background: #006666;
-                color: white;
-                border: none;
-                border-radius: 50%;
-                width: 50px;
-                height: 50px;
-                font-size: 24px;
-                cursor: pointer;
-                z-index: 999998;
-                box-shadow: 0 4px 12px rgba(0,0,0,0.3);
-            `;
-            openBtn.onclick = openSidebar;
-            document.body.appendChild(openBtn);
-        }}
-        </script>
-        """, unsafe_allow_html=True)
+        st.markdown(SIDEBAR_SCRIPT_HTML, unsafe_allow_html=True)
     
     return page
 
 # ============================================================================
 # 5. الصفحات الرئيسية
 # ============================================================================
+@timed_stage('show_home_page')
 def show_home_page():
     """عرض الصفحة الرئيسية"""
     st.markdown("""
@@ -489,6 +510,7 @@ def show_home_page():
     </div>
     """, unsafe_allow_html=True)
 
+@timed_stage('show_prediction_page')
 def show_prediction_page():
     """صفحة التنبؤ"""
     st.markdown("""
@@ -498,6 +520,8 @@ def show_prediction_page():
     </div>
     """, unsafe_allow_html=True)
     
+    st.caption(f"🧠 النموذج المستخدم: {get_active_backend().label}")
+    
     # استخدام علامات التبويب
     tab1, tab2, tab3 = st.tabs(["📊 إدخال البيانات", "📈 النتائج", "📋 التوصيات"])
     
@@ -575,6 +599,15 @@ def show_prediction_page():
                 </div>
             </div>
             """, unsafe_allow_html=True)
+            
+            if result.get('interval_low') is not None:
+                st.info(f"📏 فترة التنبؤ عند مستوى ثقة {result['confidence']}%: "
+                        f"{result['interval_low']:.1f} – {result['interval_high']:.1f}")
+            elif 'confidence' in result:
+                st.caption("📏 فترة التنبؤ متاحة للنموذج الخطي بعد تدريبه من البيانات (الإعدادات ← تدريب النموذج)")
+            
+            if 'inputs' in result:
+                show_sensitivity_curves(*result['inputs'])
         else:
             st.info("⏳ أدخل البيانات واضغط على 'بدء التنبؤ' لرؤية النتائج")
     
@@ -590,10 +623,8 @@ def show_prediction_page():
                     
                     <h5>🎯 توصيات للتحسين:</h5>
                     <ul style="padding-right: 20px;">
-                        <li>زيادة ساعات الدراسة المنتظمة إلى {max(20, result['recommended_hours'])} ساعة أسبوعياً</li>
-                        <li>تحسين نسبة الحضور إلى 90% على الأقل</li>
+                        {recommendation_items(recommendation_plan(result))}
                         <li>التركيز على المواد التي تحتاج تحسين</li>
-                        <li>الاستفادة من {max(3, result['recommended_tutoring'])} جلسات دعم أسبوعياً</li>
                     </ul>
                 </div>
             </div>
@@ -603,6 +634,83 @@ def show_prediction_page():
     
     return hours_studied, attendance_rate, previous_scores, tutoring_sessions, predict_clicked
 
+# ميزانية بحث خطة التحسين عند عرض التوصيات (ثوانٍ)؛ تُحسب مرة واحدة لكل نتيجة
+PLAN_BUDGET = 0.2
+
+def recommendation_plan(result):
+    """
+    خطة goal_seeking للنتيجة الحالية، تُحسب عند أول عرض للتوصيات فقط وتُحفظ معها
+    (التنبؤ نفسه يبقى من الجدول المحسوب مسبقاً بلا عمل على النموذج)
+    """
+    if 'inputs' not in result:
+        return result
+    backend = get_active_backend()
+    if result.get('plan_backend') != backend.key:
+        try:
+            from prediction_core import plan_student
+
+            plan = plan_student(*result['inputs'], result['score'], backend=backend, budget=PLAN_BUDGET)
+        except Exception:
+            # التوصيات العامة تبقى معروضة إن تعذّر تحميل النموذج
+            plan = {'plan_status': None}
+        result.update(plan, plan_backend=backend.key)
+    return result
+
+def recommendation_items(result):
+    """عناصر قائمة التوصيات من خطة goal_seeking: أقل تغيير يبلغ المستوى التالي"""
+    status = result.get('plan_status')
+    if status is None or 'inputs' not in result:
+        return ""
+    hours, attendance, _, tutoring = result['inputs']
+    if status == 'top_band':
+        return (f"<li>الحفاظ على {hours:g} ساعة دراسة أسبوعياً ونسبة حضور {attendance:g}% "
+                f"للبقاء في المستوى الأعلى</li>")
+    if status == 'unreachable':
+        return (f"<li>زيادة ساعات الدراسة والحضور والدروس وحدها لا تكفي لبلوغ {result['target']:g} درجة؛ "
+                f"يحتاج الطالب إلى دعم مباشر في المواد</li>")
+    if status == 'out_of_budget':
+        return "<li>تعذّر حساب خطة التحسين في الوقت المحدد</li>"
+
+    items = []
+    if result['recommended_hours'] > hours:
+        items.append(f"<li>زيادة ساعات الدراسة من {hours:g} إلى {result['recommended_hours']:g} ساعة أسبوعياً</li>")
+    if result['recommended_attendance'] > attendance:
+        items.append(f"<li>رفع نسبة الحضور من {attendance:g}% إلى {result['recommended_attendance']:g}%</li>")
+    if result['recommended_tutoring'] > tutoring:
+        items.append(f"<li>زيادة جلسات الدعم من {tutoring:g} إلى {result['recommended_tutoring']:g} أسبوعياً</li>")
+    items.append(f"<li><strong>الدرجة المتوقعة بعد ذلك {result['expected_score']:g} "
+                 f"(حد المستوى التالي {result['target']:g})</strong></li>")
+    return "".join(items)
+
+# عناوين منحنيات "ماذا لو؟"
+CURVE_LABELS = {
+    'hours': "🕒 ساعات الدراسة",
+    'attendance': "📅 نسبة الحضور (%)",
+    'tutoring': "👨‍🏫 الدروس الخصوصية",
+    'peer': "👥 تأثير الأقران",
+}
+
+@timed_stage('sensitivity_curves')
+def show_sensitivity_curves(hours, attendance, prev_scores, tutoring):
+    """الدرجة المتوقعة عند تغيير كل خاصية وحدها (كل النقاط باستدعاء predict واحد)"""
+    import pandas as pd
+    from whatif import sensitivity_curves
+    
+    backend = get_active_backend()
+    curves = sensitivity_curves(backend, hours, attendance, prev_scores, tutoring)
+    current = {'hours': hours, 'attendance': attendance, 'tutoring': tutoring, 'peer': backend.default_peer}
+    
+    st.write("### 🔍 ماذا لو؟")
+    st.caption("الدرجة المتوقعة عند تغيير عامل واحد مع تثبيت بقية بيانات الطالب")
+    columns = st.columns(2)
+    for idx, (name, (values, scores)) in enumerate(curves.items()):
+        with columns[idx % 2]:
+            label = CURVE_LABELS[name]
+            st.line_chart(pd.DataFrame({'الدرجة المتوقعة': scores}, index=pd.Index(values, name=label)), height=200)
+            best = int(scores.argmax())
+            st.caption(f"{label}: الحالي {current[name]:g} — أعلى درجة {scores[best]:.1f} عند {values[best]:g}")
+
+@timed_stage('show_analysis_page')
 def show_analysis_page():
     """صفحة تحليل البيانات"""
     st.markdown("""
@@ -612,44 +720,268 @@ def show_analysis_page():
     </div>
     """, unsafe_allow_html=True)
     
-    uploaded_file = st.file_uploader("📁 اختر ملف CSV", type=['csv'], help="ارفع ملف CSV يحتوي على بيانات الطلاب")
+    uploaded_files = st.file_uploader(
+        "📁 اختر ملفات CSV (ملف لكل مدرسة)",
+        type=['csv'],
+        accept_multiple_files=True,
+        help="ارفع ملف CSV أو أكثر يحتوي على بيانات الطلاب"
+    )
+    
+    from dataset_store import get_dataset_store
+    from parallel_ingest import ingest_profiles, merge_profiles
+    from upload_cache import bytes_digest, get_upload_cache
+    store = get_dataset_store()
+    # كل ملف يُحلَّل مرة واحدة (بالتوازي في عمليات منفصلة)، والنتائج مخزّنة ببصمة المحتوى
+    cache = get_upload_cache()
+    
+    try:
+        # الملفات المرفوعة تُحفظ في مكتبة البيانات مرة واحدة بصيغة Arrow، والتحليل يتم على النسخ المحفوظة
+        uploads = {uploaded_digest(uploaded_file): uploaded_file for uploaded_file in uploaded_files or []}
+        ingest_profiles(store, [
+            (sha, uploaded_file.name, None if store.get(sha) else uploaded_file.getvalue())
+            for sha, uploaded_file in uploads.items()
+        ], cache)
+    except Exception as e:
+        st.error(f"❌ حدث خطأ في تحليل الملف: {str(e)}")
+        return
     
-    if uploaded_file is not None:
+    datasets = show_dataset_library(store, list(uploads))
+    
+    if datasets:
         try:
-            df = pd.read_csv(uploaded_file)
+            profiles = ingest_profiles(store, [(dataset.sha256, dataset.name, None) for dataset in datasets], cache)
+            
+            # عرض مدرسة واحدة أو جميع المدارس (إحصائيات مدمجة دون دمج البيانات الخام)
+            view = show_school_selector(datasets, profiles)
+            if view is None:
+                combined = bytes_digest(''.join(sorted(profiles)).encode())
+                profile = cache.get(combined, 'profile', lambda: merge_profiles(profiles.values()))
+                selected = datasets
+                title = f"{len(datasets)} ملفات"
+            else:
+                profile = profiles[view.sha256]
+                selected = [view]
+                title = view.name
+            describe = cache.get(bytes_digest(''.join(sorted(d.sha256 for d in selected)).encode()), 'describe',
+                                 profile.describe)
             
             # معلومات الملف
             st.markdown(f"""
             <div class="custom-card">
-                <h4>✅ تم تحميل الملف بنجاح</h4>
-                <p><strong>عدد الصفوف:</strong> {len(df):,}</p>
-                <p><strong>عدد الأعمدة:</strong> {len(df.columns)}</p>
-                <p><strong>الحقول:</strong> {', '.join(df.columns[:3])}{'...' if len(df.columns) > 3 else ''}</p>
+                <h4>✅ تم تحميل البيانات بنجاح: {title}</h4>
+                <p><strong>عدد الصفوف:</strong> {profile.rows:,}</p>
+                <p><strong>عدد الأعمدة:</strong> {len(profile.columns)}</p>
+                <p><strong>الحقول:</strong> {', '.join(profile.columns[:3])}{'...' if len(profile.columns) > 3 else ''}</p>
             </div>
             """, unsafe_allow_html=True)
             
             # علامات تبويب التحليل
-            tab1, tab2 = st.tabs(["📋 عرض البيانات", "📈 الإحصائيات"])
+            tab1, tab2, tab3 = st.tabs(["📋 عرض البيانات", "📈 الإحصائيات", "🎯 التنبؤ الجماعي"])
             
             with tab1:
-                st.dataframe(df.head(15), use_container_width=True)
+                st.dataframe(profile.head, use_container_width=True)
             
             with tab2:
                 st.write("### 📊 الإحصائيات الوصفية")
-                st.dataframe(df.describe(), use_container_width=True)
+                st.dataframe(describe, use_container_width=True)
                 
                 # إحصائيات إضافية
                 col1, col2, col3 = st.columns(3)
                 with col1:
-                    st.metric("القيم المفقودة", df.isnull().sum().sum())
+                    st.metric("القيم المفقودة", profile.missing_total)
                 with col2:
-                    st.metric("القيم المكررة", df.duplicated().sum())
+                    st.metric("القيم المكررة", profile.duplicate_count)
                 with col3:
-                    st.metric("المساحة", f"{df.memory_usage().sum() / 1024:.1f} KB")
+                    st.metric("المساحة", f"{profile.memory_usage / 1024:.1f} KB")
+                
+                if len(selected) == 1 and selected[0].memory_report:
+                    show_memory_report(selected[0].memory_report)
+            
+            with tab3:
+                show_batch_scoring(selected, profile.columns)
         
         except Exception as e:
             st.error(f"❌ حدث خطأ في تحليل الملف: {str(e)}")
 
+def show_school_selector(datasets, profiles):
+    """مقارنة المدارس واختيار العرض: None لجميع المدارس أو مجموعة بيانات واحدة"""
+    if len(datasets) == 1:
+        return datasets[0]
+    
+    import pandas as pd
+    
+    # مقارنة سريعة بين المدارس من الإحصائيات الجزئية لكل ملف
+    rows = []
+    for dataset in datasets:
+        profile = profiles[dataset.sha256]
+        row = {'المدرسة': dataset.name, 'الصفوف': profile.rows, 'القيم المفقودة': profile.missing_total}
+        row.update({f"متوسط {col}": round(stats.mean, 2) for col, stats in profile.numeric.items()})
+        rows.append(row)
+    st.write("### 🏫 مقارنة المدارس")
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    
+    by_sha = {dataset.sha256: dataset for dataset in datasets}
+    options = [None] + list(by_sha)
+    current = st.session_state.get('analysis_view')
+    st.session_state.analysis_view = st.selectbox(
+        "🔎 العرض",
+        options,
+        index=options.index(current) if current in options else 0,
+        format_func=lambda sha: "📊 جميع المدارس" if sha is None else f"🏫 {by_sha[sha].name}"
+    )
+    return by_sha.get(st.session_state.analysis_view)
+
+def show_memory_report(report):
+    """الذاكرة الفعلية لكل عمود قبل ضغط الأنواع وبعده"""
+    import pandas as pd
+    from dtype_compaction import report_totals
+    
+    totals = report_totals(report)
+    with st.expander(f"🗜️ ضغط أنواع البيانات: {totals['ratio']:.1f}× أصغر"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("قبل الضغط", f"{totals['bytes_before'] / 1024:.1f} KB")
+        with col2:
+            st.metric("بعد الضغط", f"{totals['bytes_after'] / 1024:.1f} KB")
+        with col3:
+            st.metric("نسبة التصغير", f"{totals['ratio']:.1f}×")
+        
+        table = pd.DataFrame(report).rename(columns={
+            'column': 'العمود',
+            'dtype_before': 'النوع قبل',
+            'dtype_after': 'النوع بعد',
+            'bytes_before': 'قبل (KB)',
+            'bytes_after': 'بعد (KB)',
+        })
+        table[['قبل (KB)', 'بعد (KB)']] = (table[['قبل (KB)', 'بعد (KB)']] / 1024).round(1)
+        st.dataframe(table, use_container_width=True, hide_index=True)
+
+def show_dataset_library(store, uploaded=()):
+    """مكتبة البيانات المحفوظة: اختيار ملف أو أكثر لتحليلها معاً أو حذفها"""
+    datasets = store.datasets()
+    if not datasets:
+        return []
+    
+    # الملفات المرفوعة للتو هي الاختيار الافتراضي
+    uploaded = sorted(uploaded)
+    if uploaded and st.session_state.get('library_uploaded') != uploaded:
+        st.session_state.library_uploaded = uploaded
+        st.session_state.library_selected = uploaded
+    
+    by_sha = {dataset.sha256: dataset for dataset in datasets}
+    selected = [sha for sha in st.session_state.get('library_selected', []) if sha in by_sha]
+    
+    with st.expander(f"📚 مكتبة البيانات ({len(datasets)})", expanded=not uploaded):
+        st.session_state.library_selected = st.multiselect(
+            "مجموعات البيانات",
+            list(by_sha),
+            default=selected,
+            format_func=lambda sha: (
+                f"{by_sha[sha].name} — {by_sha[sha].rows:,} صف — {by_sha[sha].nbytes / 1024 ** 2:.1f} MB — "
+                f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(by_sha[sha].created_at))}"
+            )
+        )
+        if st.session_state.library_selected and st.button("🗑️ حذف المحدد من المكتبة"):
+            for sha in st.session_state.library_selected:
+                store.delete(sha)
+            st.session_state.library_selected = []
+            st.rerun()
+    
+    return [by_sha[sha] for sha in st.session_state.library_selected]
+
+def uploaded_digest(uploaded_file):
+    """بصمة محتوى الملف المرفوع، تُحسب مرة واحدة لكل رفع (file_id) في الجلسة"""
+    from upload_cache import bytes_digest
+    
+    digests = st.session_state.setdefault('upload_digests', {})
+    if uploaded_file.file_id not in digests:
+        digests[uploaded_file.file_id] = bytes_digest(uploaded_file.getvalue())
+    return digests[uploaded_file.file_id]
+
+def show_batch_scoring(datasets, columns):
+    """التنبؤ بدرجات جميع الطلاب في مجموعات البيانات المختارة (استدعاء predict واحد لكل دفعة)"""
+    import itertools
+    import pandas as pd
+    from prediction_intervals import bootstrap_members
+    from scoring import FEATURE_COLUMNS, REQUIRED_COLUMNS, score_chunks
+    
+    missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing:
+        st.info(f"📋 للتنبؤ الجماعي يجب أن يحتوي الملف على الأعمدة: {', '.join(FEATURE_COLUMNS)}")
+        st.caption(f"الأعمدة المفقودة: {', '.join(missing)}")
+        return
+    
+    backend = get_active_backend()
+    st.caption(f"🧠 النموذج المستخدم: {backend.label}")
+    
+    default_peer = st.number_input(
+        "👥 قيمة تأثير الأقران الافتراضية",
+        min_value=0,
+        max_value=10,
+        value=backend.default_peer,
+        help="تُستخدم عند غياب عمود Peer_Influence أو عند وجود قيم مفقودة فيه"
+    )
+    with_plan = st.checkbox(
+        "🎯 إضافة خطة بلوغ المستوى التالي لكل طالب",
+        value=False,
+        help="أقل زيادة في الساعات والحضور والدروس لكل طالب؛ أبطأ بكثير مع نموذج SVR"
+    )
+    
+    if st.button("🚀 التنبؤ لجميع الطلاب", type="primary", use_container_width=True):
+        try:
+            model = backend.load()
+            members = bootstrap_members(backend)
+            confidence = st.session_state.get('confidence_level', 85)
+            start = time.perf_counter()
+            
+            output = io.StringIO()
+            preview = None
+            scored_count = 0
+            score_sum = 0.0
+            grade_counts = pd.Series(dtype=int)
+            frames = itertools.chain.from_iterable(dataset.iter_frames() for dataset in datasets)
+            for chunk in score_chunks(model, frames, default_peer, plan=with_plan,
+                                      members=members, confidence=confidence):
+                scores = chunk['Predicted_Score']
+                scored_count += int(scores.notna().sum())
+                score_sum += float(scores.sum())
+                grade_counts = grade_counts.add(chunk['Grade'].value_counts(), fill_value=0)
+                chunk = chunk.drop(columns=['Color'])
+                if preview is None:
+                    preview = chunk.head(15)
+                chunk.to_csv(output, index=False, header=output.tell() == 0)
+            
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            st.error(f"❌ خطأ في التنبؤ الجماعي: {str(e)}")
+            return
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("الطلاب المُقيّمون", f"{scored_count:,}")
+        with col2:
+            st.metric("متوسط الدرجة", f"{score_sum / scored_count:.1f}" if scored_count else "-")
+        with col3:
+            st.metric("زمن التنبؤ", f"{elapsed * 1000:.1f} ms")
+        
+        if members is not None:
+            st.caption(f"📏 العمودان Interval_Low و Interval_High: فترة التنبؤ عند مستوى ثقة {confidence}%")
+        
+        st.write("### 📊 توزيع التقييمات")
+        st.bar_chart(grade_counts.astype(int))
+        
+        st.dataframe(preview, use_container_width=True)
+        st.download_button(
+            "⬇️ تحميل النتائج (CSV)",
+            output.getvalue().encode('utf-8-sig'),
+            file_name="predictions.csv",
+            mime="text/csv"
+        )
+
+# عدد الصور المصغّرة في كل صفحة من التقارير
+REPORT_PAGE_SIZE = 9
+
+@timed_stage('show_reports_page')
 def show_reports_page():
     """صفحة التقارير"""
     st.markdown("""
@@ -659,29 +991,48 @@ def show_reports_page():
     </div>
     """, unsafe_allow_html=True)
     
-    # التحقق من وجود مجلد الصور
-    if os.path.exists("images") and os.listdir("images"):
-        image_files = [
-            f for f in os.listdir("images") 
-            if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif'))
-        ]
+    # الصور تُقرأ من images.zip مباشرة دون فك الضغط
+    from report_images import get_image_archive
+    
+    archive = get_image_archive()
+    images = archive.images()
+    
+    if images:
+        st.write(f"### 📸 عدد الصور المتاحة: {len(images)}")
         
-        if image_files:
-            st.write(f"### 📸 عدد الصور المتاحة: {len(image_files)}")
-            
-            # عرض الصور في شبكة متجاوبة
-            cols = st.columns(3)
-            for idx, img_file in enumerate(image_files[:9]):
-                with cols[idx % 3]:
-                    img_path = os.path.join("images", img_file)
-                    try:
-                        st.image(img_path, caption=img_file, use_column_width=True)
-                    except Exception as e:
-                        st.error(f"❌ تعذر تحميل الصورة: {img_file}")
-        else:
-            st.info("📭 لا توجد صور متاحة في مجلد الصور")
+        # الصورة المفتوحة تُعرض بدقتها الكاملة
+        opened = next((image for image in images if image.name == st.session_state.get('report_image_open')), None)
+        if opened is not None:
+            st.image(archive.read(opened), caption=opened.caption, use_container_width=True)
+            if st.button("✖️ إغلاق الصورة"):
+                st.session_state.report_image_open = None
+                st.rerun()
+        
+        # ترقيم الصفحات (رقم الصفحة في مفتاح عادي حتى يبقى عند التنقل بين الصفحات)
+        page_images, page_count = archive.page(st.session_state.get('report_page', 1), REPORT_PAGE_SIZE)
+        if page_count > 1:
+            st.session_state.report_page = st.selectbox(
+                "📄 الصفحة",
+                range(1, page_count + 1),
+                index=min(st.session_state.get('report_page', 1), page_count) - 1,
+                format_func=lambda number: f"{number} / {page_count}"
+            )
+            page_images, _ = archive.page(st.session_state.report_page, REPORT_PAGE_SIZE)
+        
+        # عرض الصور المصغّرة في شبكة متجاوبة
+        cols = st.columns(3)
+        for idx, image in enumerate(page_images):
+            with cols[idx % 3]:
+                try:
+                    st.image(archive.thumbnail(image), caption=image.caption, use_container_width=True)
+                except Exception:
+                    st.error(f"❌ تعذر تحميل الصورة: {image.name}")
+                    continue
+                if st.button("🔍 عرض بالحجم الكامل", key=f"open_{image.name}", use_container_width=True):
+                    st.session_state.report_image_open = image.name
+                    st.rerun()
     else:
-        st.info("📁 مجلد الصور غير موجود. سيتم استخدام تقارير افتراضية.")
+        st.info("📁 أرشيف الصور غير موجود. سيتم استخدام تقارير افتراضية.")
         
         # عرض تقارير افتراضية
         st.markdown("""
@@ -691,6 +1042,7 @@ def show_reports_page():
         </div>
         """, unsafe_allow_html=True)
 
+@timed_stage('show_settings_page')
 def show_settings_page():
     """صفحة الإعدادات"""
     st.markdown("""
@@ -705,18 +1057,37 @@ def show_settings_page():
         col1, col2 = st.columns(2)
         
         with col1:
+            backend_keys = available_backends()
+            active_key = get_active_backend().key
             model_type = st.selectbox(
                 "نوع النموذج",
-                ["انحدار خطي", "شجرة قرار", "غابة عشوائية", "شبكة عصبية"],
-                index=0
+                backend_keys,
+                index=backend_keys.index(active_key) if active_key in backend_keys else 0,
+                format_func=lambda key: BACKENDS[key].label,
+                help="يُحمّل النموذج عند أول استخدام فقط"
             )
+            # حفظ الاختيار في الجلسة (تبقى قيمته بعد مغادرة صفحة الإعدادات)
+            st.session_state.model_backend = model_type
+            
+            use_lattice = st.checkbox(
+                "⚡ استخدام جدول التنبؤ المحسوب مسبقاً",
+                value=st.session_state.get('use_lattice', True),
+                help="يُحسب سطح الاستجابة لقيم المنزلقات مرة واحدة في الخلفية ويُعاد بناؤه عند تغيّر ملف النموذج، "
+                     "ولا يُستخدم إلا إذا طابق تنبؤات النموذج ضمن 0.005 درجة"
+            )
+            st.session_state.use_lattice = use_lattice
+            from prediction_lattice import get_lattice_store
+            if use_lattice and get_lattice_store().is_building(get_backend(model_type)):
+                st.caption("⏳ جاري بناء جدول التنبؤ في الخلفية...")
             
             confidence_level = st.slider(
                 "مستوى الثقة (%)",
                 min_value=50,
                 max_value=99,
-                value=85
+                value=st.session_state.get('confidence_level', 85),
+                help="مستوى فترة التنبؤ حول الدرجة المتوقعة (من مجموعة bootstrap للنموذج الخطي)"
             )
+            st.session_state.confidence_level = confidence_level
         
         with col2:
             auto_update = st.checkbox("التحديث التلقائي للنموذج", value=True)
@@ -725,6 +1096,14 @@ def show_settings_page():
         if st.button("💾 حفظ إعدادات النموذج"):
             st.success("✅ تم حفظ الإعدادات بنجاح!")
     
+    # تدريب النماذج من البيانات المرفوعة
+    with st.expander("🧠 تدريب النموذج من البيانات"):
+        show_training_panel()
+    
+    # إصدارات النماذج والرجوع إلى إصدار سابق
+    with st.expander("🗂️ إصدارات النماذج"):
+        show_model_versions()
+    
     # إعدادات الواجهة
     with st.expander("🎨 إعدادات الواجهة"):
         theme = st.selectbox(
@@ -747,55 +1126,196 @@ def show_settings_page():
         
         if st.button("💾 حفظ إعدادات الواجهة"):
             st.success("✅ تم حفظ إعدادات الواجهة!")
+    
+    # إحصائيات ذاكرة النماذج
+    with st.expander("📦 ذاكرة النماذج"):
+        stats = get_model_cache().stats()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("مرات الاستخدام من الذاكرة", stats['hits'])
+        with col2:
+            st.metric("مرات التحميل من القرص", stats['misses'])
+        with col3:
+            st.metric("النماذج المُخرجة", stats['evictions'])
+        with col4:
+            st.metric("زمن التحميل الكلي", f"{stats['total_load_seconds'] * 1000:.1f} ms")
+        
+        for path, info in stats['models'].items():
+            st.caption(f"{os.path.basename(path)} — {info['load_seconds'] * 1000:.1f} ms — {info['sha256'][:12]}")
+    
+    # إحصائيات ذاكرة الملفات المرفوعة
+    with st.expander("🗃️ ذاكرة الملفات المرفوعة"):
+        from upload_cache import get_upload_cache
+        
+        stats = get_upload_cache().stats()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("مرات الاستخدام من الذاكرة", stats['hits'])
+        with col2:
+            st.metric("مرات التحليل", stats['misses'])
+        with col3:
+            st.metric("النتائج المُخرجة", stats['evictions'])
+        with col4:
+            st.metric("الحجم المستخدم", f"{stats['current_bytes'] / 1024 ** 2:.1f} / {stats['max_bytes'] / 1024 ** 2:.0f} MB")
+    
+    # قسم التشخيص المخفي: يظهر فقط عند فتح الرابط مع ?diag=1
+    if st.query_params.get('diag') == '1':
+        show_diagnostics()
+
+def show_training_panel():
+    """بدء تدريب نموذج على مجموعات البيانات المحفوظة ومتابعته دون إيقاف الواجهة"""
+    from dataset_store import get_dataset_store
+    from model_training import TARGET_COLUMN
+    
+    datasets = [dataset for dataset in get_dataset_store().datasets() if TARGET_COLUMN in dataset.columns]
+    if not datasets:
+        st.caption(f"ارفع ملف بيانات يحتوي على عمود {TARGET_COLUMN} من صفحة تحليل البيانات لتدريب النموذج عليه")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        key = st.selectbox("النموذج", list(BACKENDS), format_func=lambda key: BACKENDS[key].label,
+                           key='training_backend')
+    with col2:
+        by_sha = {dataset.sha256: dataset for dataset in datasets}
+        selected = st.multiselect("بيانات التدريب", list(by_sha), default=[datasets[0].sha256],
+                                  format_func=lambda sha: f"{by_sha[sha].name} — {by_sha[sha].rows:,} صف",
+                                  key='training_datasets')
+    
+    from model_training import get_training_manager
+    manager = get_training_manager()
+    if st.button("🚀 بدء التدريب", disabled=not selected or manager.is_training(key)):
+        chosen = [by_sha[sha] for sha in selected]
+        manager.start(key, chosen, label=", ".join(dataset.name for dataset in chosen))
+    
+    # تحديث حالة التدريب كل ثانية أثناء التشغيل فقط (إعادة تشغيل هذا الجزء وحده)
+    job = manager.job(key)
+    st.fragment(show_training_status, run_every=1.0 if job is not None and job.running else None)(key)
+
+def show_training_status(key):
+    """تقدم مهمة التدريب الحالية ونتيجتها"""
+    from model_training import get_training_manager
+    
+    manager = get_training_manager()
+    job = manager.job(key)
+    if job is None:
+        return
+    
+    if job.running:
+        st.progress(job.progress, text=f"⏳ {job.message} — {job.label}")
+        if st.button("⏹️ إلغاء التدريب", key='training_cancel'):
+            manager.cancel(key)
+    elif job.state == 'done':
+        st.success(f"✅ {job.message}: {job.label} — نُشر الإصدار {job.version or 'الحالي'}")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("R²", f"{job.metrics['r2']:.3f}")
+        with col2:
+            st.metric("MAE", f"{job.metrics['mae']:.2f}")
+        with col3:
+            st.metric("زمن التدريب", f"{job.metrics['seconds']:.1f} s")
+        with col4:
+            # نسبة درجات التقييم داخل فترة 85% (النموذج الخطي فقط)
+            coverage = job.metrics.get('coverage')
+            st.metric("تغطية فترة 85%", f"{coverage:.0%}" if coverage is not None else "-")
+    elif job.state == 'failed':
+        st.error(f"❌ {job.message}: {job.error}")
+    else:
+        st.warning(f"⏹️ {job.message}")
+
+def show_model_versions():
+    """الإصدارات المنشورة لكل نموذج مع تفعيل أي إصدار سابق"""
+    from model_registry import get_model_registry
+    
+    registry = get_model_registry()
+    for key, backend in BACKENDS.items():
+        versions = registry.versions(key)
+        if not versions:
+            continue
+        current = registry.current(key)
+        st.write(f"**{backend.label}**")
+        rows = []
+        for version in reversed(versions):
+            meta = registry.metadata(key, version)
+            metrics = meta.get('metrics') or {}
+            rows.append({
+                'الإصدار': f"{version} ✅" if version == current else version,
+                'التاريخ': time.strftime('%Y-%m-%d %H:%M', time.localtime(meta.get('created_at', 0))),
+                'المصدر': meta.get('source', ''),
+                'MAE': round(metrics['mae'], 3) if metrics.get('mae') is not None else None,
+                'تغطية 85%': f"{metrics['coverage']:.0%}" if metrics.get('coverage') is not None else None,
+            })
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+        
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            chosen = st.selectbox("الإصدار", list(reversed(versions)), key=f'registry_version_{key}',
+                                  label_visibility='collapsed')
+        with col2:
+            if st.button("↩️ تفعيل", key=f'registry_activate_{key}', disabled=chosen == current):
+                registry.activate(key, chosen)
+                st.rerun()
+
+def show_diagnostics():
+    """زمن مراحل إعادة التشغيل (p50/p95/p99) وتصديرها بصيغة Prometheus"""
+    import pandas as pd
+    
+    registry = get_perf_registry()
+    with st.expander("🩺 التشخيص: زمن مراحل إعادة التشغيل", expanded=True):
+        snapshot = registry.snapshot()
+        if not snapshot:
+            st.info("📭 لا توجد قياسات بعد")
+            return
+        
+        st.dataframe(pd.DataFrame.from_dict(snapshot, orient='index').round(2), use_container_width=True)
+        
+        stage = st.selectbox("المرحلة", list(snapshot))
+        st.bar_chart(pd.Series(registry.window_histogram(stage)))
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.download_button(
+                "⬇️ تصدير Prometheus",
+                registry.to_prometheus(),
+                file_name="metrics.prom",
+                mime="text/plain"
+            )
+        with col2:
+            if st.button("💾 كتابة ملف المقاييس"):
+                path = registry.write_prometheus(os.environ.get('PERF_STATS_EXPORT', DEFAULT_EXPORT_PATH))
+                st.success(f"✅ تم الحفظ في {path}")
+        with col3:
+            if st.button("🔄 تصفير القياسات"):
+                registry.reset()
 
 # ============================================================================
 # 6. دالة التنبؤ الرئيسية
 # ============================================================================
+@timed_stage('predict_score')
 def predict_score(hours, attendance, prev_scores, tutoring):
     """دالة التنبؤ بالدرجة"""
     try:
-        # تحميل النموذج
-        model = joblib.load('regression_model.pkl')
-        
-        # إعداد البيانات (قيمة افتراضية لتأثير الأقران = 3)
-        input_data = [[hours, attendance, prev_scores, tutoring, 3]]
-        score = round(model.predict(input_data)[0], 2)
-        score = max(0, min(100, score))
+        from prediction_core import predict_student
         
-        # تحديد التصنيف والتوصيات
-        if score >= 90:
-            color = DesignConfig.COLORS['success']
-            feedback = "أداء استثنائي - مستوى متميز"
-            grade = "ممتاز"
-            recommended_hours = hours
-            recommended_tutoring = tutoring
-        elif score >= 75:
-            color = DesignConfig.COLORS['info']
-            feedback = "أداء جيد جداً - يواصل التقدم"
-            grade = "جيد جداً"
-            recommended_hours = max(hours + 2, 25)
-            recommended_tutoring = max(tutoring + 1, 3)
-        elif score >= 60:
-            color = DesignConfig.COLORS['warning']
-            feedback = "أداء مقبول - يحتاج إلى تحسين"
-            grade = "مقبول"
-            recommended_hours = max(hours + 5, 25)
-            recommended_tutoring = max(tutoring + 2, 4)
-        else:
-            color = DesignConfig.COLORS['danger']
-            feedback = "أداء ضعيف - يحتاج إلى دعم مكثف"
-            grade = "ضعيف"
-            recommended_hours = max(hours + 10, 30)
-            recommended_tutoring = max(tutoring + 3, 5)
+        result = predict_student(
+            hours, attendance, prev_scores, tutoring,
+            backend=get_active_backend(),
+            use_lattice=st.session_state.get('use_lattice', True),
+            confidence=st.session_state.get('confidence_level', 85)
+        )
         
         # حفظ النتيجة في session state
         st.session_state.prediction_result = {
-            'score': score,
-            'color': color,
-            'feedback': feedback,
-            'grade': grade,
-            'recommended_hours': recommended_hours,
-            'recommended_tutoring': recommended_tutoring
+            'score': result['score'],
+            'color': DesignConfig.COLORS[result['color_key']],
+            'feedback': result['feedback'],
+            'grade': result['grade'],
+            # فترة التنبؤ عند مستوى الثقة المختار (None بدون مجموعة bootstrap)
+            'confidence': result['confidence'],
+            'interval_low': result['interval_low'],
+            'interval_high': result['interval_high'],
+            # المدخلات التي حُسبت منها النتيجة (لمنحنيات "ماذا لو؟")
+            'inputs': (hours, attendance, prev_scores, tutoring)
         }
         
         return True
@@ -807,18 +1327,8 @@ def predict_score(hours, attendance, prev_scores, tutoring):
 # ============================================================================
 # 7. التطبيق الرئيسي
 # ============================================================================
-def main():
-    """الدالة الرئيسية للتطبيق"""
-    
-    # إعداد الصفحة
-    setup_page_config()
-    apply_comprehensive_css()
-    
-    # إنشاء القائمة الجانبية
-    page = create_sidebar()
-    
-    # الهيدر الرئيسي
-    st.markdown("""
+# الهيدر الرئيسي
+HEADER_HTML = compact_html("""
     <div style="background: linear-gradient(135deg, #004d4d 0%, #006666 100%); 
          padding: 3rem 2rem; border-radius: 1rem; margin-bottom: 2rem; text-align: center;">
         <h1 style="color: white; margin: 0; font-size: 2.8rem;">🎓 نظام التنبؤ الذكي بأداء الطلاب</h1>
@@ -826,45 +1336,10 @@ def main():
         حل متكامل باستخدام الذكاء الاصطناعي للتنبؤ الأكاديمي وتحليل البيانات التعليمية
         </p>
     </div>
-    """, unsafe_allow_html=True)
-    
-    # شريط العلامات
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.markdown('<div style="background: rgba(0,102,102,0.1); padding: 10px; border-radius: 8px; text-align: center;"><span style="color: #006666; font-weight: bold;">🎯 تنبؤ دقيق</span></div>', unsafe_allow_html=True)
-    with col2:
-        st.markdown('<div style="background: rgba(212,175,55,0.1); padding: 10px; border-radius: 8px; text-align: center;"><span style="color: #D4AF37; font-weight: bold;">📊 تحليل متقدم</span></div>', unsafe_allow_html=True)
-    with col3:
-        st.markdown('<div style="background: rgba(0,102,102,0.1); padding: 10px; border-radius: 8px; text-align: center;"><span style="color: #006666; font-weight: bold;">📈 تقارير تفاعلية</span></div>', unsafe_allow_html=True)
-    with col4:
-        st.markdown('<div style="background: rgba(212,175,55,0.1); padding: 10px; border-radius: 8px; text-align: center;"><span style="color: #D4AF37; font-weight: bold;">⚡ نتائج فورية</span></div>', unsafe_allow_html=True)
-    
-    # عرض الصفحة المختارة
-    if page == "🏠 الصفحة الرئيسية":
-        show_home_page()
-    
-    elif page == "🎯 أداة التنبؤ":
-        hours, attendance, prev_scores, tutoring, predict_clicked = show_prediction_page()
-        
-        if predict_clicked:
-            with st.spinner("🔍 جاري تحليل البيانات والتنبؤ بالنتيجة..."):
-                success = predict_score(hours, attendance, prev_scores, tutoring)
-                if success:
-                    st.success("✅ تم إكمال عملية التنبؤ بنجاح!")
-                    st.balloons()
-                    st.rerun()
-    
-    elif page == "📊 تحليل البيانات":
-        show_analysis_page()
-    
-    elif page == "📈 التقارير":
-        show_reports_page()
-    
-    elif page == "⚙️ الإعدادات":
-        show_settings_page()
-    
-    # الفوتر
-    st.markdown("""
+""")
+
+# الفوتر
+FOOTER_HTML = compact_html("""
     <div class="footer">
         <div class="responsive-grid" style="text-align: right; padding: 20px 0;">
             <div>
@@ -890,10 +1365,10 @@ def main():
         © 2024 نظام التنبؤ الذكي بأداء الطلاب. جميع الحقوق محفوظة. | الإصدار 4.0 | تم التطوير باستخدام Streamlit
         </p>
     </div>
-    """, unsafe_allow_html=True)
-    
-    # إضافة تحسينات إضافية للجوال
-    st.markdown("""
+""")
+
+# تحسينات الجوال (JavaScript)
+MOBILE_SCRIPT_HTML = compact_html("""
     <script>
     // تحسين تجربة الجوال
     if (window.innerWidth <= 768) {
@@ -913,7 +1388,7 @@ def main():
             justify-content: center;
             align-items: center;
             z-index: 1000000;
-            font-family: 'Tajawal', sans-serif;
+            font-family: 'Tajawal', 'Segoe UI', Tahoma, 'Noto Sans Arabic', sans-serif;
         `;
         loader.innerHTML = `
             <div style="text-align: center; padding: 20px;">
@@ -923,7 +1398,7 @@ def main():
             </div>
         `;
         document.body.appendChild(loader);
-        
+
         // إخفاء الشاشة بعد التحميل
         window.addEventListener('load', function() {
             setTimeout(() => {
@@ -933,11 +1408,11 @@ def main():
             }, 1000);
         });
     }
-    
+
     // دعم اللمس للشاشات التي تعمل باللمس
     if ('ontouchstart' in window) {
         document.body.classList.add('touch-device');
-        
+
         // تحسين حجم الأزرار للجوال
         const buttons = document.querySelectorAll('button');
         buttons.forEach(btn => {
@@ -945,19 +1420,19 @@ def main():
             btn.style.minWidth = '44px';
         });
     }
-    
+
     // إدارة القائمة الجانبية في الجوال
     function toggleSidebar() {
         const sidebar = document.querySelector('section[data-testid="stSidebar"]');
         const isVisible = sidebar.style.transform !== 'translateX(100%)';
-        
+
         if (isVisible) {
             sidebar.style.transform = 'translateX(100%)';
         } else {
             sidebar.style.transform = 'translateX(0)';
         }
     }
-    
+
     // إضافة أسلوب للتدوير
     const style = document.createElement('style');
     style.textContent = `
@@ -965,60 +1440,102 @@ def main():
             0% { transform: rotate(0deg); }
             100% { transform: rotate(360deg); }
         }
-        
+
         .touch-device input, .touch-device button, .touch-device select {
             font-size: 16px !important;
         }
     `;
     document.head.appendChild(style);
     </script>
-    """, unsafe_allow_html=True)
+""")
+
+@timed_stage('render_header')
+def render_header():
+    """الهيدر الرئيسي وشريط العلامات"""
+    st.markdown(HEADER_HTML, unsafe_allow_html=True)
+    
+    # شريط العلامات
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.markdown('<div style="background: rgba(0,102,102,0.1); padding: 10px; border-radius: 8px; text-align: center;"><span style="color: #006666; font-weight: bold;">🎯 تنبؤ دقيق</span></div>', unsafe_allow_html=True)
+    with col2:
+        st.markdown('<div style="background: rgba(212,175,55,0.1); padding: 10px; border-radius: 8px; text-align: center;"><span style="color: #D4AF37; font-weight: bold;">📊 تحليل متقدم</span></div>', unsafe_allow_html=True)
+    with col3:
+        st.markdown('<div style="background: rgba(0,102,102,0.1); padding: 10px; border-radius: 8px; text-align: center;"><span style="color: #006666; font-weight: bold;">📈 تقارير تفاعلية</span></div>', unsafe_allow_html=True)
+    with col4:
+        st.markdown('<div style="background: rgba(212,175,55,0.1); padding: 10px; border-radius: 8px; text-align: center;"><span style="color: #D4AF37; font-weight: bold;">⚡ نتائج فورية</span></div>', unsafe_allow_html=True)
+
+@timed_stage('render_footer')
+def render_footer():
+    """الفوتر"""
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
+
+@timed_stage('render_mobile_scripts')
+def render_mobile_scripts():
+    """إضافة تحسينات إضافية للجوال"""
+    st.markdown(MOBILE_SCRIPT_HTML, unsafe_allow_html=True)
+
+@timed_stage('main')
+def main():
+    """الدالة الرئيسية للتطبيق"""
+    
+    # إعداد الصفحة
+    setup_page_config()
+    apply_comprehensive_css()
+    
+    # إنشاء القائمة الجانبية
+    page = create_sidebar()
+    
+    # الهيدر الرئيسي
+    render_header()
+    
+    # عرض الصفحة المختارة
+    if page == "🏠 الصفحة الرئيسية":
+        show_home_page()
+    
+    elif page == "🎯 أداة التنبؤ":
+        hours, attendance, prev_scores, tutoring, predict_clicked = show_prediction_page()
+        
+        if predict_clicked:
+            with st.spinner("🔍 جاري تحليل البيانات والتنبؤ بالنتيجة..."):
+                success = predict_score(hours, attendance, prev_scores, tutoring)
+                if success:
+                    st.success("✅ تم إكمال عملية التنبؤ بنجاح!")
+                    st.balloons()
+                    st.rerun()
+    
+    elif page == "📊 تحليل البيانات":
+        show_analysis_page()
+    
+    elif page == "📈 التقارير":
+        show_reports_page()
+    
+    elif page == "⚙️ الإعدادات":
+        show_settings_page()
+    
+    # الفوتر
+    render_footer()
+    
+    # إضافة تحسينات إضافية للجوال
+    render_mobile_scripts()
 
 # ============================================================================
 # 8. التحقق من الملفات المطلوبة وإنشاء نموذج افتراضي إذا لزم الأمر
 # ============================================================================
 def check_and_create_model():
-    """التحقق من وجود النموذج وإنشاء نموذج افتراضي إذا لزم الأمر"""
+    """التحقق من وجود النموذج وبدء إنشاء نموذج افتراضي في الخلفية إذا لزم الأمر"""
     try:
-        if not os.path.exists('regression_model.pkl'):
-            st.warning("⚠️ ملف النموذج غير موجود. سيتم إنشاء نموذج افتراضي للعرض التوضيحي.")
-            
-            from sklearn.linear_model import LinearRegression
-            import numpy as np
-            
-            # إنشاء بيانات تدريب افتراضية
-            np.random.seed(42)
-            n_samples = 100
-            
-            # ميزات: ساعات الدراسة، الحضور، الدرجات السابقة، دروس خصوصية، تأثير الأقران
-            X = np.column_stack([
-                np.random.randint(10, 40, n_samples),  # ساعات الدراسة
-                np.random.randint(60, 100, n_samples),  # الحضور
-                np.random.uniform(50, 95, n_samples),   # الدرجات السابقة
-                np.random.randint(0, 10, n_samples),    # دروس خصوصية
-                np.random.randint(1, 6, n_samples)      # تأثير الأقران
-            ])
-            
-            # درجات: معادلة بمعاملات واقعية
-            y = (
-                X[:, 0] * 0.4 +      # ساعات الدراسة (40%)
-                X[:, 1] * 0.3 +      # الحضور (30%)
-                X[:, 2] * 0.25 +     # الدرجات السابقة (25%)
-                X[:, 3] * 0.15 +     # دروس خصوصية (15%)
-                X[:, 4] * 0.05 +     # تأثير الأقران (5%)
-                np.random.randn(n_samples) * 5  # ضوضاء
-            )
-            
-            # ضمان أن الدرجات بين 0 و 100
-            y = np.clip(y, 0, 100)
-            
-            # تدريب النموذج
-            model = LinearRegression()
-            model.fit(X, y)
+        if not BACKENDS['linear'].available:
+            from model_training import get_training_manager
             
-            # حفظ النموذج
-            joblib.dump(model, 'regression_model.pkl')
-            st.success("✅ تم إنشاء النموذج الافتراضي بنجاح!")
+            # التدريب في عملية مستقلة: الصفحة تُعرض فوراً والنموذج يُنشر عند اكتماله
+            manager = get_training_manager()
+            job = manager.job('linear') or manager.start('linear')
+            if job.running:
+                st.info("⏳ ملف النموذج غير موجود. يتم إنشاء نموذج افتراضي للعرض التوضيحي في الخلفية...")
+            elif job.state == 'failed':
+                st.error(f"❌ خطأ في إنشاء النموذج: {job.error}")
+                return False
         
         return True
         
@@ -0,0 +1,175 @@
+"""
+🥶 قياس البدء البارد وزمن إعادة التشغيل لـ app.py
+
+يقيس:
+  - زمن استيراد app في عملية جديدة (python -X importtime) وأثقل الوحدات المستوردة
+  - الوحدات الثقيلة المحمّلة عند الاستيراد (يجب ألا تظهر وحدة جديدة منها)
+  - زمن أول عرض لكل صفحة في عملية جديدة، وزمن إعادة التشغيل لكل صفحة بعد ذلك
+
+الاستخدام:
+    python benchmarks/cold_start.py                       # طباعة النتائج
+    python benchmarks/cold_start.py --compare             # مقارنة بخط الأساس (رمز خروج 1 عند التراجع)
+    python benchmarks/cold_start.py --update-baseline     # حفظ النتائج كخط أساس جديد
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+from common import (
+    BASELINE_DIR, REPO_ROOT, compare, ensure_repo_on_path, environment,
+    load_results, report_regressions, timed, write_results,
+)
+
+BASELINE_PATH = BASELINE_DIR / 'cold_start.json'
+HEAVY_MODULES = ('pandas', 'numpy', 'sklearn', 'scipy', 'matplotlib', 'joblib', 'pyarrow', 'PIL')
+
+
+# ============================================================================
+# 1. زمن الاستيراد
+# ============================================================================
+def parse_importtime(stderr):
+    """(الزمن الذاتي، الزمن التراكمي بالمللي ثانية، العمق) لكل وحدة من مخرجات -X importtime"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules[name.strip()] = (int(self_us) / 1000, int(cumulative_us) / 1000, depth)
+    return modules
+
+
+def measure_import(repeats=5):
+    samples = []
+    heaviest = {}
+    for _ in range(repeats):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-W', 'ignore', '-c', 'import app'],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        )
+        modules = parse_importtime(proc.stderr)
+        samples.append(modules['app'][1])
+        # أثقل الوحدات التي يستوردها app مباشرة
+        for name, (_, cumulative, depth) in modules.items():
+            if depth == 1:
+                heaviest.setdefault(name, []).append(cumulative)
+
+    top = sorted(heaviest.items(), key=lambda item: -statistics.median(item[1]))[:10]
+    return {
+        'import_app_ms': statistics.median(samples),
+        'top_imports_ms': {name: round(statistics.median(values), 2) for name, values in top},
+    }
+
+
+def heavy_modules_at_import():
+    code = (
+        "import sys, json, warnings; warnings.filterwarnings('ignore'); import app; "
+        f"print(json.dumps(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))"
+    )
+    proc = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def measure_process_start(repeats=5):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-W', 'ignore', '-c', 'import app'], cwd=REPO_ROOT, check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'median_ms': statistics.median(samples), 'min_ms': min(samples)}
+
+
+# ============================================================================
+# 2. زمن عرض الصفحات (AppTest)
+# ============================================================================
+def _app_test():
+    from streamlit.testing.v1 import AppTest
+    return AppTest.from_file(str(REPO_ROOT / 'app.py'), default_timeout=120)
+
+
+def page_labels():
+    at = _app_test().run()
+    return list(at.sidebar.radio[0].options)
+
+
+def _first_render_ms(page_index):
+    """يُشغّل داخل عملية جديدة: زمن أول زيارة للصفحة بعد التشغيل الأول"""
+    at = _app_test().run()
+    radio = at.sidebar.radio[0]
+    radio.set_value(radio.options[page_index])
+    start = time.perf_counter()
+    at.run()
+    return (time.perf_counter() - start) * 1000
+
+
+def measure_pages(repeats=5):
+    results = {}
+    for idx, label in enumerate(page_labels()):
+        proc = subprocess.run(
+            [sys.executable, '-W', 'ignore', __file__, '--first-render', str(idx)],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        )
+        first_render = float(proc.stdout.strip().splitlines()[-1])
+
+        at = _app_test().run()
+        at.sidebar.radio[0].set_value(label)
+        at.run()
+        rerun = timed(at.run, repeats=repeats)
+        results[label] = {'first_render_ms': first_render, 'rerun_ms': rerun['median_ms']}
+    return results
+
+
+# ============================================================================
+# 3. التشغيل
+# ============================================================================
+def run(repeats=5):
+    ensure_repo_on_path()
+    return {
+        'environment': environment(),
+        'import': measure_import(repeats),
+        'heavy_modules_at_import': heavy_modules_at_import(),
+        'process_start': measure_process_start(repeats),
+        'pages': measure_pages(repeats),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', help="ملف JSON لحفظ النتائج")
+    parser.add_argument('--compare', action='store_true', help="مقارنة بخط الأساس المحفوظ")
+    parser.add_argument('--baseline', default=str(BASELINE_PATH))
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--first-render', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore')
+    if args.first_render is not None:
+        ensure_repo_on_path()
+        print(_first_render_ms(args.first_render))
+        return 0
+
+    results = run(args.repeats)
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        write_results(results, args.output)
+    if args.update_baseline:
+        write_results(results, args.baseline)
+
+    if args.compare:
+        baseline = load_results(args.baseline)
+        new_heavy = sorted(set(results['heavy_modules_at_import']) - set(baseline['heavy_modules_at_import']))
+        return report_regressions(
+            compare(results, baseline),
+            [f"heavy module now imported at startup: {name}" for name in new_heavy],
+        )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
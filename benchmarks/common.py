@@ -0,0 +1,109 @@
+"""
+🧰 أدوات مشتركة لمقاييس الأداء
+كتابة النتائج بصيغة JSON ومقارنتها بخط أساس محفوظ لاكتشاف التراجعات
+"""
+
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BASELINE_DIR = Path(__file__).resolve().parent / 'baselines'
+
+# التراجع = تجاوز خط الأساس بهذه النسبة وبهذا الفرق المطلق معاً (لتجاهل ضجيج القياسات الصغيرة)
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_MIN_DELTA_MS = 20.0
+
+
+def ensure_repo_on_path():
+    """إتاحة وحدات المشروع للاستيراد وجعل مجلده مجلد العمل (ملفات النماذج نسبية)"""
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+    os.chdir(REPO_ROOT)
+
+
+def timed(func, repeats=5, warmup=1):
+    """الوسيط وأفضل زمن (بالمللي ثانية) لعدة تكرارات"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'median_ms': statistics.median(samples), 'min_ms': min(samples)}
+
+
+def environment():
+    """وصف بيئة القياس لتفسير الفروقات بين الأجهزة"""
+    versions = {}
+    for name in ('numpy', 'pandas', 'sklearn', 'streamlit'):
+        try:
+            module = __import__(name)
+            versions[name] = getattr(module, '__version__', None)
+        except ImportError:
+            versions[name] = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'packages': versions,
+    }
+
+
+def write_results(results, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+
+
+def load_results(path):
+    return json.loads(Path(path).read_text(encoding='utf-8'))
+
+
+def flatten(results, prefix=''):
+    """تحويل القواميس المتداخلة إلى مفاتيح منقوطة: {'a': {'b': 1}} -> {'a.b': 1}"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """
+    مقارنة المقاييس الرقمية: ما ينتهي بـ _ms أو _seconds الأقل أفضل،
+    وما ينتهي بـ _per_second الأعلى أفضل. تُرجع قائمة التراجعات.
+    """
+    current = flatten(current)
+    regressions = []
+    for name, base in flatten(baseline).items():
+        value = current.get(name)
+        if not isinstance(base, (int, float)) or not isinstance(value, (int, float)) or base <= 0:
+            continue
+        if name.endswith('_ms') or name.endswith('_seconds'):
+            delta_ms = (value - base) * (1000 if name.endswith('_seconds') else 1)
+            if value > base * (1 + tolerance) and delta_ms > min_delta_ms:
+                regressions.append((name, base, value))
+        elif name.endswith('_per_second'):
+            if value < base * (1 - tolerance):
+                regressions.append((name, base, value))
+    return regressions
+
+
+def report_regressions(regressions, messages=()):
+    """طباعة التراجعات (ورسائل إضافية) وإرجاع رمز الخروج"""
+    for name, base, value in regressions:
+        print(f"REGRESSION {name}: baseline={base:.3f} current={value:.3f} ({value / base - 1:+.0%})")
+    for message in messages:
+        print(f"REGRESSION {message}")
+    if not regressions and not messages:
+        print("no regressions")
+    return 1 if regressions or messages else 0
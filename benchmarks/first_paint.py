@@ -0,0 +1,145 @@
+"""
+🎨 قياس زمن أول عرض للصفحة في متصفح حقيقي
+يشغّل التطبيق بـ streamlit run ويفتحه في Chromium بدون واجهة (Playwright)، ثم يقيس:
+  - first-contentful-paint من Performance API
+  - زمن ظهور عنوان الهيدر (أول محتوى للتطبيق بعد اتصال websocket)
+  - الطلبات إلى نطاقات خارجية (يجب أن تكون صفراً بعد استضافة الخطوط محلياً)
+
+يتطلب: pip install playwright && playwright install chromium
+
+الاستخدام:
+    python benchmarks/first_paint.py
+    python benchmarks/first_paint.py --offline       # حظر النطاقات الخارجية كما في شبكات المدارس
+    python benchmarks/first_paint.py --compare
+"""
+
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlparse
+from urllib.request import urlopen
+
+from common import (
+    BASELINE_DIR, REPO_ROOT, compare, environment, load_results,
+    report_regressions, write_results,
+)
+
+BASELINE_PATH = BASELINE_DIR / 'first_paint.json'
+HEADER_SELECTOR = 'h1:has-text("نظام التنبؤ الذكي")'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_app(port, timeout=60):
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', 'app.py', '--server.headless', 'true',
+         '--server.port', str(port), '--browser.gatherUsageStats', 'false'],
+        cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("لم يبدأ خادم Streamlit في الوقت المحدد")
+
+
+def measure_visit(browser, url, offline):
+    context = browser.new_context()
+    external = []
+
+    def on_request(route):
+        host = urlparse(route.request.url).hostname
+        if host not in ('127.0.0.1', 'localhost'):
+            external.append(route.request.url)
+            if offline:
+                # شبكة بدون إنترنت: الطلب ينتهي بانتهاء المهلة
+                return route.abort('timedout')
+        return route.continue_()
+
+    context.route('**/*', on_request)
+    page = context.new_page()
+    start = time.perf_counter()
+    page.goto(url, wait_until='commit')
+    page.wait_for_selector(HEADER_SELECTOR, timeout=120_000)
+    header_ms = (time.perf_counter() - start) * 1000
+    fcp_ms = page.evaluate(
+        "performance.getEntriesByName('first-contentful-paint')[0]?.startTime ?? null"
+    )
+    context.close()
+    return {'first_contentful_paint_ms': fcp_ms, 'header_visible_ms': header_ms, 'external_requests': len(external)}
+
+
+def run(repeats=5, offline=False, url=None):
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        raise SystemExit("هذا المقياس يتطلب Playwright: pip install playwright && playwright install chromium")
+
+    proc = None
+    if url is None:
+        port = free_port()
+        proc = start_app(port)
+        url = f"http://127.0.0.1:{port}/"
+    try:
+        with sync_playwright() as playwright:
+            browser = playwright.chromium.launch()
+            # زيارة أولى لتسخين الخادم (استيراد الوحدات وتحميل النموذج)
+            measure_visit(browser, url, offline)
+            visits = [measure_visit(browser, url, offline) for _ in range(repeats)]
+            browser.close()
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    return {
+        'environment': environment(),
+        'offline': offline,
+        'first_paint': {
+            'first_contentful_paint_ms': statistics.median(v['first_contentful_paint_ms'] or 0 for v in visits),
+            'header_visible_ms': statistics.median(v['header_visible_ms'] for v in visits),
+            'external_requests': max(v['external_requests'] for v in visits),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--offline', action='store_true', help="حظر الطلبات إلى النطاقات الخارجية")
+    parser.add_argument('--url', help="قياس خادم قائم بدلاً من تشغيل app.py")
+    parser.add_argument('--output', help="ملف JSON لحفظ النتائج")
+    parser.add_argument('--compare', action='store_true', help="مقارنة بخط الأساس المحفوظ")
+    parser.add_argument('--baseline', default=str(BASELINE_PATH))
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    results = run(args.repeats, args.offline, args.url)
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        write_results(results, args.output)
+    if args.update_baseline:
+        write_results(results, args.baseline)
+    if args.compare:
+        baseline = load_results(args.baseline)
+        messages = []
+        if results['first_paint']['external_requests'] > baseline['first_paint']['external_requests']:
+            messages.append("new requests to external hosts during page load")
+        return report_regressions(compare(results, baseline), messages)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
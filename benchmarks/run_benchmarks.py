@@ -0,0 +1,240 @@
+"""
+📊 مجموعة مقاييس الأداء
+
+يقيس:
+  - زمن التنبؤ لطالب واحد (نواة predict_score) لكل نموذج
+  - زمن خطة أقل تغيير (goal_seeking) لطالب واحد، وعدد الطلاب المحسومين في الثانية لدفعة كاملة
+  - الزمن الإضافي لفترة التنبؤ (مجموعة bootstrap) فوق التنبؤ النقطي لطالب واحد ولدفعة كاملة
+  - إنتاجية التنبؤ الجماعي عند 1k و 100k و 1M صف
+  - زمن تحليل ملفات CSV مولّدة بأحجام متزايدة (مسار صفحة تحليل البيانات)
+  - زمن إعادة تشغيل كل صفحة كاملة عبر AppTest
+
+الاستخدام:
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --compare               # رمز خروج 1 عند التراجع
+    python benchmarks/run_benchmarks.py --update-baseline
+    python benchmarks/run_benchmarks.py --quick                 # أحجام صغيرة للتحقق السريع
+"""
+
+import argparse
+import io
+import json
+import sys
+import time
+import warnings
+
+from common import (
+    BASELINE_DIR, DEFAULT_TOLERANCE, compare, ensure_repo_on_path, environment,
+    load_results, report_regressions, timed, write_results,
+)
+
+BASELINE_PATH = BASELINE_DIR / 'suite.json'
+
+BATCH_SIZES = {'linear': [1_000, 100_000, 1_000_000], 'svr': [1_000, 10_000]}
+CSV_SIZES = [10_000, 100_000, 1_000_000]
+QUICK_BATCH_SIZES = {'linear': [1_000, 10_000], 'svr': [1_000]}
+QUICK_CSV_SIZES = [10_000]
+GOAL_SEEK_COHORT = 1_000
+GOAL_SEEK_BUDGET = 2.0
+INTERVAL_BATCH = 100_000
+
+
+# ============================================================================
+# 1. بيانات مولّدة
+# ============================================================================
+def student_frame(n, seed=0):
+    """إطار طلاب عشوائي بنفس أعمدة ملفات المدارس"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Hours_Studied': rng.integers(0, 41, n),
+        'Attendance': rng.integers(60, 101, n),
+        'Parental_Involvement': rng.choice(['Low', 'Medium', 'High'], n),
+        'Previous_Scores': rng.integers(50, 101, n),
+        'Tutoring_Sessions': rng.integers(0, 9, n),
+        'Peer_Influence': rng.integers(0, 3, n),
+        'School_Type': rng.choice(['Public', 'Private'], n),
+        'Gender': rng.choice(['Male', 'Female'], n),
+        'Exam_Score': rng.integers(55, 101, n),
+    })
+
+
+# ============================================================================
+# 2. المقاييس
+# ============================================================================
+def bench_single_row(repeats):
+    from model_backends import BACKENDS
+    from prediction_core import predict_student
+    from prediction_lattice import PredictionLattice
+
+    results = {}
+    for key, backend in BACKENDS.items():
+        if not backend.available:
+            continue
+        backend.load()
+        direct = timed(lambda: predict_student(20, 85, 75.0, 2, backend=backend, use_lattice=False),
+                       repeats=repeats * 20)
+        results[key] = {'direct_ms': direct['median_ms']}
+
+    # البحث في الجدول لا يعتمد على النموذج؛ نبنيه للنموذج الخطي لأن بناءه فوري
+    lattice = PredictionLattice.build(BACKENDS['linear'].load(), BACKENDS['linear'].default_peer)
+    results['lattice_lookup_ms'] = timed(lambda: lattice.lookup(20, 85, 75.0, 2), repeats=repeats * 100)['median_ms']
+    return results
+
+
+def bench_batch(sizes, repeats):
+    from model_backends import BACKENDS
+    from scoring import score_frame
+
+    results = {}
+    for key, backend_sizes in sizes.items():
+        backend = BACKENDS[key]
+        if not backend.available:
+            continue
+        model = backend.load()
+        for n in backend_sizes:
+            df = student_frame(n)
+            elapsed = timed(lambda: score_frame(model, df, backend.default_peer),
+                            repeats=repeats if n <= 100_000 else 1, warmup=0 if n > 100_000 else 1)
+            results[f"{key}_{n}"] = {
+                'total_ms': elapsed['median_ms'],
+                'rows_per_second': n / (elapsed['median_ms'] / 1000),
+            }
+    return results
+
+
+def bench_goal_seek(repeats, cohort=GOAL_SEEK_COHORT, budget=GOAL_SEEK_BUDGET):
+    from goal_seeking import seek_targets
+    from model_backends import BACKENDS
+    from scoring import build_feature_matrix, clip_scores
+
+    results = {}
+    for key, backend in BACKENDS.items():
+        if not backend.available:
+            continue
+        model = backend.load()
+        X = build_feature_matrix(student_frame(cohort, seed=1), backend.default_peer)
+        scores = clip_scores(model.predict(X))
+        # طالب يحتاج خطة (ليس في المستوى الأعلى)
+        row = int((scores < 90).argmax())
+        single = timed(lambda: seek_targets(model, X[row:row + 1], scores[row:row + 1], budget),
+                       repeats=repeats * 4)
+
+        start = time.perf_counter()
+        plan = seek_targets(model, X, scores, budget)
+        elapsed = time.perf_counter() - start
+        settled = int((plan['status'] != 'out_of_budget').sum())
+        results[key] = {
+            'single_ms': single['median_ms'],
+            'cohort_settled': settled,
+            'cohort_students_per_second': settled / elapsed,
+        }
+    return results
+
+
+def bench_intervals(repeats, n=INTERVAL_BATCH):
+    """التنبؤ النقطي مقابل التنبؤ مع الفترة، بنموذج خطي ومجموعة bootstrap مدرّبين على نفس البيانات المولّدة"""
+    import numpy as np
+    from model_backends import BACKENDS
+    from model_export import LinearModel
+    from model_training import chunk_matrix, fit_estimator
+    from prediction_intervals import fit_bootstrap, interval_bounds
+
+    X, y = chunk_matrix(student_frame(n, seed=2), 'linear', BACKENDS['linear'].default_peer)
+    estimator = fit_estimator('linear', X, y)
+    model = LinearModel(estimator.coef_, estimator.intercept_)
+    start = time.perf_counter()
+    members = fit_bootstrap(X, y).astype(np.float32)
+    fit_seconds = time.perf_counter() - start
+
+    row = X[:1]
+    single_point = timed(lambda: model.predict(row), repeats=repeats * 200)
+    single_interval = timed(lambda: interval_bounds(members, row), repeats=repeats * 200)
+    batch_point = timed(lambda: model.predict(X), repeats=repeats)
+    batch_interval = timed(lambda: interval_bounds(members, X), repeats=repeats)
+    return {
+        'members': len(members),
+        'fit_seconds': fit_seconds,
+        'single_point_ms': single_point['median_ms'],
+        'single_interval_ms': single_interval['median_ms'],
+        f"batch_{n}_point_ms": batch_point['median_ms'],
+        f"batch_{n}_interval_ms": batch_interval['median_ms'],
+        'interval_rows_per_second': n / (batch_interval['median_ms'] / 1000),
+    }
+
+
+def bench_csv_profile(sizes, repeats):
+    from csv_profiler import profile_csv
+
+    results = {}
+    for n in sizes:
+        data = student_frame(n).to_csv(index=False).encode('utf-8')
+        elapsed = timed(lambda: profile_csv(io.BytesIO(data)), repeats=repeats if n <= 100_000 else 1, warmup=0)
+        results[str(n)] = {
+            'bytes': len(data),
+            'profile_ms': elapsed['median_ms'],
+            'rows_per_second': n / (elapsed['median_ms'] / 1000),
+        }
+    return results
+
+
+def bench_pages(repeats):
+    from cold_start import measure_pages
+    return measure_pages(repeats)
+
+
+# ============================================================================
+# 3. التشغيل
+# ============================================================================
+def run(quick=False, repeats=5, sections=None):
+    ensure_repo_on_path()
+    warnings.filterwarnings('ignore')
+    batch_sizes = QUICK_BATCH_SIZES if quick else BATCH_SIZES
+    csv_sizes = QUICK_CSV_SIZES if quick else CSV_SIZES
+
+    benches = {
+        'single_row': lambda: bench_single_row(repeats),
+        'batch': lambda: bench_batch(batch_sizes, repeats),
+        'goal_seek': lambda: bench_goal_seek(repeats),
+        'intervals': lambda: bench_intervals(repeats, 10_000 if quick else INTERVAL_BATCH),
+        'csv_profile': lambda: bench_csv_profile(csv_sizes, repeats),
+        'pages': lambda: bench_pages(repeats),
+    }
+    results = {'environment': environment(), 'quick': quick}
+    for name, bench in benches.items():
+        if sections and name not in sections:
+            continue
+        start = time.perf_counter()
+        results[name] = bench()
+        print(f"{name}: {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quick', action='store_true')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--only', nargs='+', choices=['single_row', 'batch', 'goal_seek', 'intervals', 'csv_profile', 'pages'])
+    parser.add_argument('--output', help="ملف JSON لحفظ النتائج")
+    parser.add_argument('--compare', action='store_true', help="مقارنة بخط الأساس المحفوظ")
+    parser.add_argument('--baseline', default=str(BASELINE_PATH))
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="نسبة التراجع المسموح بها قبل الإبلاغ")
+    args = parser.parse_args(argv)
+
+    results = run(args.quick, args.repeats, args.only)
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        write_results(results, args.output)
+    if args.update_baseline:
+        write_results(results, args.baseline)
+    if args.compare:
+        return report_regressions(compare(results, load_results(args.baseline), args.tolerance))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+📈 محلل CSV متدفق بذاكرة محدودة
+قراءة الملف على دفعات وحساب الإحصائيات الوصفية والقيم المفقودة والمكررة في مرور واحد
+"""
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_CHUNKSIZE = 50_000
+DEFAULT_SAMPLE_SIZE = 10_000
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+# ============================================================================
+# 1. إحصائيات عمود رقمي
+# ============================================================================
+class ColumnProfile:
+    """
+    إحصائيات عمود رقمي قابلة للدمج: العدد والمتوسط والتباين (Welford/Chan)
+    والقيم الصغرى والعظمى وعينة خزان (reservoir) ثابتة الحجم للمئينات التقريبية.
+    المئينات دقيقة تماماً ما دام عدد القيم لا يتجاوز حجم العينة.
+    """
+
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max', 'sample', 'sample_size')
+
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sample = np.empty(0)
+        self.sample_size = sample_size
+
+    def update(self, values, rng):
+        """إضافة دفعة من القيم (بدون NaN)"""
+        n = len(values)
+        if n == 0:
+            return
+        self._combine(n, float(values.mean()), float(((values - values.mean()) ** 2).sum()),
+                      float(values.min()), float(values.max()))
+        self._reservoir_update(values, rng)
+
+    def _combine(self, n, mean, m2, vmin, vmax):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, vmin)
+        self.max = max(self.max, vmax)
+
+    def _reservoir_update(self, values, rng):
+        seen = self.count - len(values)
+        free = self.sample_size - len(self.sample)
+        if free > 0:
+            self.sample = np.concatenate([self.sample, values[:free]])
+            values = values[free:]
+            seen += free
+        if len(values) == 0:
+            return
+        # الخوارزمية R بشكل متجهي: العنصر رقم t يحل محل موضع عشوائي باحتمال k/(t+1)
+        positions = seen + np.arange(len(values))
+        slots = (rng.random(len(values)) * (positions + 1)).astype(np.int64)
+        keep = slots < self.sample_size
+        self.sample[slots[keep]] = values[keep]
+
+    def merge(self, other, rng):
+        """دمج إحصائيات جزء آخر من البيانات"""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max, self.sample = other.min, other.max, other.sample.copy()
+            return
+
+        # عدد العناصر المأخوذة من كل عينة يتبع التوزيع فوق الهندسي بحسب حجم كل جزء
+        k = min(self.sample_size, self.count + other.count)
+        from_self = rng.hypergeometric(self.count, other.count, k)
+        self.sample = np.concatenate([
+            rng.choice(self.sample, from_self, replace=False),
+            rng.choice(other.sample, k - from_self, replace=False),
+        ])
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+
+    def describe(self):
+        """نفس صفوف DataFrame.describe()"""
+        if self.count == 0:
+            return [0.0] + [np.nan] * (4 + len(QUANTILES))
+        std = np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+        quantiles = np.quantile(self.sample, QUANTILES)
+        return [float(self.count), self.mean, std, self.min, *quantiles, self.max]
+
+
+# ============================================================================
+# 2. إحصائيات الملف كاملاً
+# ============================================================================
+class DataProfile:
+    """إحصائيات ملف كامل تُبنى دفعة بدفعة ويمكن دمجها مع ملفات أخرى"""
+
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE, head_rows=15, seed=0):
+        self.rows = 0
+        self.columns = []
+        self.numeric = {}
+        self.non_numeric = set()
+        self.missing = {}
+        self.memory_bytes = 0
+        self.head = None
+        self.sample_size = sample_size
+        self.head_rows = head_rows
+        self._hashes = []
+        self._pending = 0
+        self._unique = np.empty(0, dtype=np.uint64)
+        self._rng = np.random.default_rng(seed)
+
+    # ---------- التحديث ----------
+    def update(self, chunk):
+        """إضافة دفعة جديدة من الصفوف"""
+        if self.head is None:
+            self.columns = list(chunk.columns)
+            self.missing = {col: 0 for col in self.columns}
+            self.head = chunk.head(self.head_rows)
+        elif len(self.head) < self.head_rows:
+            self.head = pd.concat([self.head, chunk.head(self.head_rows - len(self.head))])
+
+        self.rows += len(chunk)
+        self.memory_bytes += int(chunk.memory_usage(index=False, deep=True).sum())
+
+        for col, count in chunk.isnull().sum().items():
+            self.missing[col] += int(count)
+
+        for col in self.columns:
+            series = chunk[col]
+            if col in self.non_numeric:
+                continue
+            if not is_describable(series):
+                # عمود غير رقمي في أي دفعة يعني أنه غير رقمي في الملف كاملاً
+                self.non_numeric.add(col)
+                self.numeric.pop(col, None)
+                continue
+            values = series.to_numpy(dtype=float, na_value=np.nan)
+            profile = self.numeric.setdefault(col, ColumnProfile(self.sample_size))
+            profile.update(values[~np.isnan(values)], self._rng)
+
+        self._add_hashes(row_hashes(chunk))
+
+    def _add_hashes(self, hashes):
+        self._hashes.append(np.unique(hashes))
+        self._pending += len(self._hashes[-1])
+        # ضغط البصمات المعلّقة عندما يتجاوز حجمها البصمات الفريدة المحفوظة
+        if self._pending > max(len(self._unique), 1 << 16):
+            self.compact()
+
+    def compact(self):
+        """دمج البصمات المعلّقة في مصفوفة البصمات الفريدة (قبل إرسال التحليل إلى عملية أخرى أو تخزينه)"""
+        if self._hashes:
+            self._unique = np.unique(np.concatenate([self._unique, *self._hashes]))
+            self._hashes = []
+            self._pending = 0
+
+    def merge(self, other):
+        """دمج إحصائيات ملف آخر له نفس الأعمدة دون دمج البيانات الخام"""
+        if other.head is None:
+            return
+        if self.head is None:
+            self.columns = list(other.columns)
+            self.missing = {col: 0 for col in self.columns}
+            self.head = other.head
+        for col in other.columns:
+            if col not in self.missing:
+                self.columns.append(col)
+                self.missing[col] = 0
+            self.missing[col] += other.missing[col]
+
+        self.rows += other.rows
+        self.memory_bytes += other.memory_bytes
+        self.non_numeric |= other.non_numeric
+        for col in self.non_numeric:
+            self.numeric.pop(col, None)
+        for col, profile in other.numeric.items():
+            if col in self.non_numeric:
+                continue
+            self.numeric.setdefault(col, ColumnProfile(self.sample_size)).merge(profile, self._rng)
+
+        other.compact()
+        self._hashes.append(other._unique)
+        self._pending += len(other._unique)
+        self.compact()
+
+    # ---------- النتائج ----------
+    def describe(self):
+        """جدول مطابق لـ DataFrame.describe() للأعمدة الرقمية"""
+        columns = [col for col in self.columns if col in self.numeric]
+        index = ['count', 'mean', 'std', 'min'] + [f"{q:.0%}" for q in QUANTILES] + ['max']
+        return pd.DataFrame(
+            {col: self.numeric[col].describe() for col in columns},
+            index=index,
+            columns=columns,
+        )
+
+    @property
+    def missing_total(self):
+        return sum(self.missing.values())
+
+    @property
+    def duplicate_count(self):
+        self.compact()
+        return self.rows - len(self._unique)
+
+    @property
+    def nbytes(self):
+        """الذاكرة التي يشغلها التحليل نفسه (العينات والبصمات وأول الصفوف)"""
+        self.compact()
+        sample_bytes = sum(col.sample.nbytes for col in self.numeric.values())
+        head_bytes = int(self.head.memory_usage(deep=True).sum()) if self.head is not None else 0
+        return sample_bytes + self._unique.nbytes + head_bytes
+
+    @property
+    def memory_usage(self):
+        """حجم البيانات الفعلي بالبايت كما يحسبه DataFrame.memory_usage(deep=True).sum()"""
+        return self.memory_bytes + pd.RangeIndex(self.rows).memory_usage()
+
+
+# ============================================================================
+# 3. وظائف المساعدة
+# ============================================================================
+def is_describable(series):
+    """الأعمدة التي يشملها DataFrame.describe() افتراضياً"""
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+def row_hashes(chunk):
+    """
+    بصمة 64 بت لكل صف.
+    الأعمدة الرقمية تُحوّل إلى float64 حتى تتطابق البصمات بين دفعة بلا قيم مفقودة (int)
+    ودفعة فيها قيم مفقودة (float).
+    """
+    normalized = chunk.copy(deep=False)
+    for col in normalized.columns:
+        if is_describable(normalized[col]):
+            normalized[col] = normalized[col].astype(float)
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+
+def profile_frames(frames, sample_size=DEFAULT_SAMPLE_SIZE):
+    """تحليل دفعات DataFrame متتالية (من CSV أو من مكتبة البيانات) في مرور واحد"""
+    profile = DataProfile(sample_size=sample_size)
+    for chunk in frames:
+        profile.update(chunk)
+    return profile
+
+
+def profile_csv(source, chunksize=DEFAULT_CHUNKSIZE, sample_size=DEFAULT_SAMPLE_SIZE, **read_kwargs):
+    """تحليل ملف CSV في مرور واحد دون تحميله كاملاً في الذاكرة"""
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return profile_frames(pd.read_csv(source, chunksize=chunksize, **read_kwargs), sample_size)
@@ -0,0 +1,181 @@
+"""
+📚 مكتبة البيانات بصيغة عمودية (Arrow IPC / Feather v2)
+الملف المرفوع يُحوّل مرة واحدة إلى ملف Arrow غير مضغوط، ثم يُفتح بعد ذلك
+بالتخطيط في الذاكرة (memory-mapped): لا يُعاد تحليل النص، والصفحات تُشارك
+بين عمليات Streamlit عبر ذاكرة نظام التشغيل المؤقتة.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+DATASET_DIR = Path(os.environ.get('DATASET_LIBRARY_DIR', 'datasets'))
+BATCH_ROWS = 65_536
+# حجم كتلة قراءة CSV: كل كتلة دفعة واحدة، فهي تحدد ذاكرة الحفظ مهما كبر الملف
+CSV_BLOCK_BYTES = 8 << 20
+# كتلة صغيرة تكفي لقراءة أسماء الأعمدة
+HEADER_BLOCK_BYTES = 1 << 20
+METADATA_KEY = b'student_dataset'
+
+
+# ============================================================================
+# 1. مجموعة بيانات محفوظة
+# ============================================================================
+class StoredDataset:
+    """ملف Arrow في المكتبة مع بياناته الوصفية (الاسم والبصمة وعدد الصفوف)"""
+
+    __slots__ = ('path', 'name', 'sha256', 'rows', 'columns', 'created_at', 'memory_report')
+
+    def __init__(self, path, name, sha256, rows, columns, created_at, memory_report=None):
+        self.path = Path(path)
+        self.name = name
+        self.sha256 = sha256
+        self.rows = rows
+        self.columns = columns
+        self.created_at = created_at
+        # ذاكرة كل عمود في pandas قبل ضغط الأنواع وبعده (انظر dtype_compaction)
+        self.memory_report = memory_report or []
+
+    @property
+    def nbytes(self):
+        return self.path.stat().st_size
+
+    @classmethod
+    def from_file(cls, path):
+        """قراءة البيانات الوصفية من تذييل الملف فقط (بدون قراءة الأعمدة)"""
+        import pyarrow as pa
+
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            schema = reader.schema
+            # عدد الصفوف من رؤوس الدفعات فقط؛ الأعمدة نفسها لا تُقرأ
+            rows = sum(reader.get_batch(idx).num_rows for idx in range(reader.num_record_batches))
+        meta = json.loads(schema.metadata[METADATA_KEY])
+        return cls(path, meta['name'], meta['sha256'], rows, schema.names, meta['created_at'],
+                   meta.get('memory_report'))
+
+    def table(self):
+        """الجدول كاملاً بالتخطيط في الذاكرة (بدون نسخ)"""
+        import pyarrow as pa
+
+        return pa.ipc.open_file(pa.memory_map(str(self.path))).read_all()
+
+    def to_pandas(self):
+        # split_blocks يتجنب دمج الأعمدة في كتلة واحدة، فتبقى الأعمدة الرقمية بلا نسخ
+        return self.table().to_pandas(split_blocks=True)
+
+    def iter_frames(self, chunksize=BATCH_ROWS):
+        """دفعات DataFrame متتالية (مثل pd.read_csv(chunksize=...))"""
+        for batch in self.table().to_batches(max_chunksize=chunksize):
+            yield batch.to_pandas(split_blocks=True)
+
+
+# ============================================================================
+# 2. المكتبة
+# ============================================================================
+class DatasetStore:
+    """مجلد ملفات Arrow؛ كل ملف باسم بصمة محتوى الملف الأصلي فلا يتكرر الحفظ"""
+
+    def __init__(self, directory=DATASET_DIR):
+        self.directory = Path(directory)
+
+    def path_for(self, sha256):
+        return self.directory / f"{sha256[:20]}.arrow"
+
+    def get(self, sha256):
+        path = self.path_for(sha256)
+        return StoredDataset.from_file(path) if path.exists() else None
+
+    def datasets(self):
+        """مجموعات البيانات المحفوظة، الأحدث أولاً"""
+        if not self.directory.exists():
+            return []
+        datasets = []
+        for path in self.directory.glob('*.arrow'):
+            try:
+                datasets.append(StoredDataset.from_file(path))
+            except (OSError, ValueError, KeyError):
+                # ملف ناقص أو تالف لا يوقف عرض بقية المكتبة
+                continue
+        return sorted(datasets, key=lambda dataset: -dataset.created_at)
+
+    def save_csv(self, source, name, sha256):
+        """
+        تحويل ملف CSV إلى Arrow بأنواع مدمجة وكتابته بشكل ذري، دفعة بعد دفعة دون تحميل
+        الملف كاملاً: مرور أول يحدد أنواع الأعمدة من كل الدفعات والمخطط المدمج الثابت، وثانٍ
+        يضغط كل دفعة ويكتبها.
+        إذا كان الملف محفوظاً من قبل يُرجع كما هو.
+        """
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+        from dtype_compaction import StreamCompactor
+
+        existing = self.get(sha256)
+        if existing is not None:
+            return existing
+
+        def read_batches(column_types=None, include_columns=None, block_size=CSV_BLOCK_BYTES):
+            if hasattr(source, 'seek'):
+                source.seek(0)
+            return pa_csv.open_csv(
+                source,
+                # الملفات الأصغر من كتلة القراءة دفعة واحدة، فيحوّل to_pandas أعمدتها الرقمية
+                # إلى مصفوفات NumPy فوق الملف المخطط في الذاكرة دون أي نسخ
+                read_options=pa_csv.ReadOptions(block_size=block_size),
+                # الخلايا الفارغة قيم مفقودة في الأعمدة النصية أيضاً، كما في pd.read_csv
+                convert_options=pa_csv.ConvertOptions(
+                    column_types=column_types, include_columns=include_columns, strings_can_be_null=True),
+            )
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(sha256)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+        # كل الأعمدة تُقرأ كنص: قارئ CSV يثبّت الأنواع من الكتلة الأولى ويفشل إذا تغيّرت بعدها،
+        # فالنوع النهائي يحدده StreamCompactor من كل الدفعات
+        names = read_batches(block_size=HEADER_BLOCK_BYTES).schema.names
+        as_text = {name: pa.string() for name in names}
+        compactor = StreamCompactor(names)
+        for batch in read_batches(as_text):
+            compactor.scan(batch)
+        if compactor.stale:
+            # عمود صار نصاً بعد دفعات مُسحت بنوع آخر: إعادة مسحه وحده
+            stale = [name for name in names if name in compactor.stale]
+            compactor.reset(stale)
+            for batch in read_batches(as_text, stale):
+                compactor.scan(batch)
+        meta = {'name': name, 'sha256': sha256, 'created_at': time.time()}
+        schema, meta['memory_report'] = compactor.finish()
+        schema = schema.with_metadata({METADATA_KEY: json.dumps(meta, ensure_ascii=False).encode('utf-8')})
+        try:
+            with pa.OSFile(str(tmp_path), 'wb') as sink:
+                with pa.ipc.new_file(sink, schema) as writer:
+                    for batch in read_batches(compactor.column_types):
+                        writer.write_batch(compactor.compact(batch))
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        return StoredDataset.from_file(path)
+
+    def delete(self, sha256):
+        path = self.path_for(sha256)
+        if path.exists():
+            path.unlink()
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_dataset_store():
+    """المكتبة المشتركة بين جميع جلسات العملية"""
+    global _shared_store
+    if _shared_store is None:
+        with _shared_lock:
+            if _shared_store is None:
+                _shared_store = DatasetStore()
+    return _shared_store
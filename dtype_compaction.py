@@ -0,0 +1,353 @@
+"""
+🗜️ ضغط أنواع أعمدة البيانات المرفوعة
+النصوص قليلة القيم المختلفة (الجنس، نوع المدرسة، تعليم الوالدين...) تُحفظ كفئات
+(قاموس + فهارس صغيرة)، والأعداد الصحيحة تُصغّر إلى أصغر نوع يسع مداها،
+والأعداد العشرية إلى float32 متى لم يتغير أي رقم بذلك.
+يتم الضغط على جدول Arrow قبل حفظه في مكتبة البيانات، فكل تحميل لاحق يكون مضغوطاً.
+"""
+
+import random
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+# النص يصبح فئة إذا كانت قيمه المختلفة لا تتجاوز هذه النسبة من الصفوف ولا هذا العدد
+CATEGORY_MAX_RATIO = 0.5
+CATEGORY_MAX_UNIQUE = 32_767
+# صفوف العينة التي تُقاس منها ذاكرة pandas لكل عمود
+MEMORY_SAMPLE_ROWS = 4096
+# الأنواع الصحيحة المرشحة بالترتيب مع مداها
+INTEGER_BOUNDS = (
+    (pa.int8(), -2 ** 7, 2 ** 7 - 1),
+    (pa.int16(), -2 ** 15, 2 ** 15 - 1),
+    (pa.int32(), -2 ** 31, 2 ** 31 - 1),
+)
+
+
+# ============================================================================
+# 1. اختيار النوع المدمج لكل عمود
+# ============================================================================
+def _smallest_integer(dtype, low, high):
+    if low is None:
+        return None
+    for target, lower, upper in INTEGER_BOUNDS:
+        if lower <= low and high <= upper:
+            return target if target.bit_width < dtype.bit_width else None
+    return None
+
+
+def _lossless_float32(column):
+    """float32 فقط إذا أعاد التحويل ذهاباً وإياباً القيم نفسها تماماً"""
+    narrowed = column.cast(pa.float32(), safe=False)
+    same = pc.equal(narrowed.cast(pa.float64()), column)
+    return pc.all(same, skip_nulls=True).as_py() is not False
+
+
+def _dictionary_index(non_null, distinct):
+    """نوع فهرس القاموس للنص، أو None إذا كانت القيم المختلفة كثيرة"""
+    if non_null == 0 or distinct > CATEGORY_MAX_UNIQUE or distinct > CATEGORY_MAX_RATIO * non_null:
+        return None
+    return pa.int8() if distinct <= 127 else pa.int16()
+
+
+def _chunks(column):
+    return column.chunks if isinstance(column, pa.ChunkedArray) else [column]
+
+
+class ColumnScan:
+    """
+    ما يحدد النوع المدمج لعمود، مجمّعاً من قطعة واحدة أو من دفعات متتالية: مدى الأعداد
+    الصحيحة، وسلامة float32 للعشرية، والقيم المختلفة للنصوص (حتى CATEGORY_MAX_UNIQUE).
+    """
+
+    def __init__(self, dtype):
+        self.dtype = dtype
+        self.rows = 0
+        self.nulls = 0
+        self.low = self.high = None
+        self.float32_safe = True
+        # القيم المختلفة بترتيب ظهورها (قاموس الفئات)، أو None بعد تجاوز الحد
+        self.values = pa.array([], dtype) if self.is_string else None
+
+    @property
+    def is_string(self):
+        return pa.types.is_string(self.dtype) or pa.types.is_large_string(self.dtype)
+
+    def update(self, column):
+        self.rows += len(column)
+        self.nulls += column.null_count
+        dtype = self.dtype
+        if pa.types.is_integer(dtype) and pa.types.is_signed_integer(dtype):
+            bounds = pc.min_max(column)
+            low, high = bounds['min'].as_py(), bounds['max'].as_py()
+            if low is not None:
+                self.low = low if self.low is None else min(self.low, low)
+                self.high = high if self.high is None else max(self.high, high)
+        elif pa.types.is_float64(dtype):
+            self.float32_safe = self.float32_safe and _lossless_float32(column)
+        elif self.values is not None:
+            values = pc.unique(pa.chunked_array([self.values, *_chunks(pc.drop_null(column))], dtype))
+            self.values = values if len(values) <= CATEGORY_MAX_UNIQUE else None
+
+    def target(self):
+        """النوع المدمج، أو None إذا كان النوع الحالي هو الأنسب"""
+        dtype = self.dtype
+        if pa.types.is_integer(dtype) and pa.types.is_signed_integer(dtype):
+            return _smallest_integer(dtype, self.low, self.high)
+        if pa.types.is_float64(dtype):
+            return pa.float32() if self.rows and self.float32_safe else None
+        if self.is_string and self.values is not None:
+            index = _dictionary_index(self.rows - self.nulls, len(self.values))
+            return pa.dictionary(index, dtype) if index is not None else None
+        return None
+
+
+def compact_type(column):
+    """النوع المدمج لعمود Arrow، أو None إذا كان نوعه الحالي هو الأنسب"""
+    scan = ColumnScan(column.type)
+    scan.update(column)
+    return scan.target()
+
+
+# ============================================================================
+# 2. الضغط والتقرير
+# ============================================================================
+def _memory_sample(column, rows):
+    """
+    صفوف عشوائية ثابتة البذرة من العمود (التباعد المنتظم ينحاز مع البيانات الدورية)، مع قيمة
+    مفقودة إن وُجدت لأنها تحدد نوع pandas للأعداد الصحيحة
+    """
+    if len(column) <= rows:
+        return column
+    indices = sorted(random.Random(0).sample(range(len(column)), rows))
+    if column.null_count:
+        first_null = pc.index(pc.is_null(column), True).as_py()
+        if first_null not in indices:
+            indices[-1] = first_null
+    return column.take(pa.array(indices))
+
+
+def memory_parts(column, sample_rows=MEMORY_SAMPLE_ROWS):
+    """
+    (ذاكرة الصفوف، ذاكرة قاموس الفئات، نوع pandas) مقدّرة من تحويل عينة فقط إلى pandas:
+    ذاكرة العينة (deep، بما فيها كائنات النصوص) مضروبة في نسبة حجم العمود إليها، وقاموس
+    الفئات ثابت لا يتضاعف مع الصفوف فيُحسب مرة واحدة.
+    """
+    sample = _memory_sample(column, sample_rows)
+    series = pa.table({'column': sample}).to_pandas()['column']
+    total = int(series.memory_usage(deep=True, index=False))
+    fixed = int(series.cat.categories.memory_usage(deep=True)) if str(series.dtype) == 'category' else 0
+    rows = (total - fixed) * len(column) / len(sample) if len(sample) else 0
+    return rows, fixed, str(series.dtype)
+
+
+def pandas_memory(column):
+    """الذاكرة (deep) التي يشغلها العمود في pandas ونوعه هناك، دون تحويل العمود كاملاً"""
+    rows, fixed, dtype = memory_parts(column)
+    return int(round(rows + fixed)), dtype
+
+
+def compact_table(table):
+    """
+    الجدول بأنواع مدمجة مع تقرير الذاكرة لكل عمود:
+    [{'column', 'dtype_before', 'dtype_after', 'bytes_before', 'bytes_after'}, ...]
+    """
+    columns, report = [], []
+    for name, column in zip(table.column_names, table.columns):
+        bytes_before, dtype_before = pandas_memory(column)
+        target = compact_type(column)
+        if target is not None:
+            column = column.cast(target)
+            bytes_after, dtype_after = pandas_memory(column)
+        else:
+            bytes_after, dtype_after = bytes_before, dtype_before
+        columns.append(column)
+        report.append({
+            'column': name,
+            'dtype_before': dtype_before,
+            'dtype_after': dtype_after,
+            'bytes_before': bytes_before,
+            'bytes_after': bytes_after,
+        })
+    return pa.table(columns, names=table.column_names, metadata=table.schema.metadata), report
+
+
+def report_totals(report):
+    """مجموع الذاكرة قبل الضغط وبعده ونسبة التصغير"""
+    before = sum(row['bytes_before'] for row in report)
+    after = sum(row['bytes_after'] for row in report)
+    return {'bytes_before': before, 'bytes_after': after, 'ratio': before / after if after else 1.0}
+
+
+# ============================================================================
+# 3. الضغط على دفعات (ملفات لا تُحمّل كاملة في الذاكرة)
+# ============================================================================
+# صفوف العيّنة الأولى المحفوظة لكل عمود لحساب ذاكرته بعد الضغط
+PROBE_ROWS = 1024
+# الأنواع التي تُجرّب لعمود نصي بالترتيب (كما يستنتجها قارئ CSV)
+PARSED_KINDS = (pa.int64(), pa.float64(), pa.bool_())
+
+
+def compact_column(column, target, dictionary=None):
+    """تحويل عمود إلى نوعه المدمج؛ الفئات تُرمّز بقاموس ثابت إن مُرر (نفسه لكل الدفعات)"""
+    if dictionary is not None:
+        indices = pc.index_in(column, value_set=dictionary).cast(target.index_type)
+        return pa.DictionaryArray.from_arrays(indices, dictionary)
+    return column.cast(target)
+
+
+def widen_kind(current, kind):
+    """أضيق نوع يسع النوعين: null < int64 < float64، وأي خلط آخر نص (كعمود object في pandas)"""
+    if current == kind or pa.types.is_null(kind):
+        return current
+    if pa.types.is_null(current):
+        return kind
+    if {current, kind} == {pa.int64(), pa.float64()}:
+        return pa.float64()
+    return pa.string()
+
+
+def parse_column(column, kind):
+    """قيم عمود CSV المقروء كنص بالنوع kind (المسافات حول القيم تُهمل كما في قارئ CSV)"""
+    if pa.types.is_string(kind):
+        return column
+    if pa.types.is_null(kind):
+        return pa.nulls(len(column))
+    try:
+        return column.cast(kind)
+    except pa.ArrowInvalid:
+        # نسخة بلا مسافات فقط عند الحاجة (أغلب الملفات بلا مسافات حول الأعداد)
+        return pc.utf8_trim_whitespace(column).cast(kind)
+
+
+def infer_kind(column, current):
+    """
+    (النوع الذي يسع الدفعات السابقة (current) وقيم هذه الدفعة، قيم الدفعة بهذا النوع)؛
+    النوع الحالي يُجرّب أولاً فلا يُعاد تحويل الدفعة إلا حين يتسع
+    """
+    if column.null_count == len(column) or pa.types.is_string(current):
+        return current, parse_column(column, current)
+    for kind in ((current,) if current in PARSED_KINDS else ()) + PARSED_KINDS:
+        widened = widen_kind(current, kind)
+        if pa.types.is_string(widened):
+            continue
+        try:
+            parsed = parse_column(column, kind)
+        except pa.ArrowInvalid:
+            continue
+        return widened, parsed if widened == kind else parsed.cast(widened)
+    return pa.string(), column
+
+
+class StreamCompactor:
+    """
+    ضغط الأنواع لملف CSV يُقرأ كنص على دفعات، بمخطط واحد ثابت:
+        scan(batch) لكل دفعة في مرور أول، ثم finish() للمخطط المدمج وتقرير الذاكرة،
+        ثم compact(batch) لكل دفعة في مرور ثانٍ.
+    نوع كل عمود يُستنتج من كل الدفعات لا من الأولى وحدها (عدد عشري بعد ملايين الصفوف
+    الصحيحة يجعل العمود float64 كما في pd.read_csv). إذا اتسع النوع إلى نص بعد دفعات
+    مُسحت بنوع آخر، يُدرج العمود في stale ويُعاد مسحه بعد reset.
+    قاموس كل عمود فئات يُبنى من كل قيمه المختلفة في المرور الأول، فتتشارك الدفعات القاموس
+    نفسه كما تتطلب صيغة ملف Arrow IPC. الذاكرة قبل الضغط مجموع تقديرات الدفعات، وبعده من
+    عيّنة أولى مضغوطة (كلفة الصف بعد الضغط لا تتعلق بالقيم).
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.index = {name: idx for idx, name in enumerate(self.names)}
+        self.kinds = [pa.null()] * len(self.names)
+        self.scans = [ColumnScan(pa.null()) for _ in self.names]
+        self.bytes_before = [0.0] * len(self.names)
+        self.probes = [None] * len(self.names)
+        self.stale = set()
+        self.schema = None
+        self.targets = None
+
+    def scan(self, batch):
+        """مسح دفعة (أو بعض أعمدتها عند إعادة المسح) مقروءة كنص"""
+        for name, column in zip(batch.schema.names, batch.columns):
+            idx = self.index[name]
+            kind, column = infer_kind(column, self.kinds[idx])
+            if kind != self.kinds[idx]:
+                self._widen(idx, kind)
+
+            self.scans[idx].update(column)
+            self.bytes_before[idx] += memory_parts(column)[0]
+            probe = self.probes[idx]
+            if probe is None:
+                self.probes[idx] = probe = column.slice(0, PROBE_ROWS)
+            if column.null_count and not probe.null_count:
+                # قيمة مفقودة واحدة تكفي لتحديد نوع pandas (الأعداد الصحيحة تصبح float64)
+                self.probes[idx] = pa.concat_arrays([probe, pa.nulls(1, probe.type)])
+
+    def _widen(self, idx, kind):
+        """نقل ما مُسح بالنوع السابق إلى النوع الأوسع، أو تعليم العمود لإعادة المسح"""
+        previous, scan = self.kinds[idx], self.scans[idx]
+        self.kinds[idx] = kind
+        self.scans[idx] = widened = ColumnScan(kind)
+        widened.rows, widened.nulls = scan.rows, scan.nulls
+        if pa.types.is_null(previous):
+            # الدفعات السابقة كلها قيم مفقودة
+            if self.probes[idx] is not None:
+                self.probes[idx] = pa.nulls(len(self.probes[idx]), kind)
+        elif pa.types.is_int64(previous) and pa.types.is_float64(kind):
+            # كل عدد صحيح حتى 2²⁴ يُمثَّل في float32 تماماً
+            widened.float32_safe = scan.low is None or max(-scan.low, scan.high) <= 2 ** 24
+            self.probes[idx] = self.probes[idx].cast(kind)
+        else:
+            self.stale.add(self.names[idx])
+
+    def reset(self, names):
+        """تهيئة أعمدة stale لإعادة مسحها بنوعها النهائي"""
+        for name in names:
+            idx = self.index[name]
+            self.scans[idx] = ColumnScan(self.kinds[idx])
+            self.bytes_before[idx] = 0.0
+            self.probes[idx] = None
+        self.stale -= set(names)
+
+    def finish(self):
+        """(المخطط المدمج، تقرير الذاكرة بنفس حقول compact_table)"""
+        fields, report, self.targets = [], [], []
+        for name, kind, scan, bytes_before, probe in zip(self.names, self.kinds, self.scans, self.bytes_before,
+                                                         self.probes):
+            target = scan.target()
+            dictionary = scan.values if target is not None and pa.types.is_dictionary(target) else None
+            self.targets.append((kind, target, dictionary))
+
+            probe = probe if probe is not None else pa.array([], kind)
+            dtype_before = memory_parts(probe)[2]
+            if target is not None:
+                probe_rows, fixed, dtype_after = memory_parts(compact_column(probe, target, dictionary))
+                bytes_after = probe_rows * scan.rows / len(probe) + fixed if len(probe) else fixed
+            else:
+                bytes_after, dtype_after = bytes_before, dtype_before
+            fields.append(pa.field(name, target if target is not None else kind))
+            report.append({
+                'column': name,
+                'dtype_before': dtype_before,
+                'dtype_after': dtype_after,
+                'bytes_before': int(round(bytes_before)),
+                'bytes_after': int(round(bytes_after)),
+            })
+        self.schema = pa.schema(fields)
+        return self.schema, report
+
+    @property
+    def column_types(self):
+        """
+        أنواع قراءة المرور الثاني: الأعداد يحوّلها قارئ CSV مباشرة (أسرع من نص ثم تحويل)،
+        وبقية الأعمدة تبقى نصاً ويحوّلها parse_column كما في المرور الأول
+        """
+        return {name: kind if pa.types.is_integer(kind) or pa.types.is_floating(kind) else pa.string()
+                for name, kind in zip(self.names, self.kinds)}
+
+    def compact(self, batch):
+        """دفعة مقروءة بأنواع column_types بأنواعها النهائية المدمجة"""
+        columns = []
+        for column, (kind, target, dictionary) in zip(batch.columns, self.targets):
+            if column.type != kind:
+                column = parse_column(column, kind)
+            columns.append(column if target is None else compact_column(column, target, dictionary))
+        return pa.RecordBatch.from_arrays(columns, schema=self.schema)
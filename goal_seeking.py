@@ -0,0 +1,313 @@
+"""
+🎯 أقل تغيير يبلغ المستوى التالي
+لكل طالب: أصغر زيادة في ساعات الدراسة والحضور والدروس الخصوصية ترفع درجته المتوقعة إلى حد
+المستوى التالي (60 / 75 / 90). تكلفة الخطة مجموع الزيادات منسوبة إلى مدى كل خاصية
+(ساعة = 1/40، نقطة حضور = 1/100، جلسة = 1/10).
+
+- النموذج الخطي: حل تحليلي. القيد خطي واحد، فالأرخص البدء بالخاصية الأعلى أثراً لكل وحدة
+  تكلفة حتى حدها ثم التي تليها، مع تقريب آخر زيادة إلى وحدة كاملة.
+- SVR بنواة RBF: النواة تتفكك إلى عامل لكل خاصية، فلكل قيمة حضور تُقيَّم كل تركيبات الساعات والدروس
+  دفعة واحدة بضرب مصفوفات مع جداول عوامل محسوبة مرة لكل نموذج. قيم الحضور تُمسح تصاعدياً ويتوقف
+  الطالب حين تتجاوز تكلفة الحضور وحدها أرخص خطة وجدها، أو حين يثبت حد أعلى للنموذج على ما تبقى
+  من الشبكة أنه لا يبلغ هدفه.
+- النماذج الأخرى: بحث في كل الزيادات الصحيحة الممكنة مرتبة حسب التكلفة، على دفعات متضاعفة الحجم؛
+  أول زيادة كافية هي الأرخص فيتوقف البحث للطالب.
+- الميزانية الزمنية تُفحص قبل كل استدعاء بحجم محدود، فلا تتجاوزها الجولة إلا بزمن استدعاء واحد؛
+  من لم يُحسم عند نفادها يُعلَّم out_of_budget.
+"""
+
+import functools
+import os
+import time
+
+import numpy as np
+
+from prediction_lattice import ATTENDANCE_MAX, HOURS_MAX, TUTORING_MAX
+from scoring import GRADE_THRESHOLDS, clip_scores, grade_bands
+
+
+# الخاصيات القابلة للتغيير: أعمدتها في مصفوفة الميزات وحدودها العليا
+LEVER_COLUMNS = np.array([0, 1, 3])
+LEVER_MAX = np.array([HOURS_MAX, ATTENDANCE_MAX, TUTORING_MAX], dtype=float)
+STEP_COST = 1 / LEVER_MAX
+
+# الأعمدة الثابتة أثناء البحث (الدرجات السابقة وتأثير الأقران)
+FIXED_COLUMNS = np.array([2, 4])
+
+# ميزانية البحث لكل استدعاء (ثوانٍ) وحجم أول دفعة زيادات لكل طالب ثم آخر حجم تبلغه
+BUDGET_SECONDS = float(os.environ.get('GOAL_SEEK_BUDGET', 0.5))
+FIRST_BATCH = 64
+MAX_BATCH = 2048
+# أقصى عدد صفوف في استدعاء predict واحد (طلاب × زيادات)؛ يحدد أيضاً دقة الالتزام بالميزانية
+MAX_ROWS = 2048
+# بحث RBF: طلاب كل ضرب مصفوفات (كل منهم 451 تركيبة ساعات × دروس)، وطلاب كل كتلة أوزان
+SLICE_ROWS = 128
+SEPARABLE_ROWS = 1024
+
+REACHED, TOP_BAND, UNREACHABLE, OUT_OF_BUDGET = range(4)
+STATUSES = np.array(['reached', 'top_band', 'unreachable', 'out_of_budget'], dtype=object)
+
+
+# ============================================================================
+# 1. الأهداف والزيادات الممكنة
+# ============================================================================
+def next_targets(scores):
+    """حد المستوى التالي لكل درجة (NaN لمن هو في المستوى الأعلى)"""
+    band = grade_bands(scores)
+    top = band >= len(GRADE_THRESHOLDS)
+    return np.where(top, np.nan, GRADE_THRESHOLDS[np.minimum(band, len(GRADE_THRESHOLDS) - 1)])
+
+
+@functools.lru_cache(maxsize=None)
+def step_grid():
+    """كل الزيادات الصحيحة (ساعات، حضور، دروس) مرتبة تصاعدياً حسب التكلفة"""
+    axes = np.meshgrid(*(np.arange(limit + 1) for limit in LEVER_MAX.astype(int)), indexing='ij')
+    steps = np.stack([axis.ravel() for axis in axes], axis=1).astype(float)
+    steps = steps[np.argsort(steps @ STEP_COST, kind='stable')]
+    steps.setflags(write=False)
+    return steps
+
+
+def step_batches(total):
+    """حدود الدفعات: 64 ثم 128 ثم ... حتى MAX_BATCH (أغلب الطلاب يُحسمون في الدفعات الأولى)"""
+    start, size = 0, FIRST_BATCH
+    while start < total:
+        yield start, min(start + size, total)
+        start += size
+        size = min(size * 2, MAX_BATCH)
+
+
+def linear_coefficients(model):
+    """(المعاملات، الثابت) للنموذج الخطي المُصدَّر أو LinearRegression، وإلا None"""
+    if hasattr(model, 'coef') and hasattr(model, 'intercept'):
+        return np.asarray(model.coef, dtype=float), float(model.intercept)
+    if hasattr(model, 'coef_') and hasattr(model, 'intercept_'):
+        return np.ravel(model.coef_).astype(float), float(np.ravel(model.intercept_)[0])
+    return None
+
+
+# ============================================================================
+# 2. البحث
+# ============================================================================
+def _headroom(X):
+    """عدد الوحدات الكاملة المتاحة فوق القيمة الحالية لكل خاصية"""
+    return np.floor(np.clip(LEVER_MAX - X[:, LEVER_COLUMNS], 0, None))
+
+
+def _seek_linear(coef, intercept, X, targets):
+    """الزيادات المثلى لكل الصفوف معاً؛ تُرجع (الزيادات، هل بلغت الهدف)"""
+    lever_coef = coef[LEVER_COLUMNS]
+    headroom = _headroom(X)
+    gap = np.where(np.isnan(targets), 0, targets - (X @ coef + intercept))
+    steps = np.zeros((len(X), len(LEVER_COLUMNS)))
+
+    # الأثر لكل وحدة تكلفة يحدد الترتيب؛ الخاصيات ذات الأثر السالب لا تساعد
+    for j in np.argsort(-lever_coef / STEP_COST):
+        if lever_coef[j] <= 0:
+            break
+        needed = np.ceil(np.clip(gap, 0, None) / lever_coef[j] - 1e-9)
+        steps[:, j] = np.minimum(needed, headroom[:, j])
+        gap = gap - steps[:, j] * lever_coef[j]
+    return steps, gap <= 1e-9
+
+
+def _seek_grid(model, X, targets, deadline):
+    """
+    بحث دفعي لكل الصفوف التي لها هدف؛ تُرجع (الزيادات أو NaN، الدرجة عندها، الصفوف التي لم يكتمل
+    بحثها عند نفاد الميزانية).
+    في كل جولة تُقيَّم دفعة الزيادات التالية لكل الطلاب غير المحسومين، بما لا يتجاوز MAX_ROWS صفاً
+    لكل استدعاء predict.
+    """
+    grid = step_grid()
+    headroom = _headroom(X)
+    steps_found = np.full((len(X), len(LEVER_COLUMNS)), np.nan)
+    found_scores = np.full(len(X), np.nan)
+    pending = np.flatnonzero(~np.isnan(targets))
+
+    for start, stop in step_batches(len(grid)):
+        steps = grid[start:stop]
+        group = max(1, MAX_ROWS // len(steps))
+        for offset in range(0, len(pending), group):
+            if time.perf_counter() > deadline:
+                return steps_found, found_scores, np.isin(np.arange(len(X)), pending)
+            rows = pending[offset:offset + group]
+            # الزيادات التي تتجاوز حدود الخاصية لا تُحسب أصلاً
+            row_idx, step_idx = np.nonzero((steps[None] <= headroom[rows, None]).all(axis=2))
+            if not len(row_idx):
+                continue
+            candidates = X[rows[row_idx]]
+            candidates[:, LEVER_COLUMNS] += steps[step_idx]
+            scores = model.predict(candidates)
+
+            # np.nonzero يرتب حسب الطالب ثم الزيادة: أول نجاح لكل طالب هو الأرخص
+            hits = np.flatnonzero(scores >= targets[rows[row_idx]])
+            hit_rows, first = np.unique(row_idx[hits], return_index=True)
+            steps_found[rows[hit_rows]] = steps[step_idx[hits[first]]]
+            found_scores[rows[hit_rows]] = scores[hits[first]]
+        pending = pending[np.isnan(steps_found[pending, 0])]
+        if not len(pending):
+            break
+    return steps_found, found_scores, np.zeros(len(X), dtype=bool)
+
+
+def _separable(model, X):
+    """الصفوف التي يصلح لها بحث RBF: نموذج يوفر عوامل النواة، وقيم صحيحة داخل حدود الخاصيات"""
+    if not (hasattr(model, 'axis_kernels') and hasattr(model, 'partial_weights')):
+        return np.zeros(len(X), dtype=bool)
+    levers = X[:, LEVER_COLUMNS]
+    return ((levers == np.round(levers)) & (levers >= 0) & (levers <= LEVER_MAX)).all(axis=1)
+
+
+@functools.lru_cache(maxsize=4)
+def _kernel_tables(model):
+    """
+    جداول عوامل النواة لكل قيم الخاصيات الممكنة (مرة لكل نموذج):
+    pairs لكل تركيبات (ساعات، دروس)، attendance لكل قيمة حضور، وحدود كل خاصية فوق كل قيمة
+    (أكبر عامل لمعاملات α الموجبة وأصغره للسالبة) لحساب حد أعلى للنموذج على ما تبقى من الشبكة.
+    """
+    hours, attendance, tutoring = (np.arange(limit + 1) for limit in LEVER_MAX.astype(int))
+    factors = [model.axis_kernels(column, values)
+               for column, values in zip(LEVER_COLUMNS, (hours, attendance, tutoring))]
+    positive = np.asarray(model.dual_coef) > 0
+
+    def bound_above(factor):
+        # أكبر/أصغر عامل على القيم ≥ v لكل v
+        largest = np.maximum.accumulate(factor[::-1], axis=0)[::-1]
+        smallest = np.minimum.accumulate(factor[::-1], axis=0)[::-1]
+        return np.where(positive, largest, smallest)
+
+    return {
+        'pairs': (factors[0][:, None, :] * factors[2][None, :, :]).reshape(-1, factors[0].shape[1]),
+        'pair_steps': np.stack(np.meshgrid(hours, tutoring, indexing='ij'), axis=-1).reshape(-1, 2),
+        'attendance': factors[1],
+        'bounds': [bound_above(factor) for factor in factors],
+    }
+
+
+def prepare(model):
+    """بناء جداول البحث مسبقاً (للخدمات) حتى لا تستهلك ميزانية أول طلب"""
+    if hasattr(model, 'axis_kernels') and hasattr(model, 'partial_weights'):
+        _kernel_tables(model)
+
+
+def _seek_separable(model, X, targets, deadline):
+    """
+    أرخص زيادة لكل الصفوف (بقيم صحيحة) لنموذج RBF؛ نفس مخرجات _seek_grid.
+    الجولة k تقيّم حضور الطالب + k مع كل تركيبات الساعات والدروس المسموحة:
+        درجة = b + (وزن الصف ⊙ عامل الحضور) @ عوامل (ساعات × دروس)
+    """
+    tables = _kernel_tables(model)
+    pair_hours, pair_tutoring = tables['pair_steps'].T
+    bound_hours, bound_attendance, bound_tutoring = tables['bounds']
+    steps_found = np.full((len(X), len(LEVER_COLUMNS)), np.nan)
+    found_scores = np.full(len(X), np.nan)
+    best = np.full(len(X), np.inf)
+    levers = X[:, LEVER_COLUMNS].astype(int)
+    pending = np.flatnonzero(~np.isnan(targets))
+
+    for block_start in range(0, len(pending), SEPARABLE_ROWS):
+        if time.perf_counter() > deadline:
+            return steps_found, found_scores, np.isin(np.arange(len(X)), pending[block_start:])
+        rows = pending[block_start:block_start + SEPARABLE_ROWS]
+        hours, attendance, tutoring = levers[rows].T
+        weights = model.partial_weights(X[rows], FIXED_COLUMNS)
+        # حد النموذج الأعلى على الساعات والدروس المسموحة، ويُضرب لاحقاً بحد الحضور المتبقي
+        upper_weights = weights * bound_hours[hours] * bound_tutoring[tutoring]
+
+        # تكلفة كل تركيبة (ساعات، دروس) لكل طالب، ولا نهاية لما دون قيمه الحالية
+        hours_step = pair_hours[None, :] - hours[:, None]
+        tutoring_step = pair_tutoring[None, :] - tutoring[:, None]
+        pair_cost = np.where((hours_step >= 0) & (tutoring_step >= 0),
+                             hours_step * STEP_COST[0] + tutoring_step * STEP_COST[2], np.inf)
+
+        active = np.arange(len(rows))
+        for k in range(int(ATTENDANCE_MAX) + 1):
+            # تكلفة الحضور وحدها لا تقل عن أرخص خطة سابقة: لا خطة أرخص فيما تبقى
+            slice_cost = k * STEP_COST[1]
+            active = active[(attendance[active] + k <= ATTENDANCE_MAX) & (slice_cost < best[rows[active]])]
+            if len(active):
+                upper = (np.einsum('ij,ij->i', upper_weights[active], bound_attendance[attendance[active] + k])
+                         + model.intercept)
+                active = active[upper >= targets[rows[active]] - 1e-9]
+            if not len(active):
+                break
+
+            for offset in range(0, len(active), SLICE_ROWS):
+                if time.perf_counter() > deadline:
+                    unsettled = np.concatenate([rows[active], pending[block_start + len(rows):]])
+                    return steps_found, found_scores, np.isin(np.arange(len(X)), unsettled)
+                chunk = active[offset:offset + SLICE_ROWS]
+                scores = ((weights[chunk] * tables['attendance'][attendance[chunk] + k]) @ tables['pairs'].T
+                          + model.intercept)
+                cost = np.where(scores >= targets[rows[chunk], None], pair_cost[chunk], np.inf)
+                cheapest = cost.argmin(axis=1)
+                plan_cost = cost[np.arange(len(chunk)), cheapest] + slice_cost
+                better = plan_cost < best[rows[chunk]]
+
+                improved, pair = rows[chunk[better]], cheapest[better]
+                best[improved] = plan_cost[better]
+                steps_found[improved] = np.column_stack([
+                    hours_step[chunk[better], pair], np.full(len(pair), k), tutoring_step[chunk[better], pair]])
+                found_scores[improved] = scores[better, pair]
+    return steps_found, found_scores, np.zeros(len(X), dtype=bool)
+
+
+def seek_targets(model, X, scores=None, budget=None):
+    """
+    خطة كل صف من مصفوفة الميزات X (أعمدة FEATURE_COLUMNS):
+        {'target', 'recommended_hours', 'recommended_attendance', 'recommended_tutoring',
+         'expected_score', 'status'}
+    scores: الدرجات المعروضة التي يُحدد منها المستوى التالي (افتراضياً تنبؤ النموذج).
+    التوصيات هي القيم الجديدة؛ لمن في المستوى الأعلى القيم الحالية، ولمن تعذّرت خطته NaN.
+    """
+    X = np.asarray(X, dtype=float)
+    if scores is None:
+        scores = clip_scores(model.predict(X)) if len(X) else np.empty(0)
+    targets = next_targets(scores)
+    status = np.where(np.isnan(targets), TOP_BAND, REACHED)
+
+    coefficients = linear_coefficients(model)
+    if coefficients is not None:
+        coef, intercept = coefficients
+        steps, reached = _seek_linear(coef, intercept, X, targets)
+        planned = X.copy()
+        planned[:, LEVER_COLUMNS] += steps
+        expected = planned @ coef + intercept
+        status[~reached & (status == REACHED)] = UNREACHABLE
+    else:
+        deadline = time.perf_counter() + (BUDGET_SECONDS if budget is None else budget)
+        separable = _separable(model, X)
+        steps = np.full((len(X), len(LEVER_COLUMNS)), np.nan)
+        expected = np.full(len(X), np.nan)
+        unsettled = np.zeros(len(X), dtype=bool)
+        for search, rows in ((_seek_separable, separable), (_seek_grid, ~separable)):
+            if rows.any():
+                steps[rows], expected[rows], unsettled[rows] = search(model, X[rows], targets[rows], deadline)
+        # من لم تُوجد له خطة: بحث مكتمل يعني أنه لا يبلغ هدفه، وإلا نفدت الميزانية قبل حسمه
+        missing = np.isnan(steps[:, 0]) & (status == REACHED)
+        status[missing] = np.where(unsettled[missing], OUT_OF_BUDGET, UNREACHABLE)
+
+    recommended = np.where((status == REACHED)[:, None], X[:, LEVER_COLUMNS] + steps, np.nan)
+    recommended[status == TOP_BAND] = X[status == TOP_BAND][:, LEVER_COLUMNS]
+    return {
+        'target': targets,
+        'recommended_hours': recommended[:, 0],
+        'recommended_attendance': recommended[:, 1],
+        'recommended_tutoring': recommended[:, 2],
+        'expected_score': np.where(status == REACHED, clip_scores(expected), np.nan),
+        'status': STATUSES[status],
+    }
+
+
+def seek_target(model, features, score=None, budget=None):
+    """خطة طالب واحد كقاموس قيم عادية (None بدل NaN)"""
+    plan = seek_targets(model, np.asarray([features], dtype=float),
+                        None if score is None else np.array([score], dtype=float), budget)
+    return {name: _scalar(values[0]) for name, values in plan.items()}
+
+
+def _scalar(value):
+    if isinstance(value, str):
+        return value
+    value = float(value)
+    return None if np.isnan(value) else value
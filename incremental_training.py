@@ -0,0 +1,290 @@
+"""
+🌊 تدريب تدريجي على ملفات CSV أكبر من الذاكرة
+الملفات تُقرأ على دفعات فلا يتجاوز استهلاك الذاكرة دفعة واحدة: قراءة أولى تبني مقياساً معيارياً
+متراكماً (StandardScaler.partial_fit) ثم يثبت، وبعدها دورات منحدر تدرجي عشوائي (SGDRegressor.partial_fit)
+على البيانات المعايرة. الحالة تُحفظ دورياً في نقطة استئناف، وعند الانتهاء تُطوى المعايرة في معاملات
+نموذج خطي يُنشر كإصدار جديد للنموذج الخطي (مع مجموعة bootstrap من عينة الدورة الأخيرة) ويُخدم من
+نفس مسار predict_score.
+
+الاستخدام:
+    python incremental_training.py 2021.csv 2022.csv 2023.csv --epochs 3 [--publish]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+CHECKPOINT_PATH = Path('.cache') / 'incremental' / 'checkpoint.pkl'
+CHECKPOINT_VERSION = 2
+CHUNK_ROWS = 50_000
+CHECKPOINT_EVERY = 10  # دفعات
+# صفوف العينة العشوائية (reservoir) من الدورة الأخيرة لبناء مجموعة bootstrap عند النشر
+SAMPLE_ROWS = 100_000
+
+
+# ============================================================================
+# 1. حالة التدريب
+# ============================================================================
+class IncrementalState:
+    """
+    المقياس والنموذج وموضع القراءة: (الدورة، رقم الملف، الصفوف المقروءة منه)؛ الموضع يخص
+    قراءة المقياس حتى يكتمل (scaler_ready) ثم دورات التدريب.
+    بصمة الملفات (المسار والحجم ووقت التعديل) تمنع الاستئناف على بيانات تغيّرت.
+    """
+
+    def __init__(self, sources, params):
+        from sklearn.linear_model import SGDRegressor
+        from sklearn.preprocessing import StandardScaler
+
+        self.version = CHECKPOINT_VERSION
+        self.sources = sources
+        self.params = params
+        self.scaler = StandardScaler()
+        self.scaler_ready = False
+        self.model = SGDRegressor(
+            alpha=params['alpha'], eta0=params['eta0'], learning_rate='invscaling', random_state=0,
+        )
+        self.epoch = 0
+        self.file_index = 0
+        self.file_rows = 0
+        self.rows_seen = 0
+        self.seconds = 0.0
+        # خطأ كل دفعة قبل التدريب عليها (تقييم تتابعي بلا بيانات تقييم منفصلة)
+        self.chunk_mae = []
+        # عينة reservoir من صفوف الدورة الأخيرة (غير معايرة) وعدد الصفوف التي مرت عليها
+        self.sample_epoch = None
+        self.sample_X = None
+        self.sample_y = None
+        self.sample_seen = 0
+
+    @property
+    def fitted(self):
+        return hasattr(self.model, 'coef_')
+
+    def save(self, path):
+        import joblib
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        joblib.dump(self, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def resume(cls, path, sources, params):
+        """الحالة المحفوظة إذا كانت لنفس الملفات والمعاملات، وإلا حالة جديدة"""
+        import joblib
+
+        if Path(path).exists():
+            state = joblib.load(path)
+            if (getattr(state, 'version', None) == CHECKPOINT_VERSION and state.sources == sources
+                    and state.params == params):
+                return state
+        return cls(sources, params)
+
+
+def source_fingerprints(paths):
+    fingerprints = []
+    for path in paths:
+        stat = os.stat(path)
+        fingerprints.append((os.path.abspath(path), stat.st_size, stat.st_mtime_ns))
+    return fingerprints
+
+
+# ============================================================================
+# 2. التدريب على الدفعات
+# ============================================================================
+def iter_chunks(state, chunksize):
+    """دفعات الدورة الحالية بدءاً من موضع الاستئناف: (رقم الملف، الصفوف المقروءة بعدها، الإطار)"""
+    import pandas as pd
+
+    for file_index in range(state.file_index, len(state.sources)):
+        path = state.sources[file_index][0]
+        skip = state.file_rows if file_index == state.file_index else 0
+        # تخطي الصفوف المدرّبة سابقاً دون تحويلها إلى إطارات (السطر الأول هو العناوين)
+        reader = pd.read_csv(path, chunksize=chunksize, skiprows=range(1, skip + 1) if skip else None)
+        rows = skip
+        for frame in reader:
+            if frame.empty:
+                continue
+            rows += len(frame)
+            yield file_index, rows, frame
+
+
+def update_sample(state, X, y, rng, size=SAMPLE_ROWS):
+    """
+    عينة reservoir (الخوارزمية R) متجهياً: الصف رقم i يحل محل خانة عشوائية j < i
+    إذا كانت j ضمن حجم العينة، فيبقى كل صف مر بالدورة في العينة بالاحتمال نفسه.
+    """
+    if state.sample_X is None:
+        state.sample_X = np.empty((0, X.shape[1]))
+        state.sample_y = np.empty(0)
+    free = min(size - len(state.sample_y), len(y))
+    if free > 0:
+        state.sample_X = np.concatenate([state.sample_X, X[:free]])
+        state.sample_y = np.concatenate([state.sample_y, y[:free]])
+    slots = rng.integers(0, state.sample_seen + np.arange(free, len(y)) + 1)
+    keep = slots < size
+    state.sample_X[slots[keep]] = X[free:][keep]
+    state.sample_y[slots[keep]] = y[free:][keep]
+    state.sample_seen += len(y)
+
+
+def fit_scaler(state, chunksize, default_peer, checkpoint, checkpoint_every, stream):
+    """
+    قراءة خاصة بالمقياس قبل أي خطوة تدرج: لو تراكم أثناء الدورة الأولى لتدربت المعاملات
+    الأولى على معايرة غير التي تُطوى فيها عند النشر.
+    """
+    from model_training import chunk_matrix
+
+    chunks_since_checkpoint = 0
+    for file_index, rows, frame in iter_chunks(state, chunksize):
+        X, y = chunk_matrix(frame, 'linear', default_peer)
+        if len(y):
+            state.scaler.partial_fit(X)
+        state.file_index, state.file_rows = file_index, rows
+        chunks_since_checkpoint += 1
+        if chunks_since_checkpoint >= checkpoint_every:
+            state.save(checkpoint)
+            chunks_since_checkpoint = 0
+
+    state.scaler_ready = True
+    state.file_index, state.file_rows = 0, 0
+    state.save(checkpoint)
+    rows = int(np.max(state.scaler.n_samples_seen_)) if hasattr(state.scaler, 'mean_') else 0
+    print(f"scaler fitted on {rows:,} rows", file=stream)
+
+
+def train_incremental(paths, epochs=1, chunksize=CHUNK_ROWS, alpha=1e-4, eta0=0.01,
+                      checkpoint=CHECKPOINT_PATH, checkpoint_every=CHECKPOINT_EVERY, sample_rows=SAMPLE_ROWS,
+                      stream=sys.stderr):
+    """تدريب (أو استئناف تدريب) حتى اكتمال عدد الدورات؛ تُرجع الحالة النهائية"""
+    from model_backends import BACKENDS
+    from model_training import chunk_matrix
+
+    params = {'alpha': alpha, 'eta0': eta0, 'chunksize': chunksize}
+    state = IncrementalState.resume(checkpoint, source_fingerprints(paths), params)
+    if state.rows_seen and state.epoch < epochs:
+        print(f"resuming at epoch {state.epoch + 1}, file {state.file_index + 1}, row {state.file_rows:,}",
+              file=stream)
+
+    default_peer = BACKENDS['linear'].default_peer
+    if not state.scaler_ready:
+        fit_scaler(state, chunksize, default_peer, checkpoint, checkpoint_every, stream)
+
+    rng = np.random.default_rng(state.rows_seen)
+    chunks_since_checkpoint = 0
+    while state.epoch < epochs:
+        last_epoch = state.epoch == epochs - 1
+        if last_epoch and state.sample_epoch != state.epoch:
+            # عينة جديدة لكل دورة أخيرة (عدد الدورات قد يزيد عند الاستئناف)
+            state.sample_epoch, state.sample_X, state.sample_y, state.sample_seen = state.epoch, None, None, 0
+
+        # الزمن من نهاية الدفعة السابقة: قراءة CSV وتحليله جزء من الإنتاجية
+        start = time.perf_counter()
+        for file_index, rows, frame in iter_chunks(state, chunksize):
+            X, y = chunk_matrix(frame, 'linear', default_peer)
+            if len(y):
+                # الملفات قد تكون مرتبة (حسب السنة أو المدرسة): خلط صفوف الدفعة قبل التدرج
+                order = rng.permutation(len(y))
+                X, y = X[order], y[order]
+                X_scaled = state.scaler.transform(X)
+                if state.fitted:
+                    state.chunk_mae.append(float(np.abs(state.model.predict(X_scaled) - y).mean()))
+                state.model.partial_fit(X_scaled, y)
+                if last_epoch:
+                    update_sample(state, X, y, rng, sample_rows)
+            now = time.perf_counter()
+            elapsed, start = now - start, now
+
+            state.file_index, state.file_rows = file_index, rows
+            state.rows_seen += len(frame)
+            state.seconds += elapsed
+            print(f"epoch {state.epoch + 1} file {file_index + 1} rows {rows:,}: "
+                  f"{len(frame) / elapsed if elapsed else 0:,.0f} rows/s"
+                  + (f", MAE {state.chunk_mae[-1]:.3f}" if state.chunk_mae else ""), file=stream)
+
+            chunks_since_checkpoint += 1
+            if chunks_since_checkpoint >= checkpoint_every:
+                state.save(checkpoint)
+                chunks_since_checkpoint = 0
+
+        state.epoch += 1
+        state.file_index, state.file_rows = 0, 0
+        state.save(checkpoint)
+        chunks_since_checkpoint = 0
+
+    print(f"{state.rows_seen:,} rows in {state.seconds:.1f}s "
+          f"({state.rows_seen / state.seconds if state.seconds else 0:,.0f} rows/s)", file=stream)
+    return state
+
+
+# ============================================================================
+# 3. النموذج القابل للخدمة
+# ============================================================================
+def to_linear_regression(state):
+    """
+    طي المعايرة في المعاملات: w·(x - μ)/σ + b = (w/σ)·x + (b - Σ w·μ/σ)
+    فينتج LinearRegression عادي يخدمه predict_score ويُصدَّر إلى JSON كالنموذج الحالي.
+    """
+    from sklearn.linear_model import LinearRegression
+
+    if not state.fitted:
+        raise ValueError("لم يتم تدريب النموذج بعد")
+    coef = state.model.coef_ / state.scaler.scale_
+    model = LinearRegression()
+    model.coef_ = coef
+    model.intercept_ = float(state.model.intercept_[0] - coef @ state.scaler.mean_)
+    model.n_features_in_ = len(coef)
+    return model
+
+
+def publish(state):
+    """
+    نشر النموذج كإصدار جديد للانحدار الخطي في سجل النماذج، مع مجموعة bootstrap لفترات
+    التنبؤ مبنية على عينة الدورة الأخيرة
+    """
+    from model_training import publish_estimator
+
+    mae = state.chunk_mae[-1] if state.chunk_mae else None
+    data = (state.sample_X, state.sample_y) if state.sample_y is not None and len(state.sample_y) else None
+    return publish_estimator('linear', to_linear_regression(state), {
+        'source': 'incremental',
+        'rows_seen': state.rows_seen,
+        'sample_rows': len(data[1]) if data is not None else 0,
+        'metrics': {'mae': mae} if mae is not None else {},
+    }, data=data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="تدريب تدريجي على ملفات CSV كبيرة")
+    parser.add_argument('csv', nargs='+', help="ملفات البيانات بالترتيب (تحتوي على Exam_Score)")
+    parser.add_argument('--epochs', type=int, default=1)
+    parser.add_argument('--chunksize', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--alpha', type=float, default=1e-4, help="معامل التنظيم L2")
+    parser.add_argument('--eta0', type=float, default=0.01, help="معدل التعلم الابتدائي")
+    parser.add_argument('--checkpoint', default=str(CHECKPOINT_PATH))
+    parser.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_EVERY, help="عدد الدفعات بين كل حفظ")
+    parser.add_argument('--sample-rows', type=int, default=SAMPLE_ROWS,
+                        help="حجم عينة الدورة الأخيرة لمجموعة bootstrap عند النشر")
+    parser.add_argument('--restart', action='store_true', help="تجاهل نقطة الاستئناف المحفوظة")
+    parser.add_argument('--publish', action='store_true', help="نشر النموذج كنموذج الانحدار الخطي")
+    args = parser.parse_args(argv)
+
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    state = train_incremental(args.csv, epochs=args.epochs, chunksize=args.chunksize, alpha=args.alpha,
+                              eta0=args.eta0, checkpoint=args.checkpoint,
+                              checkpoint_every=args.checkpoint_every, sample_rows=args.sample_rows)
+    if args.publish:
+        version = publish(state)
+        print(f"published linear/{version} ({state.rows_seen:,} rows seen)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+🔤 خطوط Tajawal و Cairo مستضافة محلياً
+تُخدم من مجلد static/fonts عبر خدمة الملفات الثابتة في Streamlit
+(server.enableStaticServing في .streamlit/config.toml) بدلاً من fonts.googleapis.com
+الذي لا تصل إليه شبكات المدارس غير المتصلة فيتعطل أول عرض للصفحة. قبل تنزيل الملفات
+تُعرض الصفحة بخطوط النظام (SYSTEM_FONTS) دون أي طلب خارجي.
+
+تنزيل الملفات مرة واحدة على جهاز متصل بالإنترنت:
+    python local_fonts.py --download
+"""
+
+import argparse
+import os
+import re
+import sys
+from pathlib import Path
+
+
+FONTS_DIR = Path(__file__).resolve().parent / 'static' / 'fonts'
+STYLESHEET_NAME = 'fonts.css'
+# مسار الملفات الثابتة كما يخدمها Streamlit
+STATIC_URL = 'app/static/fonts'
+
+FAMILIES = {
+    'Tajawal': (300, 400, 500, 600, 700, 800),
+    'Cairo': (400, 600, 700),
+}
+# خطوط عربية مثبتة مع أنظمة التشغيل الشائعة (Windows و Android/Linux و macOS)،
+# تلي Tajawal و Cairo في font-family
+SYSTEM_FONTS = "'Segoe UI', Tahoma, 'Noto Sans Arabic', 'Geeza Pro', sans-serif"
+# الأوزان التي تظهر في أول عرض (النص العادي والعناوين) تُحمّل مسبقاً
+PRELOAD = (('Tajawal', 400), ('Tajawal', 700))
+
+GOOGLE_CSS_URL = 'https://fonts.googleapis.com/css2?{families}&display=swap'
+# وكيل مستخدم حديث حتى تُرجع Google ملفات woff2
+WOFF2_USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                    '(KHTML, like Gecko) Chrome/120.0 Safari/537.36')
+
+
+def font_filename(family, weight):
+    return f"{family}-{weight}.woff2"
+
+
+# ============================================================================
+# 1. وسوم HTML للصفحة
+# ============================================================================
+def font_links():
+    """
+    وسوم التحميل المسبق وورقة الأنماط المحلية. إذا لم تُنزّل الخطوط بعد يُرجع نصاً فارغاً
+    فتُعرض الصفحة بخطوط النظام الاحتياطية؛ لا يُضاف أبداً طلب يحجب العرض إلى نطاق خارجي.
+    """
+    if not (FONTS_DIR / STYLESHEET_NAME).exists():
+        return ''
+    links = [
+        f'<link rel="preload" href="{STATIC_URL}/{font_filename(family, weight)}" '
+        f'as="font" type="font/woff2" crossorigin>'
+        for family, weight in PRELOAD
+        if (FONTS_DIR / font_filename(family, weight)).exists()
+    ]
+    links.append(f'<link rel="stylesheet" href="{STATIC_URL}/{STYLESHEET_NAME}">')
+    return '\n'.join(links)
+
+
+# ============================================================================
+# 2. التنزيل
+# ============================================================================
+def build_stylesheet(faces):
+    """ورقة أنماط @font-face واحدة لكل الأوزان بمسارات نسبية إلى مجلد الخطوط"""
+    rules = []
+    for family, weight in faces:
+        rules.append(
+            "@font-face {\n"
+            f"  font-family: '{family}';\n"
+            "  font-style: normal;\n"
+            f"  font-weight: {weight};\n"
+            "  font-display: swap;\n"
+            f"  src: url('{font_filename(family, weight)}') format('woff2');\n"
+            "}"
+        )
+    return '\n'.join(rules) + '\n'
+
+
+def download(fonts_dir=FONTS_DIR, timeout=30, stream=sys.stderr):
+    """
+    تنزيل ملفات woff2 من Google Fonts. تُحفظ الشريحة العربية فقط لكل وزن
+    (تغطي العربية والأرقام) مع الإبقاء على أي ملفات موجودة مسبقاً.
+    """
+    from urllib.request import Request, urlopen
+
+    fonts_dir.mkdir(parents=True, exist_ok=True)
+    faces = []
+    for family, weights in FAMILIES.items():
+        query = f"family={family}:wght@{';'.join(str(w) for w in weights)}"
+        request = Request(GOOGLE_CSS_URL.format(families=query), headers={'User-Agent': WOFF2_USER_AGENT})
+        css = urlopen(request, timeout=timeout).read().decode('utf-8')
+
+        # كتل @font-face مسبوقة بتعليق اسم الشريحة (/* arabic */ و /* latin */ ...)
+        for subset, block in re.findall(r'/\* ([\w-]+) \*/\s*(@font-face\s*\{.*?\})', css, flags=re.S):
+            if subset != 'arabic':
+                continue
+            weight = int(re.search(r'font-weight:\s*(\d+)', block).group(1))
+            url = re.search(r'url\((\S+?)\)', block).group(1)
+            target = fonts_dir / font_filename(family, weight)
+            tmp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(urlopen(url, timeout=timeout).read())
+            os.replace(tmp_path, target)
+            faces.append((family, weight))
+            print(f"{target.name}: {target.stat().st_size} bytes", file=stream)
+
+    (fonts_dir / STYLESHEET_NAME).write_text(build_stylesheet(faces), encoding='utf-8')
+    return faces
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="خطوط Tajawal و Cairo المحلية")
+    parser.add_argument('--download', action='store_true', help="تنزيل ملفات الخطوط وبناء fonts.css")
+    args = parser.parse_args()
+    if args.download:
+        download()
+    else:
+        if not (FONTS_DIR / STYLESHEET_NAME).exists():
+            print("الخطوط غير منزّلة بعد (تُستخدم خطوط النظام): python local_fonts.py --download", file=sys.stderr)
+        print(font_links())
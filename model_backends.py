@@ -0,0 +1,143 @@
+"""
+🔌 واجهات النماذج القابلة للتبديل
+ربط خيارات "نوع النموذج" في الإعدادات بملفات نماذج حقيقية تُحمّل عند أول استخدام
+"""
+
+import os
+from pathlib import Path
+
+from model_cache import fresh_exports, get_model_cache, joblib_load
+from model_registry import get_model_registry
+
+
+# ============================================================================
+# 1. تعريف الواجهات
+# ============================================================================
+class ModelBackend:
+    """
+    نموذج قابل للخدمة: ملفاته في الإصدار الحالي من سجل النماذج ودالة تحميلها والقيمة
+    الافتراضية لتأثير الأقران. الملفات المُصدَّرة (exported) مرتبة حسب الأفضلية،
+    ويُخدم من أول ملف صُدّر من ملف pickle الحالي نفسه (بصمته في بيان exports.json).
+    """
+
+    def __init__(self, key, label, source, loader, default_peer, exported=()):
+        self.key = key
+        self.label = label
+        self.source_name = source
+        self.source_loader = loader
+        self.default_peer = default_peer
+        self.exported = tuple(exported)
+        # (مجلد الإصدار، الملف المُخدم منه): مجلدات الإصدارات لا تتغير بعد نشرها
+        self._served_in = None
+
+    @property
+    def artifact_names(self):
+        """أسماء كل ملفات النموذج داخل مجلد الإصدار"""
+        return [self.source_name] + [name for name, _ in self.exported]
+
+    def _directory(self):
+        # من مجلد العمل يُستورد ملف pickle وحده، والملفات المُصدَّرة تُبنى منه
+        return get_model_registry().directory(self.key, legacy=[self.source_name], build=self.build_exports)
+
+    def build_exports(self, directory):
+        """كتابة الملفات المُصدَّرة وبيانها من ملف pickle الموجود في المجلد"""
+        import joblib
+        from model_training import write_exports
+
+        write_exports(self.key, joblib.load(Path(directory) / self.source_name), directory)
+
+    def artifact_path(self, name):
+        return str(self._directory() / name)
+
+    @property
+    def source_path(self):
+        return self.artifact_path(self.source_name)
+
+    def _served(self):
+        """
+        (المسار، دالة التحميل) للملف الذي يُخدم منه النموذج حالياً؛ الإصدار يُحدد مرة واحدة
+        لكل استدعاء فتأتي كل المسارات من الإصدار نفسه
+        """
+        directory = self._directory()
+        served_in = self._served_in
+        if served_in is not None and served_in[0] == directory:
+            return served_in[1]
+
+        fresh = fresh_exports(directory, self.source_name)
+        served = next(((str(directory / name), loader) for name, loader in self.exported if name in fresh),
+                      (str(directory / self.source_name), self.source_loader))
+        if directory != Path():
+            self._served_in = (directory, served)
+        return served
+
+    @property
+    def uses_export(self):
+        return self._served()[1] is not self.source_loader
+
+    @property
+    def path(self):
+        return self._served()[0]
+
+    @property
+    def loader(self):
+        return self._served()[1]
+
+    @property
+    def available(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        """النموذج من الذاكرة المشتركة (يُحمّل عند أول طلب فقط)"""
+        return get_model_cache().get(*self._served())
+
+    def fingerprint(self):
+        """بصمة محتوى ملف النموذج الحالي"""
+        return get_model_cache().fingerprint(*self._served())
+
+
+# ============================================================================
+# 2. دوال التحميل (تستورد NumPy عند أول تحميل، و joblib و sklearn عند التحميل من pickle فقط)
+#    ملفات joblib تُفتح بـ mmap_mode='r': المصفوفات الكبيرة صفحات مشتركة بين العمليات
+# ============================================================================
+def load_linear_export(path):
+    from model_export import load_linear_json
+    return load_linear_json(path)
+
+
+def load_svr_export(path):
+    from model_export import load_svr_npz
+    return load_svr_npz(path)
+
+
+def load_svr_engine_export(path):
+    from model_export import load_svr_engine_mmap
+    return load_svr_engine_mmap(path)
+
+
+def load_svr_engine(path):
+    from svr_engine import load_bundle_engine
+    return load_bundle_engine(path)
+
+
+# نموذج SVR دُرّب على تأثير أقران مُرمّز 0-2 (سلبي/محايد/إيجابي)
+BACKENDS = {
+    'linear': ModelBackend('linear', "انحدار خطي", 'regression_model.pkl', joblib_load, default_peer=3,
+                           exported=[('regression_model.json', load_linear_export)]),
+    'svr': ModelBackend('svr', "آلة متجهات الدعم (SVR)", 'student_model_bundle.pkl', load_svr_engine, default_peer=1,
+                        exported=[('student_model_svr.joblib', load_svr_engine_export),
+                                  ('student_model_svr.npz', load_svr_export)]),
+}
+DEFAULT_BACKEND = 'linear'
+
+
+# ============================================================================
+# 3. الاختيار
+# ============================================================================
+def available_backends():
+    """مفاتيح الواجهات التي توجد ملفات نماذجها"""
+    return [key for key, backend in BACKENDS.items() if backend.available]
+
+
+def get_backend(key=None):
+    """الواجهة المطلوبة، أو الافتراضية إذا كان المفتاح غير معروف"""
+    return BACKENDS.get(key) or BACKENDS[DEFAULT_BACKEND]
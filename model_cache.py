@@ -0,0 +1,223 @@
+"""
+📦 ذاكرة النماذج المشتركة على مستوى العملية
+تحميل كل نموذج مرة واحدة ومشاركته بين جميع الجلسات مع إعادة التحميل عند تغيّر الملف
+وإخراج النماذج الأقل استخداماً (LRU) عند تجاوز الحد الأقصى لعددها
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+# ============================================================================
+# 1. سجل النموذج المحمّل
+# ============================================================================
+class _CachedModel:
+    """نموذج محمّل مع بصمة الملف الذي حُمّل منه"""
+
+    __slots__ = ('model', 'mtime_ns', 'size', 'sha256', 'load_seconds', 'loaded_at')
+
+    def __init__(self, model, mtime_ns, size, sha256, load_seconds):
+        self.model = model
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.sha256 = sha256
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+
+
+def joblib_load(path):
+    """المحمّل الافتراضي (استيراد joblib مؤجل حتى أول تحميل، والمصفوفات تُفتح بـ mmap)"""
+    import joblib
+    return joblib.load(path, mmap_mode='r')
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """حساب البصمة SHA-256 لمحتوى الملف"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# بيان الملفات المُصدَّرة في مجلد كل إصدار: اسم ملف المصدر وبصمته وأسماء ما صُدّر منه
+EXPORT_MANIFEST = 'exports.json'
+
+
+def fresh_exports(directory, source_name):
+    """
+    أسماء الملفات المُصدَّرة من ملف المصدر الموجود نفسه (بصمته تطابق البيان)، لا من أوقات
+    التعديل: بعد git clone أو النسخ تصبح أوقات التعديل مجرد ترتيب كتابة الملفات
+    """
+    directory = os.fspath(directory)
+    try:
+        with open(os.path.join(directory, EXPORT_MANIFEST), encoding='utf-8') as fh:
+            manifest = json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return set()
+    source_path = os.path.join(directory, source_name)
+    if manifest.get('source') != source_name:
+        return set()
+    if os.path.exists(source_path) and file_sha256(source_path) != manifest.get('source_sha256'):
+        return set()
+    return {name for name in manifest.get('exports', []) if os.path.exists(os.path.join(directory, name))}
+
+
+# ============================================================================
+# 2. ذاكرة النماذج
+# ============================================================================
+class ModelCache:
+    """
+    ذاكرة نماذج آمنة للخيوط.
+    يُعاد تحميل النموذج فقط إذا تغيّر وقت تعديل الملف أو حجمه ثم تغيّرت بصمة محتواه.
+    """
+
+    def __init__(self, loader=joblib_load, max_entries=None):
+        self._loader = loader
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        # قفل لكل ملف قيد التحميل حالياً
+        self._loading = {}
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.evictions = 0
+        self.total_load_seconds = 0.0
+
+    def get(self, path, loader=None):
+        """
+        إرجاع النموذج المخزّن أو تحميله من القرص عند الحاجة.
+        حساب البصمة والتحميل يجريان خارج القفل العام حتى لا يوقفا طلبات النماذج الأخرى،
+        وقفل لكل ملف يضمن تحميلاً واحداً مهما تزامنت الطلبات عليه.
+        """
+        loader = loader or self._loader
+        path = os.path.abspath(path)
+        key = (path, loader)
+
+        with self._lock:
+            model = self._hit(key, os.stat(path))
+            if model is not None:
+                return model
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        with load_lock:
+            try:
+                return self._load(key, loader)
+            finally:
+                with self._lock:
+                    if self._loading.get(key) is load_lock:
+                        del self._loading[key]
+
+    def _hit(self, key, stat):
+        """النموذج المخزّن إذا لم يتغير وقت تعديل ملفه ولا حجمه، وإلا None (يُستدعى تحت القفل)"""
+        entry = self._entries.get(key)
+        if entry is None or entry.mtime_ns != stat.st_mtime_ns or entry.size != stat.st_size:
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.model
+
+    def _load(self, key, loader):
+        """التحميل تحت قفل الملف: قد يكون خيط آخر حمّله أثناء الانتظار"""
+        path = key[0]
+        stat = os.stat(path)
+        with self._lock:
+            model = self._hit(key, stat)
+            if model is not None:
+                return model
+            entry = self._entries.get(key)
+
+        # تغيّر وقت التعديل: نتحقق من المحتوى قبل إعادة التحميل
+        sha256 = file_sha256(path)
+        if entry is not None and sha256 == entry.sha256:
+            with self._lock:
+                entry.mtime_ns = stat.st_mtime_ns
+                entry.size = stat.st_size
+                self.hits += 1
+                return entry.model
+
+        start = time.perf_counter()
+        model = loader(path)
+        load_seconds = time.perf_counter() - start
+
+        with self._lock:
+            if entry is not None:
+                self.reloads += 1
+            self.misses += 1
+            self.total_load_seconds += load_seconds
+            self._entries[key] = _CachedModel(model, stat.st_mtime_ns, stat.st_size, sha256, load_seconds)
+            self._entries.move_to_end(key)
+            self._evict()
+        return model
+
+    def fingerprint(self, path, loader=None):
+        """بصمة SHA-256 لملف النموذج المحمّل حالياً (بعد التحقق من حداثته)"""
+        loader = loader or self._loader
+        self.get(path, loader)
+        with self._lock:
+            entry = self._entries.get((os.path.abspath(path), loader))
+            return entry.sha256 if entry is not None else file_sha256(path)
+
+    def _evict(self):
+        """إخراج النماذج الأقل استخداماً حتى لا يتجاوز عددها الحد الأقصى"""
+        if self.max_entries is None:
+            return
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, path=None):
+        """حذف نموذج محدد أو جميع النماذج من الذاكرة"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                path = os.path.abspath(path)
+                for key in [key for key in self._entries if key[0] == path]:
+                    del self._entries[key]
+
+    def stats(self):
+        """إحصائيات الاستخدام: الإصابات والإخفاقات وأزمنة التحميل"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'reloads': self.reloads,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'total_load_seconds': self.total_load_seconds,
+                'models': {
+                    path: {
+                        'sha256': entry.sha256,
+                        'load_seconds': entry.load_seconds,
+                        'loaded_at': entry.loaded_at,
+                    }
+                    for (path, _), entry in self._entries.items()
+                },
+            }
+
+
+# ============================================================================
+# 3. النسخة المشتركة للعملية
+# ============================================================================
+# الحد الأقصى لعدد النماذج المحمّلة في كل عملية (قابل للتعديل عبر متغير البيئة)
+MAX_CACHED_MODELS = int(os.environ.get('MODEL_CACHE_MAX_ENTRIES', 2))
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_model_cache():
+    """إرجاع ذاكرة النماذج المشتركة بين جميع جلسات العملية"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                _shared_cache = ModelCache(max_entries=MAX_CACHED_MODELS)
+    return _shared_cache
@@ -0,0 +1,212 @@
+"""
+📤 تصدير النماذج إلى صيغة مدمجة وخدمتها بـ NumPy فقط
+النموذج الخطي إلى JSON (المعاملات والثابت وأسماء الخصائص)، ونموذج SVR إلى npz
+(متجهات الدعم والمعاملات الثنائية وgamma والثابت)، حتى لا يحتاج مسار الخدمة
+إلى sklearn أو pickle.
+
+محرك SVR يُحفظ أيضاً بمصفوفاته الجاهزة في ملف joblib غير مضغوط يُفتح بـ mmap_mode،
+فتتشارك عمليات الخادم نسخة فعلية واحدة من متجهات الدعم.
+
+التدريب يكتب الملفات المُصدَّرة مع كل إصدار جديد في سجل النماذج (ومع بيانها exports.json
+ببصمة ملف pickle)، واستيراد ملفات pickle القديمة من مجلد العمل يبنيها. لإعادة تصدير الإصدارات
+الحالية (بعد تغيير صيغة التصدير مثلاً) ونشرها كإصدارات جديدة:
+    python model_export.py
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+
+
+FORMAT_VERSION = 1
+# أقصى فرق مسموح بين تنبؤات الملف المُصدَّر والنموذج الأصلي
+EXPORT_TOLERANCE = 1e-6
+
+
+# ============================================================================
+# 1. النموذج الخطي
+# ============================================================================
+class LinearModel:
+    """انحدار خطي: f(x) = x·coef + intercept"""
+
+    def __init__(self, coef, intercept, feature_names=None):
+        self.coef = np.asarray(coef, dtype=np.float64).ravel()
+        self.intercept = float(np.ravel(intercept)[0])
+        self.feature_names = list(feature_names) if feature_names is not None else None
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return X @ self.coef + self.intercept
+
+
+def export_linear(model, path):
+    """كتابة LinearRegression من sklearn إلى JSON"""
+    feature_names = getattr(model, 'feature_names_in_', None)
+    payload = {
+        'format_version': FORMAT_VERSION,
+        'kind': 'linear',
+        'coef': np.ravel(model.coef_).tolist(),
+        'intercept': float(np.ravel(model.intercept_)[0]),
+        'feature_names': list(feature_names) if feature_names is not None else None,
+    }
+    _atomic_write(path, lambda fh: fh.write(json.dumps(payload, ensure_ascii=False, indent=2).encode('utf-8')))
+
+
+def load_linear_json(path):
+    with open(path, encoding='utf-8') as fh:
+        payload = json.load(fh)
+    _check_header(payload.get('format_version'), payload.get('kind'), 'linear', path)
+    return LinearModel(payload['coef'], payload['intercept'], payload.get('feature_names'))
+
+
+# ============================================================================
+# 2. نموذج SVR
+# ============================================================================
+def export_svr(bundle, path):
+    """كتابة نموذج SVR (من حزمة student_model_bundle.pkl) إلى npz"""
+    svr = bundle['model']
+    if svr.kernel != 'rbf':
+        raise ValueError(f"نواة غير مدعومة: {svr.kernel}")
+    feature_names = bundle.get('X_columns')
+    arrays = {
+        'format_version': np.array(FORMAT_VERSION),
+        'kind': np.array('svr_rbf'),
+        'support_vectors': np.asarray(svr.support_vectors_, dtype=np.float64),
+        'dual_coef': np.asarray(svr.dual_coef_, dtype=np.float64).ravel(),
+        'intercept': np.asarray(svr.intercept_, dtype=np.float64).ravel(),
+        'gamma': np.array(float(svr._gamma)),
+        'feature_names': np.array(list(feature_names) if feature_names is not None else [], dtype=str),
+    }
+    _atomic_write(path, lambda fh: np.savez(fh, **arrays))
+
+
+def load_svr_npz(path, **kwargs):
+    """محرك SVR من ملف npz (بدون pickle: allow_pickle=False)"""
+    from svr_engine import SVREngine
+
+    with np.load(path, allow_pickle=False) as data:
+        _check_header(int(data['format_version']), str(data['kind']), 'svr_rbf', path)
+        feature_names = data['feature_names'].tolist() or None
+        return SVREngine(data['support_vectors'], data['dual_coef'], data['intercept'], float(data['gamma']),
+                         feature_names=feature_names, **kwargs)
+
+
+def export_svr_engine(engine, path):
+    """حفظ مصفوفات محرك SVR الجاهزة (joblib بدون ضغط حتى يمكن فتحها بـ mmap)"""
+    import joblib
+
+    state = {'format_version': FORMAT_VERSION, 'kind': 'svr_engine', **engine.state()}
+    _atomic_write(path, lambda fh: joblib.dump(state, fh))
+
+
+def load_svr_engine_mmap(path):
+    """محرك SVR بمصفوفات مفتوحة للقراءة فقط بـ mmap (بلا نسخ خاصة بكل عملية)"""
+    import joblib
+    from svr_engine import SVREngine
+
+    state = joblib.load(path, mmap_mode='r')
+    _check_header(state.get('format_version'), state.get('kind'), 'svr_engine', path)
+    return SVREngine.from_state(state)
+
+
+# ============================================================================
+# 3. أدوات مشتركة
+# ============================================================================
+def _check_header(version, kind, expected_kind, path):
+    if version != FORMAT_VERSION or kind != expected_kind:
+        raise ValueError(f"صيغة نموذج غير مدعومة في {path}: {kind} v{version}")
+
+
+def _atomic_write(path, write):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as fh:
+            write(fh)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def export_manifest(directory, source_name, exports):
+    """بيان الملفات المُصدَّرة مع بصمة ملف المصدر الذي صُدّرت منه (انظر model_cache.fresh_exports)"""
+    from model_cache import EXPORT_MANIFEST, file_sha256
+
+    payload = {
+        'source': source_name,
+        'source_sha256': file_sha256(os.path.join(directory, source_name)),
+        'exports': list(exports),
+    }
+    _atomic_write(os.path.join(directory, EXPORT_MANIFEST),
+                  lambda fh: fh.write(json.dumps(payload, ensure_ascii=False, indent=2).encode('utf-8')))
+
+
+def export_all(verify_rows=512, stream=sys.stderr):
+    """
+    إعادة تصدير الإصدار الحالي من كل نموذج في سجل النماذج ونشره كإصدار جديد.
+    لكل نموذج مجلد staging داخل السجل بملف pickle وملفاته المُصدَّرة (model_training.write_artifacts)
+    وبقية ملفات الإصدار الحالي كما هي، ثم مقارنة تنبؤات الملف الذي سيُخدم منه بالنموذج الأصلي.
+    لا يُنشر شيء قبل نجاح التحقق لكل النماذج، وعند أي فشل تُحذف كل ملفات هذا التشغيل.
+    تُرجع {المفتاح: الإصدار المنشور}.
+    """
+    import shutil
+    from pathlib import Path
+
+    import joblib
+    from model_backends import BACKENDS
+    from model_registry import METADATA_FILE, get_model_registry
+    from model_training import write_artifacts
+
+    registry = get_model_registry()
+    rng = np.random.default_rng(0)
+    staged, metadata = {}, {}
+    try:
+        for key, backend in BACKENDS.items():
+            source = Path(backend.source_path)
+            if not source.exists():
+                continue
+            obj = joblib.load(source)
+            staging = staged[key] = registry.staging(key)
+            write_artifacts(key, obj, staging)
+            current = registry.current(key)
+            # مقاييس الإصدار المصدر ووصفه تبقى مع الإصدار الجديد
+            metadata[key] = {**{name: value for name, value in registry.metadata(key, current).items()
+                                if name not in ('version', 'created_at', 'files')},
+                             'source': 'export', 'exported_from': current} if current else {'source': 'export'}
+            if current:
+                # ملفات الإصدار الأخرى (مثل مجموعة bootstrap) تنتقل إلى الإصدار الجديد كما هي
+                for path in source.parent.iterdir():
+                    if path.is_file() and path.name != METADATA_FILE and not (staging / path.name).exists():
+                        shutil.copy2(path, staging / path.name)
+
+            served_name, served_loader = backend.exported[0]
+            exported = served_loader(str(staging / served_name))
+            if key == 'linear':
+                reference = obj
+                X = rng.uniform([0, 0, 0, 0, 0], [40, 100, 100, 10, 3], size=(verify_rows, len(exported.coef)))
+            else:
+                reference = obj['model']
+                X = reference.support_vectors_[:verify_rows]
+
+            max_error = float(np.max(np.abs(exported.predict(X) - reference.predict(np.asarray(X)))))
+            if max_error > EXPORT_TOLERANCE:
+                raise ValueError(f"انحراف النموذج المُصدَّر {served_name} عن الأصل: {max_error:.3g}")
+            print(f"{source} -> {key}/{served_name} ({os.path.getsize(staging / served_name)} bytes, "
+                  f"max_error={max_error:.2g})", file=stream)
+
+        published = {key: registry.publish(key, staging, metadata[key]) for key, staging in staged.items()}
+    finally:
+        # مجلدات staging المنشورة نُقلت إلى مجلدات الإصدارات؛ الباقي من تشغيل فاشل
+        for staging in staged.values():
+            shutil.rmtree(staging, ignore_errors=True)
+    for key, version in published.items():
+        print(f"{key}: {version}", file=stream)
+    return published
+
+
+if __name__ == '__main__':
+    export_all()
@@ -0,0 +1,255 @@
+"""
+🗂️ سجل إصدارات النماذج
+كل نموذج مجلد بإصدارات مرقّمة، وملف CURRENT يشير إلى الإصدار المُخدم:
+
+    models/<key>/v0001/regression_model.pkl
+    models/<key>/v0001/regression_model.json
+    models/<key>/v0001/exports.json
+    models/<key>/v0001/meta.json
+    models/<key>/CURRENT
+
+النشر: نقل مجلد مؤقت مكتمل إلى vNNNN ثم تبديل CURRENT بشكل ذري (os.replace).
+الإنشاء والنشر والتراجع محمية بقفل ملف (flock)، فعمليات Streamlit المتعددة عند
+البدء البارد لا تُنشئ النموذج مرتين ولا تكتب فوق بعضها.
+
+الاستخدام:
+    python model_registry.py list [linear|svr]
+    python model_registry.py rollback linear [v0003]
+"""
+
+import contextlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+
+
+REGISTRY_DIR = Path(os.environ.get('MODEL_REGISTRY_DIR', 'models'))
+# عدد الإصدارات المحتفظ بها لكل نموذج (الإصدار الحالي لا يُحذف أبداً)
+KEEP_VERSIONS = int(os.environ.get('MODEL_REGISTRY_KEEP', 5))
+CURRENT_FILE = 'CURRENT'
+METADATA_FILE = 'meta.json'
+
+
+# ============================================================================
+# 1. السجل
+# ============================================================================
+class ModelRegistry:
+    """إصدارات النماذج على القرص؛ كل العمليات على نفس المجلد تتشارك الحالة عبر الملفات فقط"""
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = Path(root)
+        self._thread_lock = threading.Lock()
+
+    def _dir(self, key):
+        return self.root / key
+
+    @contextlib.contextmanager
+    def lock(self, key):
+        """قفل حصري بين الخيوط والعمليات (flock على models/<key>/.lock)"""
+        directory = self._dir(key)
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._thread_lock, open(directory / '.lock', 'a') as fh:
+            try:
+                import fcntl
+            except ImportError:
+                # بدون flock (ويندوز): الحماية بين خيوط العملية فقط
+                yield
+                return
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    # ---------- القراءة ----------
+    def versions(self, key):
+        """أسماء الإصدارات المنشورة بالترتيب التصاعدي"""
+        directory = self._dir(key)
+        if not directory.exists():
+            return []
+        return sorted(path.name for path in directory.iterdir()
+                      if path.is_dir() and path.name.startswith('v') and path.name[1:].isdigit())
+
+    def current(self, key):
+        """اسم الإصدار الحالي أو None"""
+        try:
+            version = (self._dir(key) / CURRENT_FILE).read_text().strip()
+        except FileNotFoundError:
+            return None
+        return version if (self._dir(key) / version).is_dir() else None
+
+    def metadata(self, key, version):
+        try:
+            with open(self._dir(key) / version / METADATA_FILE, encoding='utf-8') as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return {}
+
+    def directory(self, key, legacy=(), build=None):
+        """
+        مجلد الإصدار الحالي (قراءة واحدة لملف CURRENT). إذا كان السجل فارغاً تُستورد
+        ملفات legacy من مجلد العمل كإصدار أول (انظر import_legacy)؛ وإذا لم توجد يُرجع مجلد العمل.
+        """
+        version = self.current(key) or self.import_legacy(key, legacy, build)
+        return self._dir(key) / version if version else Path()
+
+    def path(self, key, name, legacy=(), build=None):
+        """مسار ملف في الإصدار الحالي (أو في مجلد العمل، كما في directory)"""
+        return self.directory(key, legacy, build) / name
+
+    # ---------- الكتابة ----------
+    def staging(self, key):
+        """مجلد مؤقت داخل السجل (نفس نظام الملفات، فيكون النقل عند النشر ذرياً)"""
+        path = self._dir(key) / f".staging-{os.getpid()}-{threading.get_ident()}-{time.time_ns()}"
+        path.mkdir(parents=True)
+        return path
+
+    def publish(self, key, staging, metadata=None, only_if_missing=False):
+        """
+        نشر ملفات staging كإصدار جديد وجعله الحالي. تُرجع اسم الإصدار،
+        أو None إذا كان only_if_missing ويوجد إصدار حالي (أنشأته عملية أخرى).
+        """
+        staging = Path(staging)
+        with self.lock(key):
+            if only_if_missing and self.current(key):
+                shutil.rmtree(staging, ignore_errors=True)
+                return None
+            versions = self.versions(key)
+            version = f"v{int(versions[-1][1:]) + 1 if versions else 1:04d}"
+            meta = {
+                'version': version,
+                'created_at': time.time(),
+                'files': sorted(path.name for path in staging.iterdir()),
+                **(metadata or {}),
+            }
+            (staging / METADATA_FILE).write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding='utf-8')
+
+            target = self._dir(key) / version
+            try:
+                os.rename(staging, target)
+            except OSError:
+                # staging على نظام ملفات آخر: نسخ إلى مجلد مؤقت داخل السجل ثم نقل ذري
+                local = self._dir(key) / f".staging-{os.getpid()}-{time.time_ns()}"
+                shutil.copytree(staging, local)
+                os.rename(local, target)
+                shutil.rmtree(staging, ignore_errors=True)
+            self._set_current(key, version)
+            self._prune(key)
+        return version
+
+    def activate(self, key, version):
+        """جعل إصدار منشور سابقاً هو الحالي"""
+        with self.lock(key):
+            self._activate(key, version)
+        return version
+
+    def rollback(self, key, version=None):
+        """الرجوع إلى إصدار محدد أو إلى الإصدار السابق للحالي"""
+        with self.lock(key):
+            if version is None:
+                current = self.current(key)
+                older = [v for v in self.versions(key) if current is None or v < current]
+                if not older:
+                    raise ValueError(f"لا يوجد إصدار سابق للنموذج {key}")
+                version = older[-1]
+            self._activate(key, version)
+        return version
+
+    def _activate(self, key, version):
+        if version not in self.versions(key):
+            raise ValueError(f"الإصدار {version} غير موجود للنموذج {key}")
+        self._set_current(key, version)
+
+    def import_legacy(self, key, names, build=None):
+        """
+        استيراد ملفات النموذج القديمة من مجلد العمل كإصدار أول (مرة واحدة، تحت القفل)؛
+        build(staging) يُكمل الإصدار قبل نشره (مثل بناء الملفات المُصدَّرة من ملف pickle)
+        """
+        existing = [name for name in names if os.path.exists(name)]
+        if not existing:
+            return None
+        with self.lock(key):
+            version = self.current(key)
+            if version:
+                return version
+            staging = self.staging(key)
+            try:
+                for name in existing:
+                    shutil.copy2(name, staging / name)
+                if build is not None:
+                    build(staging)
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+        return self.publish(key, staging, {'source': 'legacy'}, only_if_missing=True) or self.current(key)
+
+    def _set_current(self, key, version):
+        path = self._dir(key) / CURRENT_FILE
+        tmp_path = path.with_name(f"{CURRENT_FILE}.{os.getpid()}.tmp")
+        tmp_path.write_text(version)
+        os.replace(tmp_path, path)
+
+    def _prune(self, key, keep=None):
+        """حذف الإصدارات الأقدم (العمليات التي فتحت ملفاتها بـ mmap تحتفظ بها حتى تغلقها)"""
+        keep = KEEP_VERSIONS if keep is None else keep
+        if keep < 0:
+            raise ValueError(f"عدد الإصدارات المحتفظ بها لا يمكن أن يكون سالباً: {keep}")
+        current = self.current(key)
+        versions = self.versions(key)
+        # [:-0] شريحة فارغة: keep=0 يجب أن يحذف كل شيء عدا الإصدار الحالي
+        for version in versions[:max(len(versions) - keep, 0)]:
+            if version != current:
+                shutil.rmtree(self._dir(key) / version, ignore_errors=True)
+
+
+_shared_registry = None
+_shared_lock = threading.Lock()
+
+
+def get_model_registry():
+    """السجل المشترك بين جميع جلسات العملية"""
+    global _shared_registry
+    if _shared_registry is None:
+        with _shared_lock:
+            if _shared_registry is None:
+                _shared_registry = ModelRegistry()
+    return _shared_registry
+
+
+# ============================================================================
+# 2. سطر الأوامر
+# ============================================================================
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="سجل إصدارات النماذج")
+    commands = parser.add_subparsers(dest='command', required=True)
+    list_parser = commands.add_parser('list', help="عرض الإصدارات")
+    list_parser.add_argument('key', nargs='?')
+    rollback_parser = commands.add_parser('rollback', help="الرجوع إلى إصدار سابق")
+    rollback_parser.add_argument('key')
+    rollback_parser.add_argument('version', nargs='?')
+    args = parser.parse_args(argv)
+
+    registry = get_model_registry()
+    if args.command == 'rollback':
+        print(f"{args.key}: {registry.rollback(args.key, args.version)}", file=sys.stderr)
+        return
+
+    keys = [args.key] if args.key else sorted(path.name for path in registry.root.iterdir() if path.is_dir()) \
+        if registry.root.exists() else []
+    for key in keys:
+        current = registry.current(key)
+        for version in registry.versions(key):
+            meta = registry.metadata(key, version)
+            created = time.strftime('%Y-%m-%d %H:%M', time.localtime(meta.get('created_at', 0)))
+            marker = '*' if version == current else ' '
+            print(f"{marker} {key}/{version}  {created}  {meta.get('source', '')}")
+
+
+if __name__ == '__main__':
+    main()
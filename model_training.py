@@ -0,0 +1,374 @@
+"""
+🧠 تدريب النماذج في الخلفية من البيانات المرفوعة
+التدريب يتم في عملية مستقلة (بأولوية منخفضة) تقرأ مجموعات البيانات من المكتبة
+وتكتب النموذج الجديد في مجلد مؤقت داخل سجل النماذج، ثم تنشره عملية الخادم كإصدار
+جديد عند الاكتمال. الإلغاء ينهي العملية في أي لحظة دون المساس بالنموذج الحالي.
+"""
+
+import itertools
+import multiprocessing
+import os
+import queue
+import shutil
+import threading
+import time
+from pathlib import Path
+
+
+TARGET_COLUMN = 'Exam_Score'
+# أقل عدد من الصفوف الصالحة للتدريب
+MIN_TRAINING_ROWS = 20
+# SVR تكلفته تربيعية في عدد الصفوف: التدريب على عينة بهذا الحجم على الأكثر
+SVR_MAX_ROWS = int(os.environ.get('SVR_MAX_TRAINING_ROWS', 20_000))
+HOLDOUT_FRACTION = 0.2
+
+# ترميز تأثير الأقران النصي (كما في بيانات Kaggle) بمقياس كل نموذج؛ "محايد" = القيمة الافتراضية للنموذج
+PEER_CODES = {
+    'linear': {'Negative': 1, 'Neutral': 3, 'Positive': 5},
+    'svr': {'Negative': 0, 'Neutral': 1, 'Positive': 2},
+}
+
+
+# ============================================================================
+# 1. بيانات التدريب
+# ============================================================================
+def chunk_matrix(frame, key, default_peer):
+    """الميزات والدرجات لدفعة DataFrame واحدة (الصفوف الناقصة تُحذف)"""
+    import numpy as np
+    import pandas as pd
+    from scoring import build_feature_matrix
+
+    if TARGET_COLUMN not in frame.columns:
+        raise ValueError(f"العمود {TARGET_COLUMN} غير موجود")
+    peer = frame.get('Peer_Influence')
+    if peer is not None and not pd.api.types.is_numeric_dtype(peer):
+        frame = frame.assign(Peer_Influence=peer.astype(object).map(PEER_CODES[key]))
+    X = build_feature_matrix(frame, default_peer)
+    y = pd.to_numeric(frame[TARGET_COLUMN], errors='coerce').to_numpy(dtype=float)
+    valid = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+    return X[valid], y[valid]
+
+
+def training_matrix(frames, key, default_peer):
+    """مصفوفة الميزات والدرجات من دفعات DataFrame"""
+    import numpy as np
+
+    parts = [chunk_matrix(frame, key, default_peer) for frame in frames]
+    X = np.concatenate([X for X, _ in parts]) if parts else np.empty((0, 5))
+    y = np.concatenate([y for _, y in parts]) if parts else np.empty(0)
+    if len(y) < MIN_TRAINING_ROWS:
+        raise ValueError(f"عدد الصفوف الصالحة للتدريب ({len(y)}) أقل من {MIN_TRAINING_ROWS}")
+    return X, y
+
+
+def synthetic_matrix(n_samples=100, seed=42):
+    """البيانات الافتراضية للعرض التوضيحي عند عدم وجود أي نموذج أو بيانات"""
+    import numpy as np
+
+    rng = np.random.RandomState(seed)
+    # ميزات: ساعات الدراسة، الحضور، الدرجات السابقة، دروس خصوصية، تأثير الأقران
+    X = np.column_stack([
+        rng.randint(10, 40, n_samples),
+        rng.randint(60, 100, n_samples),
+        rng.uniform(50, 95, n_samples),
+        rng.randint(0, 10, n_samples),
+        rng.randint(1, 6, n_samples),
+    ])
+    # درجات: معادلة بمعاملات واقعية مع ضوضاء، بين 0 و 100
+    y = X @ np.array([0.4, 0.3, 0.25, 0.15, 0.05]) + rng.randn(n_samples) * 5
+    return X, np.clip(y, 0, 100)
+
+
+# ============================================================================
+# 2. التدريب والتقييم
+# ============================================================================
+def fit_estimator(key, X, y):
+    """تدريب نموذج الواجهة: LinearRegression أو SVR (حزمة بنفس صيغة student_model_bundle.pkl)"""
+    from scoring import FEATURE_COLUMNS
+
+    if key == 'linear':
+        from sklearn.linear_model import LinearRegression
+        return LinearRegression().fit(X, y)
+    if key == 'svr':
+        from sklearn.svm import SVR
+        return {'model': SVR().fit(X, y), 'X_columns': list(FEATURE_COLUMNS)}
+    raise ValueError(f"نموذج غير مدعوم للتدريب: {key}")
+
+
+def estimator_predict(key, estimator, X):
+    return (estimator['model'] if key == 'svr' else estimator).predict(X)
+
+
+def holdout_split(n_rows, key, seed=0):
+    """فهارس التدريب والتقييم (مع عينة محدودة لـ SVR)"""
+    import numpy as np
+
+    order = np.random.default_rng(seed).permutation(n_rows)
+    n_test = max(1, int(n_rows * HOLDOUT_FRACTION))
+    test, train = order[:n_test], order[n_test:]
+    if key == 'svr':
+        train = train[:SVR_MAX_ROWS]
+    return train, test
+
+
+def evaluate(key, estimator, X, y):
+    """MAE و R² على بيانات التقييم"""
+    import numpy as np
+
+    residual = y - estimator_predict(key, estimator, X)
+    total = float(((y - y.mean()) ** 2).sum())
+    return {
+        'mae': float(np.abs(residual).mean()),
+        'r2': 1.0 - float((residual ** 2).sum()) / total if total else 0.0,
+    }
+
+
+def write_exports(key, estimator, directory):
+    """
+    الملفات المُصدَّرة لنموذج ملف pickle الموجود في مجلد الإصدار، ثم بيانها (exports.json)
+    ببصمة ملف pickle حتى تُخدم منها ما دام المصدر نفسه
+    """
+    from model_backends import BACKENDS
+    from model_export import export_linear, export_manifest, export_svr, export_svr_engine, load_svr_npz
+
+    backend = BACKENDS[key]
+    directory = Path(directory)
+    exported = {Path(name).suffix: directory / name for name, _ in backend.exported}
+    if key == 'linear':
+        export_linear(estimator, exported['.json'])
+    else:
+        export_svr(estimator, exported['.npz'])
+        export_svr_engine(load_svr_npz(exported['.npz']), exported['.joblib'])
+    export_manifest(directory, backend.source_name, [name for name, _ in backend.exported])
+
+
+def write_artifacts(key, estimator, directory, data=None):
+    """
+    ملف pickle ثم الملفات المُصدَّرة في مجلد الإصدار (write_exports).
+    data: (X، y) التي دُرّب عليها النموذج الخطي، لبناء مجموعة bootstrap لفترات التنبؤ.
+    """
+    import joblib
+    from model_backends import BACKENDS
+    from prediction_intervals import BOOTSTRAP_FILE, export_bootstrap, fit_bootstrap
+
+    directory = Path(directory)
+    joblib.dump(estimator, directory / BACKENDS[key].source_name)
+    write_exports(key, estimator, directory)
+    if key == 'linear' and data is not None:
+        export_bootstrap(fit_bootstrap(*data), directory / BOOTSTRAP_FILE)
+
+
+def publish_estimator(key, estimator, metadata=None, data=None):
+    """نشر نموذج مدرّب كإصدار جديد في سجل النماذج؛ تُرجع اسم الإصدار"""
+    from model_registry import get_model_registry
+
+    registry = get_model_registry()
+    staging = registry.staging(key)
+    try:
+        write_artifacts(key, estimator, staging, data)
+        return registry.publish(key, staging, metadata)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+# ============================================================================
+# 3. عملية التدريب
+# ============================================================================
+class TrainingCancelled(Exception):
+    pass
+
+
+def run_training(key, directory, sha256s, staging, messages, cancel):
+    """
+    تعمل في العملية الفرعية: قراءة البيانات ← التدريب ← التقييم ← كتابة الملفات في staging.
+    الرسائل: ('progress', نسبة، وصف) ثم ('done', المقاييس) أو ('error', النص).
+    """
+    try:
+        # أولوية منخفضة حتى لا ينافس التدريب تنبؤات المستخدمين على المعالج
+        os.nice(10)
+    except (AttributeError, OSError):
+        pass
+
+    def report(fraction, message):
+        if cancel.is_set():
+            raise TrainingCancelled()
+        messages.put(('progress', fraction, message))
+
+    try:
+        from model_backends import BACKENDS
+
+        backend = BACKENDS[key]
+        started = time.perf_counter()
+        if sha256s:
+            from dataset_store import DatasetStore
+
+            store = DatasetStore(directory)
+            datasets = [store.get(sha256) for sha256 in sha256s]
+            total_rows = sum(dataset.rows for dataset in datasets) or 1
+            loaded = 0
+
+            def frames():
+                nonlocal loaded
+                for frame in itertools.chain.from_iterable(dataset.iter_frames() for dataset in datasets):
+                    loaded += len(frame)
+                    report(0.4 * loaded / total_rows, f"قراءة البيانات ({loaded:,} / {total_rows:,} صف)")
+                    yield frame
+
+            X, y = training_matrix(frames(), key, backend.default_peer)
+        else:
+            report(0.1, "إنشاء بيانات افتراضية")
+            X, y = synthetic_matrix()
+
+        train, test = holdout_split(len(y), key)
+        report(0.45, f"تدريب النموذج على {len(train):,} صف")
+        estimator = fit_estimator(key, X[train], y[train])
+
+        report(0.85, "تقييم النموذج")
+        metrics = evaluate(key, estimator, X[test], y[test])
+        metrics.update(rows=int(len(y)), train_rows=int(len(train)), seconds=time.perf_counter() - started)
+
+        report(0.95, "حفظ النموذج")
+        write_artifacts(key, estimator, staging, (X[train], y[train]))
+        if key == 'linear':
+            from prediction_intervals import BOOTSTRAP_FILE, coverage, load_bootstrap
+
+            # نسبة درجات التقييم داخل فترة 85%: تحقق من معايرة المجموعة على بيانات لم ترها
+            metrics['coverage'] = coverage(load_bootstrap(Path(staging) / BOOTSTRAP_FILE), X[test], y[test])
+        messages.put(('done', metrics))
+    except TrainingCancelled:
+        messages.put(('cancelled',))
+    except Exception as e:
+        messages.put(('error', str(e)))
+
+
+# ============================================================================
+# 4. إدارة مهام التدريب على مستوى العملية
+# ============================================================================
+class TrainingJob:
+    """حالة مهمة تدريب واحدة كما تعرضها الواجهة"""
+
+    def __init__(self, job_id, key, label, staging, synthetic=False):
+        self.job_id = job_id
+        self.key = key
+        self.label = label
+        self.synthetic = synthetic
+        self.staging = staging
+        self.version = None
+        self.state = 'running'  # running | done | failed | cancelled
+        self.progress = 0.0
+        self.message = "بدء التدريب"
+        self.metrics = None
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self._process = None
+        self._cancel = None
+
+    @property
+    def running(self):
+        return self.state == 'running'
+
+
+class TrainingManager:
+    """
+    مهمة تدريب واحدة على الأكثر لكل نموذج. كل مهمة عملية spawn مستقلة
+    يراقبها خيط خلفي ينشر النموذج الجديد عند اكتمالها.
+    """
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._counter = itertools.count(1)
+        self._context = multiprocessing.get_context('spawn')
+
+    def start(self, key, datasets=(), label=None):
+        """بدء التدريب على مجموعات بيانات من المكتبة (بدونها: بيانات افتراضية)"""
+        from dataset_store import get_dataset_store
+        from model_registry import get_model_registry
+
+        with self._lock:
+            current = self._jobs.get(key)
+            if current is not None and current.running:
+                return current
+            job_id = f"{key}-{int(time.time())}-{next(self._counter)}"
+            staging = get_model_registry().staging(key)
+            job = self._jobs[key] = TrainingJob(job_id, key, label or "بيانات افتراضية", staging,
+                                                synthetic=not datasets)
+
+            messages = self._context.Queue()
+            job._cancel = self._context.Event()
+            job._process = self._context.Process(
+                target=run_training,
+                args=(key, str(get_dataset_store().directory), [dataset.sha256 for dataset in datasets],
+                      str(staging), messages, job._cancel),
+                daemon=True,
+            )
+            job._process.start()
+        threading.Thread(target=self._monitor, args=(job, messages), daemon=True).start()
+        return job
+
+    def _monitor(self, job, messages):
+        result = None
+        while result is None:
+            try:
+                message = messages.get(timeout=0.5)
+            except queue.Empty:
+                if not job._process.is_alive():
+                    result = ('cancelled',) if job._cancel.is_set() else ('error', "توقفت عملية التدريب بشكل غير متوقع")
+                continue
+            if message[0] == 'progress':
+                job.progress, job.message = message[1], message[2]
+            else:
+                result = message
+        job._process.join(timeout=5)
+
+        try:
+            if result[0] == 'done' and not job._cancel.is_set():
+                job.version = self._publish(job, result[1])
+                job.metrics, job.progress, job.message, job.state = result[1], 1.0, "اكتمل التدريب", 'done'
+            elif result[0] == 'error':
+                job.error, job.message, job.state = result[1], "فشل التدريب", 'failed'
+            else:
+                job.message, job.state = "تم إلغاء التدريب", 'cancelled'
+        except OSError as e:
+            job.error, job.message, job.state = str(e), "فشل نشر النموذج", 'failed'
+        finally:
+            job.finished_at = time.time()
+            shutil.rmtree(job.staging, ignore_errors=True)
+
+    def _publish(self, job, metrics):
+        """إصدار جديد في السجل؛ النموذج الافتراضي يُنشر فقط إذا لم تُنشئ عملية أخرى نموذجاً"""
+        from model_registry import get_model_registry
+
+        metadata = {'source': job.label, 'metrics': metrics}
+        return get_model_registry().publish(job.key, job.staging, metadata, only_if_missing=job.synthetic)
+
+    def cancel(self, key):
+        with self._lock:
+            job = self._jobs.get(key)
+        if job is not None and job.running:
+            job._cancel.set()
+            # النموذج الجديد يُكتب في مجلد مؤقت فقط، فإنهاء العملية آمن في أي مرحلة
+            job._process.terminate()
+
+    def job(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    def is_training(self, key):
+        job = self.job(key)
+        return job is not None and job.running
+
+
+_shared_manager = None
+_shared_lock = threading.Lock()
+
+
+def get_training_manager():
+    """مدير التدريب المشترك بين جميع جلسات العملية"""
+    global _shared_manager
+    if _shared_manager is None:
+        with _shared_lock:
+            if _shared_manager is None:
+                _shared_manager = TrainingManager()
+    return _shared_manager
@@ -0,0 +1,108 @@
+"""
+🏫 استقبال ملفات عدة مدارس بالتوازي
+كل ملف يُحفظ في مكتبة البيانات ويُحلَّل في عملية مستقلة، ثم تُدمج الإحصائيات الجزئية
+(العدد والمتوسط والتباين والقيم الصغرى والعظمى وبصمات الصفوف) دون جمع البيانات الخام
+في عملية واحدة.
+"""
+
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+# عدد العمليات (قابل للتعديل عبر متغير البيئة)؛ عملية واحدة تعني التحليل داخل العملية الحالية
+MAX_WORKERS = int(os.environ.get('INGEST_WORKERS', min(4, os.cpu_count() or 1)))
+
+
+# ============================================================================
+# 1. عمل العملية الفرعية
+# ============================================================================
+def ingest_one(directory, sha256, name, data=None):
+    """
+    حفظ الملف في المكتبة (إذا أُرسلت بياناته) ثم تحليله من نسخة Arrow المحفوظة.
+    تُرجع DataProfile جاهزاً للدمج.
+    """
+    from csv_profiler import profile_frames
+    from dataset_store import DatasetStore
+
+    store = DatasetStore(directory)
+    dataset = store.save_csv(io.BytesIO(data), name, sha256) if data is not None else store.get(sha256)
+    profile = profile_frames(dataset.iter_frames())
+    # ضغط بصمات الصفوف قبل إرسال النتيجة إلى العملية الرئيسية
+    profile.compact()
+    return profile
+
+
+# ============================================================================
+# 2. التوزيع على العمليات
+# ============================================================================
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def get_ingest_pool():
+    """مجمع العمليات المشترك؛ spawn بدلاً من fork لأن خادم Streamlit متعدد الخيوط"""
+    global _shared_pool
+    if _shared_pool is None:
+        with _shared_lock:
+            if _shared_pool is None:
+                _shared_pool = ProcessPoolExecutor(
+                    max_workers=MAX_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+    return _shared_pool
+
+
+def _reset_ingest_pool():
+    global _shared_pool
+    with _shared_lock:
+        pool, _shared_pool = _shared_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def ingest_profiles(store, jobs, cache, workers=None):
+    """
+    تحليل عدة ملفات: jobs قائمة (sha256، الاسم، البايتات أو None للمحفوظ مسبقاً).
+    الملفات المحلَّلة من قبل تُؤخذ من الذاكرة، والبقية تُوزّع على العمليات.
+    تُرجع {sha256: DataProfile} بترتيب jobs.
+    """
+    workers = MAX_WORKERS if workers is None else workers
+    profiles = {}
+    pending = []
+    for sha256, name, data in jobs:
+        cached = cache.peek(sha256, 'profile')
+        if cached is not None:
+            profiles[sha256] = cached
+        else:
+            pending.append((sha256, name, data))
+
+    directory = str(store.directory)
+    results = None
+    if len(pending) > 1 and workers > 1:
+        try:
+            pool = get_ingest_pool()
+            futures = {sha256: pool.submit(ingest_one, directory, sha256, name, data) for sha256, name, data in pending}
+            results = {sha256: future.result() for sha256, future in futures.items()}
+        except BrokenProcessPool:
+            # عملية فرعية انتهت بشكل غير طبيعي: مجمع جديد في المرة القادمة، والتحليل الآن داخل العملية
+            _reset_ingest_pool()
+    if results is None:
+        results = {sha256: ingest_one(directory, sha256, name, data) for sha256, name, data in pending}
+
+    for sha256, profile in results.items():
+        profiles[sha256] = cache.get(sha256, 'profile', lambda profile=profile: profile)
+    return {sha256: profiles[sha256] for sha256, _, _ in jobs}
+
+
+def merge_profiles(profiles):
+    """الإحصائيات المجمّعة لكل الملفات (الملفات الأصلية لا تتغير)"""
+    from csv_profiler import DataProfile
+
+    merged = DataProfile()
+    for profile in profiles:
+        merged.merge(profile)
+    return merged
@@ -0,0 +1,170 @@
+"""
+⏱️ قياس زمن مراحل إعادة التشغيل
+مدرّجات تكرارية لكل مرحلة مع نافذة متحركة للمئينات وتصدير بصيغة Prometheus النصية
+"""
+
+import bisect
+import collections
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+# حدود الدلاء بالمللي ثانية (تراكمية كما في مدرّجات Prometheus)
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+WINDOW_SIZE = 1024
+ENABLED = os.environ.get('PERF_STATS', '1') != '0'
+DEFAULT_EXPORT_PATH = Path('.cache') / 'metrics.prom'
+
+
+# ============================================================================
+# 1. مدرّج مرحلة واحدة
+# ============================================================================
+class StageHistogram:
+    """عداد ومجموع ودلاء منذ بدء العملية، وآخر WINDOW_SIZE قياساً للمئينات"""
+
+    __slots__ = ('count', 'total_ms', 'max_ms', 'buckets', 'window')
+
+    def __init__(self, window_size=WINDOW_SIZE):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.window = collections.deque(maxlen=window_size)
+
+    def observe(self, elapsed_ms):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, elapsed_ms)] += 1
+        self.window.append(elapsed_ms)
+
+    def percentile(self, q):
+        """المئين q (0-100) من النافذة المتحركة"""
+        if not self.window:
+            return 0.0
+        ordered = sorted(self.window)
+        return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max_ms,
+        }
+
+
+# ============================================================================
+# 2. سجل المراحل
+# ============================================================================
+class PerfRegistry:
+    """سجل مشترك لكل مراحل العملية؛ كلفة القياس الواحد بضع ميكروثوانٍ"""
+
+    def __init__(self, enabled=ENABLED):
+        self.enabled = enabled
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, elapsed_ms):
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = StageHistogram()
+            stage.observe(elapsed_ms)
+
+    @contextmanager
+    def stage(self, name):
+        """قياس زمن كتلة: with registry.stage('footer'): ..."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+
+    def timed(self, name):
+        """مُزخرف لقياس زمن دالة كاملة"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, (time.perf_counter() - start) * 1000)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """ملخص كل مرحلة مرتباً حسب p99 تنازلياً"""
+        with self._lock:
+            summaries = {name: stage.summary() for name, stage in self._stages.items()}
+        return dict(sorted(summaries.items(), key=lambda item: -item[1]['p99_ms']))
+
+    def window_histogram(self, name):
+        """توزيع قياسات النافذة المتحركة لمرحلة على الدلاء: {'≤10ms': n, ...}"""
+        with self._lock:
+            stage = self._stages.get(name)
+            samples = list(stage.window) if stage is not None else []
+        counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        for elapsed_ms in samples:
+            counts[bisect.bisect_left(BUCKET_BOUNDS_MS, elapsed_ms)] += 1
+        labels = [f"≤{bound:g}ms" for bound in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]:g}ms"]
+        return dict(zip(labels, counts))
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    # ---------- التصدير ----------
+    def to_prometheus(self, metric='app_stage_duration_seconds'):
+        """نص بصيغة Prometheus: مدرّج تراكمي لكل مرحلة بالثواني"""
+        lines = [
+            f"# HELP {metric} Duration of each Streamlit rerun stage.",
+            f"# TYPE {metric} histogram",
+        ]
+        with self._lock:
+            stages = [(name, list(stage.buckets), stage.count, stage.total_ms)
+                      for name, stage in sorted(self._stages.items())]
+        for name, buckets, count, total_ms in stages:
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKET_BOUNDS_MS, buckets):
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{{stage="{name}",le="{bound / 1000:g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{stage="{name}",le="+Inf"}} {count}')
+            lines.append(f'{metric}_sum{{stage="{name}"}} {total_ms / 1000:.6f}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path=DEFAULT_EXPORT_PATH):
+        """كتابة الملف بشكل ذري ليقرأه node_exporter (textfile collector)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(self.to_prometheus(), encoding='utf-8')
+        os.replace(tmp_path, path)
+        return path
+
+
+_shared_registry = PerfRegistry()
+
+
+def get_perf_registry():
+    """السجل المشترك بين جميع جلسات العملية"""
+    return _shared_registry
+
+
+def timed_stage(name):
+    """اختصار لـ get_perf_registry().timed(name)"""
+    return _shared_registry.timed(name)
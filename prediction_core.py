@@ -0,0 +1,62 @@
+"""
+🧠 نواة التنبؤ بدون واجهة مستخدم
+التنبؤ بدرجة طالب واحد وتصنيفها، قابلة للاستيراد من التطبيق والخدمة وسطر الأوامر
+"""
+
+import numpy as np
+
+from goal_seeking import seek_target
+from model_backends import get_backend
+from prediction_intervals import bootstrap_members, interval_bounds
+from prediction_lattice import get_lattice_store
+from scoring import clip_scores, grade_score
+
+
+def raw_prediction(backend, hours, attendance, prev_scores, tutoring, use_lattice=True):
+    """الدرجة الخام: من الجدول المحسوب مسبقاً إن كان جاهزاً، وإلا من النموذج مباشرة"""
+    if use_lattice:
+        lattice = get_lattice_store().get(backend)
+        if lattice is not None:
+            raw_score = lattice.lookup(hours, attendance, prev_scores, tutoring)
+            if raw_score is not None:
+                return raw_score
+
+    # قيمة افتراضية لتأثير الأقران حسب النموذج
+    input_data = np.array([[hours, attendance, prev_scores, tutoring, backend.default_peer]], dtype=float)
+    return backend.load().predict(input_data)[0]
+
+
+def predict_student(hours, attendance, prev_scores, tutoring, backend=None, use_lattice=True, confidence=None):
+    """
+    التنبؤ بدرجة طالب واحد مع التقييم؛ خطة التحسين منفصلة في plan_student لأنها تحتاج النموذج
+    نفسه، فيبقى مسار الجدول المحسوب مسبقاً بلا أي عمل على النموذج.
+    مع confidence (نسبة مئوية) تُضاف فترة التنبؤ interval_low / interval_high من مجموعة
+    bootstrap للنموذج الخطي (None إذا لم تكن للإصدار الحالي مجموعة).
+    الحقل color_key يُحوّل إلى لون فعلي في طبقة العرض.
+    """
+    backend = backend or get_backend()
+    score = float(clip_scores(raw_prediction(backend, hours, attendance, prev_scores, tutoring, use_lattice)))
+    features = [hours, attendance, prev_scores, tutoring, backend.default_peer]
+    result = {'score': score, **grade_score(score)}
+
+    if confidence is not None:
+        members = bootstrap_members(backend)
+        interval = interval_bounds(members, features, confidence) if members is not None else None
+        result.update(
+            confidence=confidence,
+            interval_low=float(interval[0][0]) if interval else None,
+            interval_high=float(interval[1][0]) if interval else None,
+        )
+    return result
+
+
+def plan_student(hours, attendance, prev_scores, tutoring, score, backend=None, budget=None):
+    """
+    أقل تغيير يبلغ المستوى التالي لدرجة score المعروضة (goal_seeking):
+    target و recommended_* و expected_score و plan_status.
+    """
+    backend = backend or get_backend()
+    features = [hours, attendance, prev_scores, tutoring, backend.default_peer]
+    plan = seek_target(backend.load(), features, score, budget)
+    plan['plan_status'] = plan.pop('status')
+    return plan
@@ -0,0 +1,213 @@
+"""
+🧊 جدول تنبؤ محسوب مسبقاً لمجال أدوات الإدخال
+حساب سطح الاستجابة على شبكة قيم المنزلقات مرة واحدة وتخزينه كمصفوفة NumPy مربوطة بالذاكرة.
+الجدول يُقارن عند بنائه بـ model.predict على نقاط عشوائية بين العُقد، ولا يُخدم إلا إذا
+بقي الاستكمال ضمن LATTICE_ATOL، فتطابق درجة الصفحة درجة الخدمة وسطر الأوامر.
+"""
+
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+
+# ============================================================================
+# 1. مجال الإدخال
+# ============================================================================
+LATTICE_DIR = Path('.cache') / 'lattice'
+
+# نفس حدود المنزلقات في صفحة التنبؤ
+HOURS_MAX = 40
+ATTENDANCE_MAX = 100
+TUTORING_MAX = 10
+
+# الدرجات السابقة قيمة عشرية: نحسب عند عُقد كل 5 درجات ونستكمل خطياً بينها،
+# وإذا تجاوز خطأ الاستكمال السماحية يُعاد البناء بعُقد كل درجة
+PREV_SCORES_MAX = 100
+PREV_SCORES_STEP = 5
+PREV_SCORES_STEPS = (PREV_SCORES_STEP, 1)
+
+# نصف أصغر فرق معروض (الدرجات تُقرّب لمنزلتين): أكبر فرق مسموح عن model.predict
+LATTICE_ATOL = 0.005
+CHECK_POINTS = 512
+
+
+# ============================================================================
+# 2. الجدول
+# ============================================================================
+class PredictionLattice:
+    """
+    مصفوفة بالأبعاد (الساعات، الحضور، الدروس الخصوصية، عُقد الدرجات السابقة).
+    البحث O(1): فهرسة مباشرة للأبعاد الصحيحة واستكمال خطي على الدرجات السابقة.
+    خطوة الدرجات السابقة تُستنتج من عدد العُقد، فالملف المحفوظ لا يحتاج بيانات إضافية.
+    """
+
+    def __init__(self, values):
+        self.values = values
+        self.prev_step = PREV_SCORES_MAX / (values.shape[3] - 1)
+
+    @classmethod
+    def build(cls, model, default_peer, prev_steps=PREV_SCORES_STEPS, atol=LATTICE_ATOL):
+        """
+        أول جدول (من الخطوة الأخشن) يطابق model.predict ضمن atol بين العُقد؛
+        ValueError إذا لم تكفِ أي خطوة، فيُستخدم النموذج مباشرة
+        """
+        error = None
+        for prev_step in prev_steps:
+            lattice = cls.compute(model, default_peer, prev_step)
+            try:
+                lattice.check_against(model, default_peer, atol)
+            except ValueError as exc:
+                error = exc
+                continue
+            return lattice
+        raise error
+
+    @classmethod
+    def compute(cls, model, default_peer, prev_step=PREV_SCORES_STEP):
+        """حساب الجدول بدفعات (دفعة لكل قيمة من ساعات الدراسة)"""
+        attendance, tutoring, prev = np.meshgrid(
+            np.arange(ATTENDANCE_MAX + 1),
+            np.arange(TUTORING_MAX + 1),
+            np.arange(0, PREV_SCORES_MAX + prev_step, prev_step),
+            indexing='ij',
+        )
+        X = np.column_stack([
+            np.zeros(attendance.size),
+            attendance.ravel(),
+            prev.ravel(),
+            tutoring.ravel(),
+            np.full(attendance.size, default_peer),
+        ]).astype(float)
+
+        values = np.empty((HOURS_MAX + 1,) + attendance.shape, dtype=np.float32)
+        for hours in range(HOURS_MAX + 1):
+            X[:, 0] = hours
+            values[hours] = model.predict(X).reshape(attendance.shape)
+        return cls(values)
+
+    def check_against(self, model, default_peer, atol=LATTICE_ATOL, points=CHECK_POINTS, seed=0):
+        """
+        مقارنة البحث بـ model.predict على نقاط عشوائية بين العُقد (حيث يكون خطأ الاستكمال)،
+        وإثارة ValueError عند تجاوز السماحية. تُرجع أكبر فرق مطلق.
+        """
+        rng = np.random.default_rng(seed)
+        X = np.column_stack([
+            rng.integers(0, HOURS_MAX + 1, points),
+            rng.integers(0, ATTENDANCE_MAX + 1, points),
+            rng.uniform(0, PREV_SCORES_MAX, points),
+            rng.integers(0, TUTORING_MAX + 1, points),
+            np.full(points, default_peer),
+        ]).astype(float)
+        found = np.array([self.lookup(hours, attendance, prev, tutoring) for hours, attendance, prev, tutoring, _ in X])
+        max_error = float(np.max(np.abs(found - model.predict(X))))
+        if max_error > atol:
+            raise ValueError(f"انحراف جدول التنبؤ (خطوة {self.prev_step:g}) عن النموذج: {max_error:.3g} > {atol:.3g}")
+        return max_error
+
+    def save(self, path):
+        """حفظ الجدول بشكل ذري (ملف مؤقت ثم إعادة تسمية)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as fh:
+            np.save(fh, self.values)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """فتح الجدول مربوطاً بالذاكرة: الصفحات تُقرأ عند الحاجة وتُشارك بين العمليات"""
+        return cls(np.load(path, mmap_mode='r'))
+
+    def lookup(self, hours, attendance, prev_scores, tutoring):
+        """القيمة الخام المتوقعة، أو None إذا كانت المدخلات خارج الشبكة"""
+        if not (float(hours).is_integer() and float(attendance).is_integer() and float(tutoring).is_integer()):
+            return None
+        i, j, k = int(hours), int(attendance), int(tutoring)
+        if not (0 <= i <= HOURS_MAX and 0 <= j <= ATTENDANCE_MAX and 0 <= k <= TUTORING_MAX
+                and 0 <= prev_scores <= PREV_SCORES_MAX):
+            return None
+
+        position = prev_scores / self.prev_step
+        lo = min(int(position), self.values.shape[3] - 2)
+        frac = position - lo
+        row = self.values[i, j, k]
+        return float(row[lo] * (1 - frac) + row[lo + 1] * frac)
+
+
+# ============================================================================
+# 3. إدارة الجداول على مستوى العملية
+# ============================================================================
+class LatticeStore:
+    """
+    جداول النماذج مفهرسة ببصمة ملف النموذج: تغيّر النموذج يعني ملف جدول جديد.
+    البناء يتم في خيط خلفي، وحتى اكتماله يُرجع get() القيمة None فيُستخدم النموذج مباشرة؛
+    وكذلك دائماً للنماذج التي لا يطابقها أي جدول ضمن السماحية (refused).
+    """
+
+    def __init__(self, directory=LATTICE_DIR):
+        self.directory = Path(directory)
+        self._lattices = {}
+        self._building = set()
+        self._refused = set()
+        self._lock = threading.Lock()
+
+    def path_for(self, backend, sha256):
+        # السماحية جزء من الاسم: الجداول المحفوظة قبل تغييرها لم تُفحص بها
+        return self.directory / f"{backend.key}-{sha256[:16]}-peer{backend.default_peer}-atol{LATTICE_ATOL:g}.npy"
+
+    def get(self, backend):
+        """الجدول الجاهز للنموذج الحالي أو None مع بدء بنائه في الخلفية"""
+        sha256 = backend.fingerprint()
+        path = self.path_for(backend, sha256)
+
+        with self._lock:
+            lattice = self._lattices.get(path)
+            if lattice is not None or path in self._refused:
+                return lattice
+            if path.exists():
+                lattice = self._lattices[path] = PredictionLattice.load(path)
+                return lattice
+            if path not in self._building:
+                self._building.add(path)
+                threading.Thread(target=self._build, args=(backend, path), daemon=True).start()
+        return None
+
+    def _build(self, backend, path):
+        try:
+            try:
+                lattice = PredictionLattice.build(backend.load(), backend.default_peer)
+            except ValueError:
+                with self._lock:
+                    self._refused.add(path)
+                return
+            lattice.save(path)
+            # حذف جداول الإصدارات السابقة من نفس النموذج
+            for old_path in self.directory.glob(f"{backend.key}-*.npy"):
+                if old_path != path:
+                    old_path.unlink(missing_ok=True)
+            with self._lock:
+                self._lattices = {p: l for p, l in self._lattices.items() if p.exists()}
+                self._lattices[path] = PredictionLattice.load(path)
+        finally:
+            with self._lock:
+                self._building.discard(path)
+
+    def is_building(self, backend):
+        with self._lock:
+            return any(path.name.startswith(f"{backend.key}-") for path in self._building)
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_lattice_store():
+    """إرجاع مخزن الجداول المشترك بين جميع جلسات العملية"""
+    global _shared_store
+    if _shared_store is None:
+        with _shared_lock:
+            if _shared_store is None:
+                _shared_store = LatticeStore()
+    return _shared_store
@@ -0,0 +1,369 @@
+"""
+🌐 خدمة تنبؤ HTTP/JSON بدون Streamlit
+تجميع الطلبات المتزامنة في دفعات صغيرة تُقيّم باستدعاء واحد لـ model.predict
+خطة بلوغ المستوى التالي (goal_seeking) اختيارية لكل طلب: {"plan": true} في السجل أو بجانب records
+
+التشغيل:
+    python prediction_service.py serve --port 8502 --backend linear
+    python prediction_service.py loadgen --url http://127.0.0.1:8502 --concurrency 32 --requests 5000
+"""
+
+import argparse
+import collections
+import http.client
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import numpy as np
+
+from goal_seeking import prepare, seek_targets
+from model_backends import BACKENDS, DEFAULT_BACKEND, get_backend
+from model_cache import get_model_cache
+from scoring import FEATURE_COLUMNS, clip_scores, graded_records, record_features
+
+
+DEFAULT_PORT = 8502
+DEFAULT_MAX_WAIT_MS = 2.0
+DEFAULT_MAX_BATCH = 1024
+# ميزانية بحث الخطط لكل دفعة: البحث يجري على خيط التجميع فيؤخر الطلبات المنتظرة بقدرها على الأكثر
+DEFAULT_PLAN_BUDGET_MS = 50.0
+
+
+# ============================================================================
+# 1. العدادات
+# ============================================================================
+def percentiles(values, points=(50, 95, 99)):
+    """مئينات زمن الاستجابة بالمللي ثانية"""
+    if not values:
+        return {f"p{p}": None for p in points}
+    result = np.percentile(np.fromiter(values, dtype=float), points) * 1000
+    return {f"p{p}": float(v) for p, v in zip(points, result)}
+
+
+class ServiceMetrics:
+    """عدادات الإنتاجية وزمن الاستجابة (آخر 10000 طلب للمئينات)"""
+
+    def __init__(self, window=10_000):
+        self._lock = threading.Lock()
+        self.started_at = time.perf_counter()
+        self.requests = 0
+        self.rows = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.predict_seconds = 0.0
+        self.latencies = collections.deque(maxlen=window)
+
+    def record_request(self, latency, ok=True):
+        with self._lock:
+            self.requests += 1
+            self.errors += 0 if ok else 1
+            self.latencies.append(latency)
+
+    def record_batch(self, n_requests, n_rows, seconds):
+        with self._lock:
+            self.batches += 1
+            self.batched_requests += n_requests
+            self.rows += n_rows
+            self.predict_seconds += seconds
+
+    def snapshot(self):
+        with self._lock:
+            uptime = time.perf_counter() - self.started_at
+            return {
+                'uptime_seconds': uptime,
+                'requests': self.requests,
+                'rows': self.rows,
+                'errors': self.errors,
+                'batches': self.batches,
+                'mean_batch_requests': self.batched_requests / self.batches if self.batches else 0.0,
+                'requests_per_second': self.requests / uptime if uptime else 0.0,
+                'predict_seconds': self.predict_seconds,
+                'latency_ms': percentiles(list(self.latencies)),
+            }
+
+
+# ============================================================================
+# 2. تجميع الطلبات
+# ============================================================================
+class _PendingRequest:
+    __slots__ = ('rows', 'plan', 'done', 'results', 'error')
+
+    def __init__(self, rows, plan=False):
+        self.rows = rows
+        self.plan = plan
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    خيط واحد يسحب الطلبات من الطابور: ينتظر أول طلب، ثم يجمع ما يصل خلال max_wait
+    (أو حتى max_batch صفاً) ويقيّمها جميعاً باستدعاء predict واحد. خطط الطلبات التي تطلبها
+    تُحسب معاً ضمن plan_budget ثانية لكل دفعة.
+    """
+
+    def __init__(self, backend, metrics, max_wait=DEFAULT_MAX_WAIT_MS / 1000, max_batch=DEFAULT_MAX_BATCH,
+                 plan_budget=DEFAULT_PLAN_BUDGET_MS / 1000):
+        self.backend = backend
+        self.metrics = metrics
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.plan_budget = plan_budget
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, rows, plan=False):
+        """إرسال صفوف الطلب وانتظار نتائجها (plan: مع خطة goal_seeking لكل صف)"""
+        pending = _PendingRequest(rows, plan)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.results
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        n_rows = len(batch[0].rows)
+        deadline = time.perf_counter() + self.max_wait
+        while n_rows < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                pending = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(pending)
+            n_rows += len(pending.rows)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                X = np.array([row for pending in batch for row in pending.rows], dtype=float)
+                start = time.perf_counter()
+                model = self.backend.load()
+                scores = clip_scores(model.predict(X))
+                records = graded_records(scores)
+                planned = np.repeat([pending.plan for pending in batch], [len(pending.rows) for pending in batch])
+                if planned.any():
+                    plan = seek_targets(model, X[planned], scores[planned], self.plan_budget)
+                    for idx, record in zip(np.flatnonzero(planned), graded_records(scores[planned], plan)):
+                        records[idx] = record
+                self.metrics.record_batch(len(batch), len(X), time.perf_counter() - start)
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+                    pending.done.set()
+                continue
+
+            offset = 0
+            for pending in batch:
+                pending.results = records[offset:offset + len(pending.rows)]
+                offset += len(pending.rows)
+                pending.done.set()
+
+
+# ============================================================================
+# 3. خادم HTTP
+# ============================================================================
+class PredictionHandler(BaseHTTPRequestHandler):
+    """POST /predict و GET /metrics و GET /health"""
+
+    protocol_version = 'HTTP/1.1'
+    # الترويسة والجسم يُكتبان منفصلين؛ بدون هذا تضيف خوارزمية Nagle ~40ms لكل رد
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == '/health':
+            self._send_json(200, {'status': 'ok', 'backend': self.server.batcher.backend.key})
+        elif path == '/metrics':
+            self._send_json(200, {
+                'service': self.server.metrics.snapshot(),
+                'model_cache': {k: v for k, v in get_model_cache().stats().items() if k != 'models'},
+            })
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/predict':
+            self._send_json(404, {'error': 'not found'})
+            return
+
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'null')
+            single = isinstance(payload, dict) and 'records' not in payload
+            records = [payload] if single else payload.get('records') if isinstance(payload, dict) else payload
+            if not isinstance(records, list) or not records:
+                raise ValueError("يجب إرسال سجل أو قائمة سجلات")
+            default_peer = self.server.batcher.backend.default_peer
+            rows = [record_features(record, default_peer) for record in records]
+            plan = payload.get('plan') is True if isinstance(payload, dict) else False
+        except (ValueError, TypeError, AttributeError, KeyError) as e:
+            self.server.metrics.record_request(time.perf_counter() - start, ok=False)
+            self._send_json(400, {'error': str(e), 'columns': FEATURE_COLUMNS})
+            return
+
+        try:
+            results = self.server.batcher.submit(rows, plan)
+        except Exception as e:
+            self.server.metrics.record_request(time.perf_counter() - start, ok=False)
+            self._send_json(500, {'error': str(e)})
+            return
+
+        self.server.metrics.record_request(time.perf_counter() - start)
+        self._send_json(200, results[0] if single else results)
+
+    def _send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # تسجيل كل طلب يكلّف أكثر من التنبؤ نفسه
+        pass
+
+
+class PredictionServer(ThreadingHTTPServer):
+    """خادم متعدد الخيوط بطابور اتصالات يتسع لمولّد الحمل"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def make_server(host='127.0.0.1', port=DEFAULT_PORT, backend_key=DEFAULT_BACKEND,
+                max_wait_ms=DEFAULT_MAX_WAIT_MS, max_batch=DEFAULT_MAX_BATCH, plan_budget_ms=DEFAULT_PLAN_BUDGET_MS):
+    """إنشاء الخادم مع تحميل النموذج وجداول الخطط مسبقاً حتى لا يدفع أول طلب كلفة التحميل"""
+    backend = get_backend(backend_key)
+    prepare(backend.load())
+
+    server = PredictionServer((host, port), PredictionHandler)
+    server.metrics = ServiceMetrics()
+    server.batcher = MicroBatcher(backend, server.metrics, max_wait_ms / 1000, max_batch, plan_budget_ms / 1000)
+    return server
+
+
+# ============================================================================
+# 4. مولّد الحمل المحلي
+# ============================================================================
+def random_records(n, seed=0):
+    """سجلات طلاب عشوائية ضمن مجال أدوات الإدخال"""
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            'Hours_Studied': int(rng.integers(0, 41)),
+            'Attendance': int(rng.integers(60, 101)),
+            'Previous_Scores': round(float(rng.uniform(50, 100)), 1),
+            'Tutoring_Sessions': int(rng.integers(0, 11)),
+        }
+        for _ in range(n)
+    ]
+
+
+def run_load(url, concurrency=32, total_requests=5000, seed=0):
+    """إرسال طلبات متزامنة عبر اتصالات دائمة وقياس الإنتاجية وزمن الاستجابة من جهة العميل"""
+    target = urlparse(url)
+    records = random_records(total_requests, seed)
+    next_index = iter(range(total_requests))
+    index_lock = threading.Lock()
+    latencies = []
+    errors = [0]
+    stats_lock = threading.Lock()
+
+    def worker():
+        conn = http.client.HTTPConnection(target.hostname, target.port or 80)
+        local = []
+        while True:
+            with index_lock:
+                idx = next(next_index, None)
+            if idx is None:
+                break
+            body = json.dumps(records[idx]).encode('utf-8')
+            start = time.perf_counter()
+            try:
+                conn.request('POST', '/predict', body, {'Content-Type': 'application/json'})
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(target.hostname, target.port or 80)
+                ok = False
+            local.append(time.perf_counter() - start)
+            if not ok:
+                with stats_lock:
+                    errors[0] += 1
+        conn.close()
+        with stats_lock:
+            latencies.extend(local)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'concurrency': concurrency,
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed if elapsed else 0.0,
+        'latency_ms': percentiles(latencies),
+    }
+
+
+# ============================================================================
+# 5. واجهة سطر الأوامر
+# ============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="خدمة تنبؤ JSON مع تجميع الطلبات")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help="تشغيل الخادم")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve.add_argument('--backend', choices=sorted(BACKENDS), default=DEFAULT_BACKEND)
+    serve.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS)
+    serve.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH)
+    serve.add_argument('--plan-budget-ms', type=float, default=DEFAULT_PLAN_BUDGET_MS)
+
+    loadgen = commands.add_parser('loadgen', help="توليد حمل على خادم قائم")
+    loadgen.add_argument('--url', default=f"http://127.0.0.1:{DEFAULT_PORT}")
+    loadgen.add_argument('--concurrency', type=int, default=32)
+    loadgen.add_argument('--requests', type=int, default=5000)
+    loadgen.add_argument('--seed', type=int, default=0)
+
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        server = make_server(args.host, args.port, args.backend, args.max_wait_ms, args.max_batch,
+                             args.plan_budget_ms)
+        print(f"🌐 خدمة التنبؤ تعمل على http://{args.host}:{args.port} ({args.backend})", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    else:
+        print(json.dumps(run_load(args.url, args.concurrency, args.requests, args.seed), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+🖼️ صور التقارير من images.zip مباشرة
+فهرس لأعضاء الأرشيف يُبنى من دليل الملف المركزي دون فك ضغط أي صورة، وصور مصغّرة تُولّد
+مرة واحدة وتُحفظ على القرص باسم مفتاح العضو (الاسم وCRC والحجم من الدليل)، والصورة
+الكاملة تُقرأ من الأرشيف عند فتحها فقط.
+"""
+
+import hashlib
+import io
+import os
+import threading
+import zipfile
+from pathlib import Path
+
+
+ARCHIVE_PATH = 'images.zip'
+THUMBNAIL_DIR = Path('.cache') / 'thumbnails'
+THUMBNAIL_SIZE = 480
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif')
+
+
+# ============================================================================
+# 1. عضو الأرشيف
+# ============================================================================
+class ReportImage:
+    """صورة واحدة داخل الأرشيف"""
+
+    __slots__ = ('name', 'member', 'size', 'crc')
+
+    def __init__(self, name, member, size, crc):
+        self.name = name
+        self.member = member
+        self.size = size
+        self.crc = crc
+
+    @property
+    def key(self):
+        """مفتاح الصورة المصغّرة: يتغير مع محتوى العضو دون قراءته (CRC والحجم في دليل الأرشيف)"""
+        return hashlib.sha256(f"{self.member}\0{self.crc:08x}\0{self.size}".encode()).hexdigest()
+
+    @property
+    def caption(self):
+        return os.path.splitext(self.name)[0].replace('_', ' ')
+
+
+# ============================================================================
+# 2. الأرشيف
+# ============================================================================
+class ImageArchive:
+    """قراءة صور الأرشيف دون فك ضغطه إلى مجلد"""
+
+    def __init__(self, path=ARCHIVE_PATH, thumbnail_dir=THUMBNAIL_DIR, thumbnail_size=THUMBNAIL_SIZE):
+        self.path = path
+        self.thumbnail_dir = Path(thumbnail_dir)
+        self.thumbnail_size = thumbnail_size
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._images = []
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def images(self):
+        """فهرس الصور مرتباً بالاسم؛ يُعاد بناؤه فقط عند تغيّر ملف الأرشيف"""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return self._images
+        with self._lock:
+            if stamp != self._stamp:
+                self._images = self._build_index() if stamp is not None else []
+                self._stamp = stamp
+        return self._images
+
+    def _build_index(self):
+        images = []
+        with zipfile.ZipFile(self.path) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not info.filename.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                # infolist() يقرأ الدليل المركزي فقط: لا تُفك أي صورة لعرض المعرض
+                images.append(ReportImage(os.path.basename(info.filename), info.filename, info.file_size, info.CRC))
+        return sorted(images, key=lambda image: image.name.lower())
+
+    def read(self, image):
+        """بايتات الصورة بدقتها الكاملة"""
+        with zipfile.ZipFile(self.path) as archive:
+            return archive.read(image.member)
+
+    def thumbnail_path(self, image):
+        return self.thumbnail_dir / f"{image.key[:20]}-{self.thumbnail_size}.webp"
+
+    def thumbnail(self, image):
+        """بايتات الصورة المصغّرة (WebP)، تُولّد عند أول طلب فقط"""
+        path = self.thumbnail_path(image)
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            pass
+
+        from PIL import Image
+
+        with Image.open(io.BytesIO(self.read(image))) as img:
+            img.thumbnail((self.thumbnail_size, self.thumbnail_size))
+            buffer = io.BytesIO()
+            img.save(buffer, format='WEBP', quality=80, method=4)
+        data = buffer.getvalue()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        return data
+
+    def page(self, number, page_size):
+        """صور الصفحة number (تبدأ من 1) وعدد الصفحات الكلي"""
+        images = self.images()
+        page_count = max(1, -(-len(images) // page_size))
+        number = min(max(1, number), page_count)
+        start = (number - 1) * page_size
+        return images[start:start + page_size], page_count
+
+
+_shared_archive = None
+_shared_lock = threading.Lock()
+
+
+def get_image_archive():
+    """الأرشيف المشترك بين جميع جلسات العملية"""
+    global _shared_archive
+    if _shared_archive is None:
+        with _shared_lock:
+            if _shared_archive is None:
+                _shared_archive = ImageArchive()
+    return _shared_archive
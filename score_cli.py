@@ -0,0 +1,162 @@
+"""
+📟 تقييم الطلاب من سطر الأوامر بذاكرة ثابتة
+قراءة JSONL أو CSV من الإدخال القياسي وكتابة السجلات المقيّمة إلى الإخراج القياسي
+
+أمثلة:
+    python score_cli.py < students.jsonl > scored.jsonl
+    python score_cli.py --format csv --backend svr < students.csv > scored.csv
+    python score_cli.py --plan < students.jsonl > planned.jsonl     # مع خطة بلوغ المستوى التالي
+"""
+
+import argparse
+import csv
+import functools
+import json
+import sys
+import time
+
+import numpy as np
+
+from goal_seeking import seek_targets
+from model_backends import BACKENDS, DEFAULT_BACKEND, get_backend
+from scoring import PLAN_FIELDS, clip_scores, graded_records, record_features
+
+
+DEFAULT_BATCH_SIZE = 4096
+RESULT_FIELDS = ['score', 'color_key', 'feedback', 'grade']
+
+
+# ============================================================================
+# 1. مراحل خط المعالجة (مولّدات)
+# ============================================================================
+def read_jsonl(stream):
+    # الأسطر تُحلَّل داخل معالجة كل سجل (parse_json_record) حتى لا يوقف سطر تالف بقية الملف
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def parse_json_record(line):
+    """سطر JSONL إلى قاموس؛ ValueError للنص التالف أو لقيمة ليست كائناً"""
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError(f"كل سطر يجب أن يكون كائن JSON لا {type(record).__name__}")
+    return record
+
+
+def read_csv(stream):
+    for row in csv.DictReader(stream):
+        # الخلايا الفارغة تعني قيماً مفقودة
+        yield {key: (value if value != '' else None) for key, value in row.items()}
+
+
+def batched(records, size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def score_batches(batches, backend, default_peer=None, plan=False, budget=None, parse=None):
+    """
+    تقييم كل دفعة باستدعاء predict واحد؛ السجلات غير الصالحة تُرجع مع حقل error.
+    plan: إضافة خطة goal_seeking لكل سجل (budget: ميزانية البحث لكل دفعة بالثواني).
+    parse: تحويل كل عنصر خام إلى قاموس (مثل parse_json_record)؛ ما يفشل تحليله يُرجع
+    كسجل {'input': النص، 'error': السبب}.
+    """
+    if default_peer is None:
+        default_peer = backend.default_peer
+    model = backend.load()
+
+    for batch in batches:
+        rows, valid = [], []
+        for idx, item in enumerate(batch):
+            try:
+                record = batch[idx] = parse(item) if parse else item
+            except ValueError as e:
+                batch[idx] = {'input': item, 'error': str(e)}
+                continue
+            try:
+                rows.append(record_features(record, default_peer))
+                valid.append(idx)
+            except (ValueError, TypeError) as e:
+                record['error'] = str(e)
+
+        if rows:
+            X = np.array(rows, dtype=float)
+            scores = clip_scores(model.predict(X))
+            graded = graded_records(scores, seek_targets(model, X, scores, budget) if plan else None)
+            for idx, result in zip(valid, graded):
+                batch[idx].update(result)
+        yield from batch
+
+
+def write_jsonl(records, stream):
+    for record in records:
+        stream.write(json.dumps(record, ensure_ascii=False))
+        stream.write('\n')
+        yield record
+
+
+def write_csv(records, stream, plan=False):
+    writer = None
+    result_fields = RESULT_FIELDS + (PLAN_FIELDS + ['plan_status'] if plan else []) + ['error']
+    for record in records:
+        if writer is None:
+            # الأعمدة تُحدد من أول سجل مع إضافة حقول النتيجة والخطأ
+            fieldnames = list(record) + [key for key in result_fields if key not in record]
+            writer = csv.DictWriter(stream, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+        writer.writerow(record)
+        yield record
+
+
+# ============================================================================
+# 2. نقطة الدخول
+# ============================================================================
+def main(argv=None, stdin=None, stdout=None, stderr=None):
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+
+    parser = argparse.ArgumentParser(description="تقييم سجلات الطلاب من الإدخال القياسي")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument('--default-peer', type=float, default=None,
+                        help="قيمة تأثير الأقران عند غيابها (الافتراضي حسب النموذج)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--plan', action='store_true',
+                        help="إضافة أقل تغيير يبلغ المستوى التالي لكل سجل (goal_seeking)")
+    parser.add_argument('--plan-budget', type=float, default=None,
+                        help="ميزانية بحث الخطة لكل دفعة بالثواني (الافتراضي GOAL_SEEK_BUDGET)")
+    args = parser.parse_args(argv)
+
+    if args.format == 'csv':
+        reader, parse, writer = read_csv, None, functools.partial(write_csv, plan=args.plan)
+    else:
+        reader, parse, writer = read_jsonl, parse_json_record, write_jsonl
+
+    start = time.perf_counter()
+    records = reader(stdin)
+    scored = score_batches(batched(records, args.batch_size), get_backend(args.backend), args.default_peer,
+                           args.plan, args.plan_budget, parse)
+
+    total = errors = 0
+    for record in writer(scored, stdout):
+        total += 1
+        errors += 'error' in record
+    stdout.flush()
+
+    elapsed = time.perf_counter() - start
+    print(f"scored={total - errors} errors={errors} seconds={elapsed:.3f} "
+          f"rows_per_second={total / elapsed if elapsed else 0:.0f}", file=stderr)
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
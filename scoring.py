@@ -0,0 +1,209 @@
+"""
+🧮 التقييم والتوصيات بشكل متجهي
+منطق التصنيف المشترك بين التنبؤ الفردي والتنبؤ الجماعي لملفات CSV
+(pandas يُستورد داخل دوال الإطارات فقط حتى يبقى بدء أدوات سطر الأوامر سريعاً)
+"""
+
+import math
+
+import numpy as np
+
+
+# ============================================================================
+# 1. الأعمدة وحدود التقييم
+# ============================================================================
+FEATURE_COLUMNS = ['Hours_Studied', 'Attendance', 'Previous_Scores', 'Tutoring_Sessions', 'Peer_Influence']
+REQUIRED_COLUMNS = FEATURE_COLUMNS[:4]
+DEFAULT_PEER_INFLUENCE = 3
+
+# حدود الدرجات بترتيب تصاعدي: أقل من 60 ضعيف، 60-75 مقبول، 75-90 جيد جداً، 90+ ممتاز
+GRADE_THRESHOLDS = np.array([60, 75, 90])
+
+# لكل مستوى: مفتاح اللون، الملاحظة، التقييم (التوصيات يحسبها goal_seeking من النموذج نفسه)
+GRADE_BANDS = [
+    ('danger', "أداء ضعيف - يحتاج إلى دعم مكثف", "ضعيف"),
+    ('warning', "أداء مقبول - يحتاج إلى تحسين", "مقبول"),
+    ('info', "أداء جيد جداً - يواصل التقدم", "جيد جداً"),
+    ('success', "أداء استثنائي - مستوى متميز", "ممتاز"),
+]
+
+# حقول الخطة في نتائج التنبؤ (نفس مفاتيح goal_seeking.seek_targets عدا status)
+PLAN_FIELDS = ['target', 'recommended_hours', 'recommended_attendance', 'recommended_tutoring', 'expected_score']
+
+_BAND_COLOR_KEYS = np.array([band[0] for band in GRADE_BANDS], dtype=object)
+_BAND_FEEDBACK = np.array([band[1] for band in GRADE_BANDS], dtype=object)
+_BAND_GRADES = np.array([band[2] for band in GRADE_BANDS], dtype=object)
+
+
+# ============================================================================
+# 2. التصنيف
+# ============================================================================
+def grade_bands(scores):
+    """رقم المستوى (0-3) لكل درجة"""
+    return np.searchsorted(GRADE_THRESHOLDS, np.asarray(scores, dtype=float), side='right')
+
+
+def grade_scores(scores):
+    """تطبيق التصنيف على مصفوفة درجات كاملة دفعة واحدة"""
+    band = grade_bands(scores)
+    return {
+        'band': band,
+        'color_key': _BAND_COLOR_KEYS[band],
+        'feedback': _BAND_FEEDBACK[band],
+        'grade': _BAND_GRADES[band],
+    }
+
+
+def grade_score(score):
+    """تصنيف درجة واحدة باستخدام نفس جدول المستويات"""
+    color_key, feedback, grade = GRADE_BANDS[int(grade_bands(score))]
+    return {'color_key': color_key, 'feedback': feedback, 'grade': grade}
+
+
+def clip_scores(raw_scores):
+    """تقريب الدرجات المتوقعة وحصرها بين 0 و 100"""
+    return np.clip(np.round(raw_scores, 2), 0, 100)
+
+
+def graded_records(scores, plan=None):
+    """
+    تحويل الدرجات إلى قواميس بنفس حقول نتيجة predict_score (بدون الألوان)، مع حقول خطة
+    goal_seeking.seek_targets إن مُررت (الحقول غير المتاحة None)
+    """
+    graded = grade_scores(scores)
+    records = [
+        {'score': float(score), 'color_key': color_key, 'feedback': feedback, 'grade': grade}
+        for score, color_key, feedback, grade in zip(scores, graded['color_key'], graded['feedback'], graded['grade'])
+    ]
+    if plan is not None:
+        values = np.column_stack([plan[field] for field in PLAN_FIELDS]).astype(float)
+        plan_values = values.astype(object)
+        plan_values[np.isnan(values)] = None
+        for record, values, status in zip(records, plan_values.tolist(), plan['status']):
+            record.update(zip(PLAN_FIELDS, values), plan_status=status)
+    return records
+
+
+def record_features(record, default_peer=DEFAULT_PEER_INFLUENCE):
+    """صف ميزات من قاموس يحمل أسماء الأعمدة (تأثير الأقران اختياري)"""
+    missing = [col for col in REQUIRED_COLUMNS if record.get(col) is None]
+    if missing:
+        raise ValueError(f"أعمدة مفقودة: {', '.join(missing)}")
+    peer = record.get('Peer_Influence')
+    features = [float(record[col]) for col in REQUIRED_COLUMNS] + [float(default_peer if peer is None else peer)]
+    # float() يقبل "nan" و"inf"، ودرجة NaN كانت تُصنَّف "ممتاز"
+    invalid = [col for col, value in zip(FEATURE_COLUMNS, features) if not math.isfinite(value)]
+    if invalid:
+        raise ValueError(f"قيم غير رقمية: {', '.join(invalid)}")
+    return features
+
+
+# ============================================================================
+# 3. التنبؤ الجماعي
+# ============================================================================
+def missing_columns(df):
+    """الأعمدة المطلوبة غير الموجودة في الملف"""
+    return [col for col in REQUIRED_COLUMNS if col not in df.columns]
+
+
+def build_feature_matrix(df, default_peer=DEFAULT_PEER_INFLUENCE):
+    """تحويل الإطار إلى مصفوفة ميزات بالترتيب الذي يتوقعه النموذج (NaN للقيم غير الصالحة)"""
+    import pandas as pd
+
+    missing = missing_columns(df)
+    if missing:
+        raise ValueError(f"أعمدة مفقودة: {', '.join(missing)}")
+
+    X = np.empty((len(df), len(FEATURE_COLUMNS)), dtype=float)
+    for idx, col in enumerate(REQUIRED_COLUMNS):
+        X[:, idx] = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+
+    if 'Peer_Influence' in df.columns:
+        peer = pd.to_numeric(df['Peer_Influence'], errors='coerce').to_numpy(dtype=float)
+        X[:, 4] = np.where(np.isnan(peer), default_peer, peer)
+    else:
+        X[:, 4] = default_peer
+
+    # اللانهايات تُعامل كقيم مفقودة: الصف لا يُقيَّم (الأقران الفارغة وحدها تأخذ القيمة الافتراضية)
+    X[np.isinf(X)] = np.nan
+    return X
+
+
+def score_frame(model, df, default_peer=DEFAULT_PEER_INFLUENCE, colors=None, plan=False, budget=None,
+                members=None, confidence=None):
+    """
+    التنبؤ بدرجات جميع الصفوف باستدعاء واحد لـ model.predict.
+    plan: إضافة خطة بلوغ المستوى التالي لكل صف (budget: ميزانية البحث بالثواني للنماذج غير الخطية).
+    members: مجموعة bootstrap (prediction_intervals) لإضافة فترة التنبؤ عند مستوى الثقة confidence.
+    الصفوف التي تنقصها قيم مطلوبة تُترك بدون درجة.
+    """
+    import pandas as pd
+
+    X = build_feature_matrix(df, default_peer)
+    valid = ~np.isnan(X).any(axis=1)
+
+    scores = np.full(len(X), np.nan)
+    if valid.any():
+        scores[valid] = clip_scores(model.predict(X[valid]))
+
+    graded = grade_scores(np.where(valid, scores, 0))
+    codes = np.where(valid, graded['band'], -1)
+
+    color_labels = _BAND_COLOR_KEYS if colors is None else [colors[key] for key in _BAND_COLOR_KEYS]
+
+    intervals = {}
+    if members is not None:
+        from prediction_intervals import DEFAULT_CONFIDENCE, interval_bounds
+
+        lower, upper = np.full(len(X), np.nan), np.full(len(X), np.nan)
+        if valid.any():
+            lower[valid], upper[valid] = interval_bounds(
+                members, X[valid], DEFAULT_CONFIDENCE if confidence is None else confidence)
+        intervals = {'Interval_Low': lower, 'Interval_High': upper}
+
+    plan_columns = {}
+    if plan:
+        from goal_seeking import STATUSES, seek_targets
+
+        values = {field: np.full(len(X), np.nan) for field in PLAN_FIELDS}
+        plan_codes = np.full(len(X), -1)
+        if valid.any():
+            valid_plan = seek_targets(model, X[valid], scores[valid], budget)
+            for field in PLAN_FIELDS:
+                values[field][valid] = valid_plan[field]
+            plan_codes[valid] = pd.Categorical(valid_plan['status'], categories=STATUSES).codes
+        plan_columns = {
+            'Target_Score': values['target'],
+            'Recommended_Hours': values['recommended_hours'],
+            'Recommended_Attendance': values['recommended_attendance'],
+            'Recommended_Tutoring': values['recommended_tutoring'],
+            'Expected_Score': values['expected_score'],
+            'Plan_Status': pd.Categorical.from_codes(plan_codes, STATUSES),
+        }
+
+    # أعمدة نصية كفئات مبنية من أرقام المستويات مباشرة دون إنشاء نصوص لكل صف
+    return pd.DataFrame({
+        'Predicted_Score': scores,
+        **intervals,
+        'Grade': pd.Categorical.from_codes(codes, _BAND_GRADES),
+        'Color': pd.Categorical.from_codes(codes, color_labels),
+        'Feedback': pd.Categorical.from_codes(codes, _BAND_FEEDBACK),
+        **plan_columns,
+    }, index=df.index)
+
+
+def iter_scored_chunks(model, source, default_peer=DEFAULT_PEER_INFLUENCE, chunksize=100_000, colors=None, **read_kwargs):
+    """قراءة ملف CSV على دفعات وإرجاع كل دفعة مع درجاتها (استدعاء predict واحد لكل دفعة)"""
+    import pandas as pd
+
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    yield from score_chunks(model, pd.read_csv(source, chunksize=chunksize, **read_kwargs), default_peer, colors)
+
+
+def score_chunks(model, chunks, default_peer=DEFAULT_PEER_INFLUENCE, colors=None, **options):
+    """إرجاع كل دفعة DataFrame مع درجاتها (من CSV أو من مكتبة البيانات)؛ options تُمرَّر إلى score_frame"""
+    import pandas as pd
+
+    for chunk in chunks:
+        yield pd.concat([chunk, score_frame(model, chunk, default_peer, colors, **options)], axis=1)
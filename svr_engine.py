@@ -0,0 +1,172 @@
+"""
+⚡ محرك استدلال متجهي لنموذج SVR
+تقييم نواة RBF لدفعة كاملة كضرب مصفوفات واحد باستخدام NumPy فقط
+"""
+
+import numpy as np
+
+
+DEFAULT_TOLERANCE = {np.float64: 1e-6, np.float32: 1e-3}
+DEFAULT_BLOCK_ROWS = 4096
+
+
+# ============================================================================
+# 1. المحرك
+# ============================================================================
+class SVREngine:
+    """
+    تنبؤ SVR بنواة RBF:
+        f(x) = Σ αᵢ · exp(-γ‖x - svᵢ‖²) + b
+    حيث ‖x - sv‖² = ‖x‖² + ‖sv‖² - 2·x·sv، و‖sv‖² محسوبة مسبقاً مرة واحدة.
+    البيانات تُزاح بمتوسط متجهات الدعم لتقليل خطأ الطرح في وضع float32.
+    """
+
+    def __init__(self, support_vectors, dual_coef, intercept, gamma,
+                 feature_names=None, dtype=np.float64, prune_tol=0.0):
+        support_vectors = np.asarray(support_vectors, dtype=np.float64)
+        dual_coef = np.asarray(dual_coef, dtype=np.float64).ravel()
+
+        # حذف متجهات الدعم ذات المعاملات القريبة من الصفر
+        keep = np.abs(dual_coef) > prune_tol
+        self.n_pruned = int((~keep).sum())
+        support_vectors = support_vectors[keep]
+        dual_coef = dual_coef[keep]
+
+        self.dtype = np.dtype(dtype).type
+        self.gamma = float(gamma)
+        self.intercept = float(np.ravel(intercept)[0])
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.shift = support_vectors.mean(axis=0) if len(support_vectors) else np.zeros(support_vectors.shape[1])
+
+        centered = support_vectors - self.shift
+        self.support_vectors = np.ascontiguousarray(centered, dtype=self.dtype)
+        self.sv_sq_norms = np.einsum('ij,ij->i', centered, centered).astype(self.dtype)
+        self.dual_coef = dual_coef.astype(self.dtype)
+
+    # ---------- الإنشاء ----------
+    @classmethod
+    def from_sklearn(cls, svr, feature_names=None, **kwargs):
+        """إنشاء المحرك من نموذج sklearn.svm.SVR مدرّب بنواة RBF"""
+        if svr.kernel != 'rbf':
+            raise ValueError(f"نواة غير مدعومة: {svr.kernel}")
+        if feature_names is None:
+            feature_names = getattr(svr, 'feature_names_in_', None)
+        return cls(svr.support_vectors_, svr.dual_coef_, svr.intercept_, svr._gamma,
+                   feature_names=feature_names, **kwargs)
+
+    @classmethod
+    def from_bundle(cls, bundle, **kwargs):
+        """إنشاء المحرك من حزمة student_model_bundle.pkl"""
+        return cls.from_sklearn(bundle['model'], feature_names=bundle.get('X_columns'), **kwargs)
+
+    def state(self):
+        """المصفوفات الجاهزة للتنبؤ (بعد الإزاحة والتحويل) لحفظها كما هي"""
+        return {
+            'support_vectors': self.support_vectors,
+            'sv_sq_norms': self.sv_sq_norms,
+            'dual_coef': self.dual_coef,
+            'shift': self.shift,
+            'gamma': self.gamma,
+            'intercept': self.intercept,
+            'feature_names': self.feature_names,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        المحرك من مصفوفات state() دون أي نسخ: مع joblib.load(mmap_mode='r')
+        تبقى متجهات الدعم صفحات مشتركة بين كل العمليات التي تفتح الملف.
+        """
+        engine = cls.__new__(cls)
+        engine.n_pruned = 0
+        engine.support_vectors = state['support_vectors']
+        engine.sv_sq_norms = state['sv_sq_norms']
+        engine.dual_coef = state['dual_coef']
+        engine.shift = state['shift']
+        engine.dtype = engine.support_vectors.dtype.type
+        engine.gamma = float(state['gamma'])
+        engine.intercept = float(state['intercept'])
+        engine.feature_names = state['feature_names']
+        return engine
+
+    # ---------- التنبؤ ----------
+    @property
+    def n_support(self):
+        return len(self.dual_coef)
+
+    def predict(self, X, block_rows=DEFAULT_BLOCK_ROWS):
+        """التنبؤ لدفعة كاملة؛ الصفوف تُعالج على كتل لحصر حجم مصفوفة النواة"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        X = (X - self.shift).astype(self.dtype, copy=False)
+
+        out = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), block_rows):
+            block = X[start:start + block_rows]
+            out[start:start + len(block)] = self._predict_block(block)
+        return out
+
+    def _predict_block(self, block):
+        # ‖x‖² + ‖sv‖² - 2·x·sv كضرب مصفوفات واحد، ثم النواة والجمع الموزون
+        sq_dist = block @ self.support_vectors.T
+        sq_dist *= -2
+        sq_dist += np.einsum('ij,ij->i', block, block)[:, None]
+        sq_dist += self.sv_sq_norms
+        np.maximum(sq_dist, 0, out=sq_dist)
+        sq_dist *= -self.gamma
+        np.exp(sq_dist, out=sq_dist)
+        return sq_dist @ self.dual_coef + self.intercept
+
+    # ---------- التقييم على شبكات ----------
+    # نواة RBF حاصل ضرب عوامل مستقلة لكل عمود: exp(-γ‖x - sv‖²) = Π exp(-γ(xⱼ - svⱼ)²)،
+    # فالتنبؤ على شبكة تتغير فيها بضعة أعمدة يصبح ضرب مصفوفات بين عوامل هذه الأعمدة
+    # ووزن ثابت لكل صف يجمع بقية الأعمدة، بدل مسافة كاملة لكل نقطة من الشبكة.
+    def axis_kernels(self, column, values):
+        """عوامل النواة لعمود واحد: exp(-γ(v - svᵢ)²) لكل قيمة v، مصفوفة (قيم × متجهات دعم)"""
+        diff = (np.asarray(values, dtype=np.float64)[:, None] - self.shift[column]
+                - np.asarray(self.support_vectors[:, column], dtype=np.float64)[None, :])
+        return np.exp(-self.gamma * diff * diff)
+
+    def partial_weights(self, X, columns):
+        """αᵢ · exp(-γ · مربع المسافة على الأعمدة columns وحدها) لكل صف: مصفوفة (صفوف × متجهات دعم)"""
+        X = np.asarray(X, dtype=np.float64)[:, columns] - self.shift[columns]
+        sv = np.asarray(self.support_vectors[:, columns], dtype=np.float64)
+        sq_dist = X @ sv.T
+        sq_dist *= -2
+        sq_dist += np.einsum('ij,ij->i', X, X)[:, None]
+        sq_dist += np.einsum('ij,ij->i', sv, sv)
+        np.maximum(sq_dist, 0, out=sq_dist)
+        sq_dist *= -self.gamma
+        np.exp(sq_dist, out=sq_dist)
+        sq_dist *= np.asarray(self.dual_coef, dtype=np.float64)
+        return sq_dist
+
+    # ---------- التحقق ----------
+    def check_against(self, reference, X, atol=None):
+        """
+        مقارنة التنبؤات بنموذج مرجعي (مثل SVR.predict) وإثارة خطأ عند تجاوز السماحية.
+        تُرجع أكبر فرق مطلق.
+        """
+        if atol is None:
+            atol = DEFAULT_TOLERANCE[self.dtype]
+        expected = reference.predict(np.asarray(X, dtype=np.float64))
+        max_error = float(np.max(np.abs(self.predict(X) - expected))) if len(expected) else 0.0
+        if max_error > atol:
+            raise ValueError(f"انحراف محرك SVR عن النموذج المرجعي: {max_error:.3g} > {atol:.3g}")
+        return max_error
+
+
+# ============================================================================
+# 2. التحميل
+# ============================================================================
+def load_bundle_engine(path, verify=True, verify_rows=256, atol=None, **kwargs):
+    """تحميل حزمة SVR وبناء المحرك مع التحقق من مطابقته لـ SVR.predict"""
+    import joblib
+
+    bundle = joblib.load(path)
+    engine = SVREngine.from_bundle(bundle, **kwargs)
+    if verify:
+        svr = bundle['model']
+        engine.check_against(svr, svr.support_vectors_[:verify_rows], atol=atol)
+    return engine
@@ -0,0 +1,351 @@
+"""
+🎛️ ضبط معاملات نموذج SVR بالتحقق المتقاطع على جميع الأنوية
+مصفوفة مربعات المسافات بين صفوف كل طية تُحسب مرة واحدة وتُخزّن على القرص (مفتاحها بصمة
+البيانات)، ثم يُعالج كل زوج (طية، gamma) في عملية مستقلة: نواة RBF بـ exp(-γ·D) تُستخدم لكل
+قيم C و epsilon (SVR بنواة precomputed).
+لكل مرشح يُسجّل خطأ التنبؤ وزمن التدريب وزمن تنبؤ طالب واحد بمحرك الخدمة،
+ويُختار النموذج من حدّ الدقة مقابل زمن الاستجابة لا من الدقة وحدها.
+
+الاستخدام:
+    python svr_tuning.py students.csv [more.csv ...] [--publish]
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+
+TUNING_DIR = Path('.cache') / 'tuning'
+# مصفوفات المسافات تربيعية في عدد الصفوف: الضبط يتم على عينة بهذا الحجم على الأكثر
+TUNING_MAX_ROWS = int(os.environ.get('SVR_TUNING_MAX_ROWS', 2000))
+N_FOLDS = 5
+
+# gamma كمضاعفات لقيمة sklearn الافتراضية 'scale' = 1 / (عدد الميزات × تباين X)
+GAMMA_FACTORS = (0.3, 1.0, 3.0)
+C_VALUES = (1.0, 10.0, 100.0)
+EPSILON_VALUES = (0.1, 0.5, 1.0, 2.0)
+# المرشح المختار: الأسرع على الحد الذي لا يزيد خطؤه عن أفضل خطأ بأكثر من هذه النسبة
+MAE_TOLERANCE = 0.02
+LATENCY_REPEATS = 200
+LATENCY_BATCH_ROWS = 1000
+
+
+# ============================================================================
+# 1. الطيات ومصفوفات المسافات المخزّنة
+# ============================================================================
+def squared_distances(A, B):
+    """‖a - b‖² لكل زوج (بنفس صيغة محرك الخدمة: ‖a‖² + ‖b‖² - 2·a·b)"""
+    D = np.einsum('ij,ij->i', A, A)[:, None] + np.einsum('ij,ij->i', B, B)[None, :] - 2.0 * (A @ B.T)
+    return np.maximum(D, 0.0, out=D)
+
+
+class FoldCache:
+    """
+    مجلد لكل بيانات ضبط (مفتاحه بصمة X و y وعدد الطيات):
+    X.npy و y.npy و folds.npz (فهارس التدريب والتحقق) و dist-<k>.npz لكل طية.
+    العمليات تفتح الملفات بـ mmap فلا تُنسخ البيانات إليها.
+    """
+
+    def __init__(self, X, y, n_folds=N_FOLDS, seed=0, root=TUNING_DIR):
+        digest = hashlib.sha256()
+        for part in (np.ascontiguousarray(X, dtype=np.float64), np.ascontiguousarray(y, dtype=np.float64)):
+            digest.update(part.tobytes())
+        digest.update(f"{n_folds}:{seed}".encode())
+        self.directory = Path(root) / digest.hexdigest()[:20]
+        self.n_folds = n_folds
+
+        if not (self.directory / 'folds.npz').exists():
+            self.directory.mkdir(parents=True, exist_ok=True)
+            _atomic_save(self.directory / 'X.npy', np.save, np.asarray(X, dtype=np.float64))
+            _atomic_save(self.directory / 'y.npy', np.save, np.asarray(y, dtype=np.float64))
+            order = np.random.default_rng(seed).permutation(len(y))
+            folds = np.array_split(order, n_folds)
+            arrays = {}
+            for k, val in enumerate(folds):
+                arrays[f'train{k}'] = np.sort(np.concatenate(folds[:k] + folds[k + 1:]))
+                arrays[f'val{k}'] = np.sort(val)
+            _atomic_save(self.directory / 'folds.npz', np.savez, **arrays)
+
+    def load(self):
+        X = np.load(self.directory / 'X.npy', mmap_mode='r')
+        y = np.load(self.directory / 'y.npy', mmap_mode='r')
+        return X, y
+
+    def fold(self, k):
+        with np.load(self.directory / 'folds.npz') as folds:
+            return folds[f'train{k}'], folds[f'val{k}']
+
+    def distance_path(self, k):
+        """ملف مربعات المسافات (تدريب×تدريب، تحقق×تدريب) للطية k، يُحسب مرة واحدة"""
+        path = self.directory / f'dist-{k}.npz'
+        if not path.exists():
+            X, _ = self.load()
+            train, val = self.fold(k)
+            X_train = np.asarray(X[train])
+            _atomic_save(path, np.savez, train=squared_distances(X_train, X_train),
+                         val=squared_distances(np.asarray(X[val]), X_train))
+        return path
+
+    def distances(self, k):
+        with np.load(self.distance_path(k)) as data:
+            return data['train'], data['val']
+
+
+def _atomic_save(path, save, *args, **kwargs):
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as fh:
+        save(fh, *args, **kwargs)
+    os.replace(tmp_path, path)
+
+
+# ============================================================================
+# 2. تقييم المرشحين
+# ============================================================================
+def candidate_grid(X, gamma_factors=GAMMA_FACTORS, c_values=C_VALUES, epsilon_values=EPSILON_VALUES):
+    """قائمة المرشحين {'C', 'epsilon', 'gamma'} مرتبة حسب gamma"""
+    scale = 1.0 / (X.shape[1] * float(np.var(X)))
+    return [
+        {'C': C, 'epsilon': epsilon, 'gamma': scale * factor}
+        for factor, C, epsilon in itertools.product(gamma_factors, c_values, epsilon_values)
+    ]
+
+
+def r2_score(y, residual):
+    """معامل التحديد، أو NaN إذا كانت درجات التحقق كلها متساوية (لا تباين يُفسَّر)"""
+    total = float(((y - y.mean()) ** 2).sum())
+    return 1.0 - float((residual ** 2).sum()) / total if total > 0 else float('nan')
+
+
+def evaluate_fold(directory, n_folds, k, candidates):
+    """
+    تعمل في عملية فرعية: المرشحون (بقيمة gamma واحدة عادة) على الطية k.
+    النواة تُحسب مرة لكل gamma من مصفوفة المسافات المخزّنة وتُشارك بين قيم C و epsilon.
+    """
+    from sklearn.svm import SVR
+
+    cache = FoldCache.__new__(FoldCache)
+    cache.directory, cache.n_folds = Path(directory), n_folds
+    _, y = cache.load()
+    train, val = cache.fold(k)
+    D_train, D_val = cache.distances(k)
+    y_train, y_val = np.asarray(y[train]), np.asarray(y[val])
+
+    results = []
+    for gamma, group in itertools.groupby(candidates, key=lambda candidate: candidate['gamma']):
+        K_train = np.exp(-gamma * D_train)
+        K_val = np.exp(-gamma * D_val)
+        for candidate in group:
+            start = time.perf_counter()
+            svr = SVR(kernel='precomputed', C=candidate['C'], epsilon=candidate['epsilon']).fit(K_train, y_train)
+            fit_seconds = time.perf_counter() - start
+            residual = y_val - svr.predict(K_val)
+            results.append({
+                **candidate,
+                'fold': k,
+                'mae': float(np.abs(residual).mean()),
+                'r2': r2_score(y_val, residual),
+                'fit_seconds': fit_seconds,
+                # متجهات الدعم من الطية الأولى لقياس زمن التنبؤ في العملية الرئيسية
+                'support': train[svr.support_] if k == 0 else None,
+                'dual_coef': svr.dual_coef_.ravel() if k == 0 else None,
+                'intercept': float(svr.intercept_[0]),
+            })
+    return results
+
+
+def serving_latency(X, support, dual_coef, intercept, gamma, repeats=LATENCY_REPEATS):
+    """زمن التنبؤ بمحرك الخدمة لمرشح من متجهات دعمه (انظر engine_latency)"""
+    from svr_engine import SVREngine
+
+    return engine_latency(SVREngine(X[support], dual_coef, intercept, gamma), X, repeats)
+
+
+def engine_latency(engine, X, repeats=LATENCY_REPEATS):
+    """
+    زمن التنبؤ بمحرك الخدمة (SVREngine): الوسيط لطالب واحد بالميكروثانية،
+    ولدفعة من LATENCY_BATCH_ROWS طالب بالمللي ثانية (يتناسب مع عدد متجهات الدعم)
+    """
+    row = np.asarray(X[:1])
+    batch = np.asarray(X[np.arange(LATENCY_BATCH_ROWS) % len(X)])
+    engine.predict(batch)
+
+    def median_seconds(rows, repeats):
+        timings = np.empty(repeats)
+        for idx in range(repeats):
+            start = time.perf_counter()
+            engine.predict(rows)
+            timings[idx] = time.perf_counter() - start
+        return float(np.median(timings))
+
+    return median_seconds(row, repeats) * 1e6, median_seconds(batch, max(repeats // 20, 3)) * 1e3
+
+
+def tune_svr(X, y, candidates=None, n_folds=N_FOLDS, workers=None, root=TUNING_DIR, progress=None):
+    """
+    التحقق المتقاطع لكل المرشحين (زوج (طية، gamma) لكل مهمة، فيتسع التوازي لعدد الطيات ×
+    عدد قيم gamma) ثم قياس زمن التنبؤ بالتتابع حتى لا تتأثر القياسات بتزاحم العمليات.
+    تُرجع قائمة النتائج مع علامة الحد.
+    """
+    cache = FoldCache(X, y, n_folds=n_folds, root=root)
+    candidates = sorted(candidates or candidate_grid(X), key=lambda candidate: candidate['gamma'])
+    groups = [list(group) for _, group in itertools.groupby(candidates, key=lambda candidate: candidate['gamma'])]
+    tasks = [(k, group) for k in range(n_folds) for group in groups]
+    workers = workers or os.cpu_count() or 1
+
+    # المسافات قبل توزيع المهام: مهام الطية نفسها تقرأ الملف ولا تعيد حسابه
+    for k in range(n_folds):
+        cache.distance_path(k)
+
+    by_fold = []
+    if workers > 1:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context) as pool:
+            futures = [pool.submit(evaluate_fold, str(cache.directory), n_folds, k, group) for k, group in tasks]
+            for done, future in enumerate(as_completed(futures), 1):
+                by_fold.extend(future.result())
+                if progress:
+                    progress(done / len(tasks))
+    else:
+        for done, (k, group) in enumerate(tasks, 1):
+            by_fold.extend(evaluate_fold(str(cache.directory), n_folds, k, group))
+            if progress:
+                progress(done / len(tasks))
+
+    X_cached, _ = cache.load()
+    results = []
+    key = lambda row: (row['gamma'], row['C'], row['epsilon'])
+    for params, rows in itertools.groupby(sorted(by_fold, key=key), key=key):
+        rows = sorted(rows, key=lambda row: row['fold'])
+        first = rows[0]
+        r2 = [row['r2'] for row in rows if not np.isnan(row['r2'])]
+        latency_us, batch_ms = serving_latency(X_cached, first['support'], first['dual_coef'], first['intercept'],
+                                               params[0])
+        results.append({
+            'gamma': params[0],
+            'C': params[1],
+            'epsilon': params[2],
+            'mae': float(np.mean([row['mae'] for row in rows])),
+            'mae_std': float(np.std([row['mae'] for row in rows])),
+            'r2': float(np.mean(r2)) if r2 else None,
+            'fit_seconds': float(np.mean([row['fit_seconds'] for row in rows])),
+            'n_support': int(len(first['support'])),
+            'latency_us': latency_us,
+            'batch_ms': batch_ms,
+        })
+    mark_frontier(results)
+    return results
+
+
+# ============================================================================
+# 3. الاختيار من حدّ الدقة مقابل زمن الاستجابة
+# ============================================================================
+def mark_frontier(results):
+    """
+    المرشح على الحد إذا لم يوجد مرشح أسرع منه وأدق (حد باريتو).
+    السرعة بزمن الدفعة لأن زمن الطالب الواحد تغلب عليه تكلفة الاستدعاء الثابتة.
+    """
+    best_mae = np.inf
+    for row in sorted(results, key=lambda row: (row['batch_ms'], row['mae'])):
+        row['frontier'] = row['mae'] < best_mae
+        best_mae = min(best_mae, row['mae'])
+    return results
+
+
+def select_candidate(results, mae_tolerance=MAE_TOLERANCE):
+    """الأسرع على الحد بين المرشحين الذين لا يزيد خطؤهم عن أفضل خطأ بأكثر من mae_tolerance"""
+    best_mae = min(row['mae'] for row in results)
+    eligible = [row for row in results if row['frontier'] and row['mae'] <= best_mae * (1 + mae_tolerance)]
+    return min(eligible, key=lambda row: row['batch_ms'])
+
+
+def fit_selected(X, y, selected, max_rows=None):
+    """تدريب SVR نهائي بالمعاملات المختارة (حزمة بنفس صيغة student_model_bundle.pkl)"""
+    from sklearn.svm import SVR
+    from model_training import SVR_MAX_ROWS
+    from scoring import FEATURE_COLUMNS
+
+    max_rows = max_rows or SVR_MAX_ROWS
+    if len(y) > max_rows:
+        rows = np.random.default_rng(0).choice(len(y), max_rows, replace=False)
+        X, y = X[rows], y[rows]
+    svr = SVR(C=selected['C'], epsilon=selected['epsilon'], gamma=selected['gamma']).fit(X, y)
+    return {'model': svr, 'X_columns': list(FEATURE_COLUMNS)}
+
+
+# ============================================================================
+# 4. سطر الأوامر
+# ============================================================================
+def _load_csvs(paths, chunksize=100_000):
+    import pandas as pd
+    from model_backends import BACKENDS
+    from model_training import training_matrix
+
+    frames = itertools.chain.from_iterable(pd.read_csv(path, chunksize=chunksize) for path in paths)
+    return training_matrix(frames, 'svr', BACKENDS['svr'].default_peer)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ضبط معاملات SVR بالتحقق المتقاطع")
+    parser.add_argument('csv', nargs='+', help="ملفات البيانات (تحتوي على Exam_Score)")
+    parser.add_argument('--workers', type=int, default=None, help="عدد العمليات (الافتراضي: عدد الأنوية)")
+    parser.add_argument('--max-rows', type=int, default=TUNING_MAX_ROWS, help="حجم عينة الضبط")
+    parser.add_argument('--tolerance', type=float, default=MAE_TOLERANCE, help="الزيادة المسموحة في الخطأ")
+    parser.add_argument('--publish', action='store_true', help="تدريب المرشح المختار ونشره كنموذج SVR")
+    args = parser.parse_args(argv)
+
+    X_full, y_full = _load_csvs(args.csv)
+    rows = np.random.default_rng(0).permutation(len(y_full))[:args.max_rows]
+    X, y = X_full[rows], y_full[rows]
+
+    start = time.perf_counter()
+    results = tune_svr(X, y, workers=args.workers,
+                       progress=lambda fraction: print(f"  {fraction:.0%}", file=sys.stderr))
+    selected = select_candidate(results, args.tolerance)
+    print(f"{len(results)} candidates x {N_FOLDS} folds on {len(y):,} rows in {time.perf_counter() - start:.1f}s",
+          file=sys.stderr)
+
+    print(f"{'gamma':>8} {'C':>6} {'eps':>5} {'MAE':>7} {'R2':>6} {'fit ms':>7} {'SVs':>6} {'µs/pred':>8} {'ms/1k':>6}")
+    for row in sorted(results, key=lambda row: row['mae']):
+        marker = '*' if row is selected else ('+' if row['frontier'] else ' ')
+        r2 = f"{row['r2']:6.3f}" if row['r2'] is not None else f"{'-':>6}"
+        print(f"{row['gamma']:8.5f} {row['C']:6g} {row['epsilon']:5g} {row['mae']:7.3f} {r2} "
+              f"{row['fit_seconds'] * 1e3:7.1f} {row['n_support']:6d} {row['latency_us']:8.1f} {row['batch_ms']:6.2f} {marker}")
+
+    TUNING_DIR.mkdir(parents=True, exist_ok=True)
+    report = {'rows': len(y), 'folds': N_FOLDS, 'selected': selected, 'results': results}
+    _atomic_save(TUNING_DIR / 'report.json',
+                 lambda fh: fh.write(json.dumps(report, indent=2).encode('utf-8')))
+
+    if args.publish:
+        from model_training import publish_estimator
+        from svr_engine import SVREngine
+
+        bundle = fit_selected(X_full, y_full, selected)
+        # النموذج النهائي يُدرّب على صفوف أكثر من عينة الضبط فيحمل متجهات دعم أكثر:
+        # زمنه يُقاس من جديد بدل زمن المرشح على الطية الأولى
+        engine = SVREngine.from_bundle(bundle)
+        latency_us, batch_ms = engine_latency(engine, X_full)
+        print(f"final model: {engine.n_support} SVs, {latency_us:.1f} µs/pred, {batch_ms:.2f} ms/1k "
+              f"(tuning estimate {selected['latency_us']:.1f} µs, {selected['batch_ms']:.2f} ms)", file=sys.stderr)
+
+        version = publish_estimator('svr', bundle, {
+            'source': 'svr_tuning',
+            'params': {name: selected[name] for name in ('C', 'epsilon', 'gamma')},
+            'metrics': {'mae': selected['mae'], 'r2': selected['r2'], 'n_support': engine.n_support,
+                        'latency_us': latency_us, 'batch_ms': batch_ms},
+        })
+        print(f"published svr/{version} (C={selected['C']:g}, epsilon={selected['epsilon']:g}, "
+              f"gamma={selected['gamma']:.5f})", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
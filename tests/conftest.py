@@ -0,0 +1,63 @@
+"""
+إعداد مشترك للاختبارات: وحدات المشروع في جذر المستودع، ونموذج خطي حقيقي
+(من regression_model.pkl بصيغة الخدمة) مع واجهة بسيطة تقدّمه دون سجل النماذج
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+class StaticBackend:
+    """واجهة نموذج ثابتة بنفس حقول ModelBackend التي تحتاجها دوال التقييم"""
+
+    def __init__(self, model, key='linear', default_peer=3):
+        self.model = model
+        self.key = key
+        self.default_peer = default_peer
+
+    def load(self):
+        return self.model
+
+
+@pytest.fixture(scope='session')
+def linear_model():
+    import joblib
+    from model_export import LinearModel
+
+    estimator = joblib.load(ROOT / 'regression_model.pkl')
+    return LinearModel(estimator.coef_, estimator.intercept_, getattr(estimator, 'feature_names_in_', None))
+
+
+@pytest.fixture
+def linear_backend(linear_model):
+    return StaticBackend(linear_model)
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """سجل نماذج فارغ في مجلد مؤقت يحل محل السجل المشترك، ومجلد عمل فارغ (بلا ملفات legacy)"""
+    import model_registry
+
+    workdir = tmp_path / 'work'
+    workdir.mkdir()
+    monkeypatch.chdir(workdir)
+    instance = model_registry.ModelRegistry(tmp_path / 'models')
+    monkeypatch.setattr(model_registry, '_shared_registry', instance)
+    return instance
+
+
+@pytest.fixture(scope='session')
+def training_data():
+    """بيانات صغيرة بنفس أعمدة FEATURE_COLUMNS ودرجات قريبة من علاقة خطية"""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.integers(0, 41, 400), rng.integers(60, 101, 400), rng.integers(50, 101, 400),
+                         rng.integers(0, 9, 400), rng.integers(1, 6, 400)]).astype(float)
+    y = 40 + 0.3 * X[:, 0] + 0.2 * X[:, 1] + 0.05 * X[:, 2] + 0.5 * X[:, 3] + rng.normal(0, 1, 400)
+    return X, y
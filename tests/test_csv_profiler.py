@@ -0,0 +1,69 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from csv_profiler import DataProfile, profile_csv
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'hours': rng.integers(0, 41, 3000),
+        'score': rng.normal(70, 10, 3000).round(1),
+        'group': rng.choice(['a', 'b', 'c'], 3000),
+        'passed': rng.random(3000) > 0.5,
+    })
+    df.loc[rng.choice(3000, 200, replace=False), 'score'] = np.nan
+    # صفوف مكررة موزعة على دفعات مختلفة
+    return pd.concat([df, df.iloc[[5, 1700, 2999, 5]]], ignore_index=True)
+
+
+def csv_source(df):
+    return io.StringIO(df.to_csv(index=False))
+
+
+def test_matches_pandas_over_chunks(frame):
+    profile = profile_csv(csv_source(frame), chunksize=700)
+    expected = pd.read_csv(csv_source(frame))
+
+    pd.testing.assert_frame_equal(profile.describe(), expected.describe(), rtol=1e-9)
+    assert profile.rows == len(expected)
+    assert profile.missing == expected.isnull().sum().to_dict()
+    assert profile.duplicate_count == expected.duplicated().sum() >= 4
+    assert profile.memory_usage == expected.memory_usage(deep=True).sum()
+
+
+def test_duplicates_match_across_int_and_float_chunks():
+    # العمود int في الدفعة الأولى و float (بسبب قيمة مفقودة) في الثانية
+    df = pd.DataFrame({'x': [1, 2, 3, 1, None, 2], 'y': ['a', 'b', 'c', 'a', 'd', 'b']})
+    profile = profile_csv(csv_source(df), chunksize=3)
+    assert profile.duplicate_count == pd.read_csv(csv_source(df)).duplicated().sum() == 2
+
+
+def test_merge_equals_single_profile(frame):
+    first, second = frame.iloc[:1800], frame.iloc[1800:]
+    merged = profile_csv(csv_source(first), chunksize=500)
+    merged.merge(profile_csv(csv_source(second), chunksize=500))
+    expected = pd.read_csv(csv_source(frame))
+
+    pd.testing.assert_frame_equal(merged.describe(), expected.describe(), rtol=1e-9)
+    assert merged.missing_total == expected.isnull().sum().sum()
+    assert merged.duplicate_count == expected.duplicated().sum()
+
+
+def test_quantiles_are_approximate_beyond_sample_size():
+    values = np.random.default_rng(1).normal(50, 10, 50_000)
+    profile = DataProfile(sample_size=2000)
+    for chunk in np.array_split(values, 10):
+        profile.update(pd.DataFrame({'v': chunk}))
+    described, expected = profile.describe()['v'], pd.Series(values).describe()
+
+    assert described['count'] == expected['count']
+    assert described[['mean', 'std', 'min', 'max']].to_numpy() == pytest.approx(
+        expected[['mean', 'std', 'min', 'max']].to_numpy(), rel=1e-9)
+    assert described[['25%', '50%', '75%']].to_numpy() == pytest.approx(
+        expected[['25%', '50%', '75%']].to_numpy(), abs=1.0)
+    assert len(profile.numeric['v'].sample) == 2000
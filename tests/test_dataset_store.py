@@ -0,0 +1,106 @@
+import io
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pytest
+
+import dataset_store
+from dataset_store import DatasetStore
+from dtype_compaction import compact_table
+
+
+def sample_csv(rows=6000):
+    # قيم تتغير بعد الدفعات الأولى: مدى أوسع، قيمة مفقودة، فئة جديدة، عشري لا يسعه float32
+    frame = pd.DataFrame({
+        'Hours_Studied': [i % 40 for i in range(rows)],
+        'Attendance': [60 + i % 41 if i < rows - 10 else 1000 for i in range(rows)],
+        'Tutoring_Sessions': [i % 5 if i != rows // 2 else None for i in range(rows)],
+        'Gender': ['Male' if i % 2 else 'Female' for i in range(rows - 5)] + ['Other'] * 5,
+        'Exam_Score': [60.5] * (rows - 1) + [0.1],
+    })
+    return frame, frame.to_csv(index=False).encode('utf-8')
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    monkeypatch.setattr(dataset_store, 'CSV_BLOCK_BYTES', 16 << 10)
+
+
+def test_save_csv_streams_batches_with_one_schema(tmp_path, small_blocks):
+    frame, data = sample_csv()
+    stored = DatasetStore(tmp_path).save_csv(io.BytesIO(data), 'sample.csv', 'a' * 64)
+
+    reader = pa.ipc.open_file(str(stored.path))
+    assert reader.num_record_batches > 1
+    types = {field.name: field.type for field in reader.schema}
+    assert types['Hours_Studied'] == pa.int8()
+    assert types['Attendance'] == pa.int16()
+    assert types['Exam_Score'] == pa.float64()
+    assert pa.types.is_dictionary(types['Gender'])
+
+    loaded = stored.to_pandas()
+    assert stored.rows == len(frame)
+    assert loaded['Gender'].astype(str).tolist() == frame['Gender'].tolist()
+    assert loaded['Attendance'].tolist() == frame['Attendance'].tolist()
+    assert loaded['Tutoring_Sessions'].isna().sum() == 1
+    assert loaded['Exam_Score'].tolist() == frame['Exam_Score'].tolist()
+
+
+def test_memory_report_matches_whole_table(tmp_path, small_blocks):
+    _, data = sample_csv()
+    stored = DatasetStore(tmp_path).save_csv(io.BytesIO(data), 'sample.csv', 'b' * 64)
+    table = pa_csv.read_csv(io.BytesIO(data), convert_options=pa_csv.ConvertOptions(strings_can_be_null=True))
+    _, expected = compact_table(table)
+
+    for streamed, whole in zip(stored.memory_report, expected):
+        assert streamed['dtype_before'] == whole['dtype_before']
+        assert streamed['dtype_after'] == whole['dtype_after']
+        assert streamed['bytes_before'] == pytest.approx(whole['bytes_before'], rel=0.02)
+        assert streamed['bytes_after'] == pytest.approx(whole['bytes_after'], rel=0.02)
+
+
+def test_save_csv_is_idempotent(tmp_path):
+    _, data = sample_csv(100)
+    store = DatasetStore(tmp_path)
+    first = store.save_csv(io.BytesIO(data), 'sample.csv', 'c' * 64)
+    again = store.save_csv(io.BytesIO(b'ignored'), 'other.csv', 'c' * 64)
+    assert again.name == first.name == 'sample.csv'
+    assert [dataset.sha256 for dataset in store.datasets()] == ['c' * 64]
+
+
+def test_late_type_change_beyond_the_first_block(tmp_path):
+    # أكبر من كتلة القراءة الافتراضية (8 MB): عدد عشري بعد 2.5 مليون صف صحيح، ونص متأخر
+    rows = 2_500_000
+    data = (b'Hours_Studied,School\n' + b'12,7\n' * rows + b'3.5,Other\n' + b'20,8\n' * 1000)
+    assert len(data) > dataset_store.CSV_BLOCK_BYTES
+    stored = DatasetStore(tmp_path).save_csv(io.BytesIO(data), 'late.csv', 'd' * 64)
+
+    expected = pd.read_csv(io.BytesIO(data), low_memory=False)
+    loaded = stored.to_pandas()
+    assert str(expected['Hours_Studied'].dtype) == 'float64'
+    assert loaded['Hours_Studied'].astype(float).tolist()[rows - 1:rows + 2] == [12.0, 3.5, 20.0]
+    assert loaded['Hours_Studied'].astype(float).sum() == pytest.approx(expected['Hours_Studied'].sum())
+    assert loaded['School'].astype(str).value_counts().to_dict() == {'7': rows, 'Other': 1, '8': 1000}
+
+
+def test_kinds_widen_across_small_blocks(tmp_path, small_blocks):
+    rows = 5000
+    frame = pd.DataFrame({
+        'empty_then_int': [''] * (rows - 1) + ['4'],
+        'int_then_text': [i % 7 for i in range(rows - 1)] + ['unknown'],
+        'flag': ['True', 'False'] * (rows // 2),
+        'padded': [' 5'] * rows,
+    })
+    stored = DatasetStore(tmp_path).save_csv(io.BytesIO(frame.to_csv(index=False).encode()), 'kinds.csv', 'e' * 64)
+    types = {field.name: field.type for field in pa.ipc.open_file(str(stored.path)).schema}
+    assert types['empty_then_int'] == pa.int8()
+    assert pa.types.is_dictionary(types['int_then_text'])
+    assert types['flag'] == pa.bool_()
+    assert types['padded'] == pa.int8()
+
+    loaded = stored.to_pandas()
+    assert loaded['int_then_text'].astype(str).tolist()[-2:] == [str((rows - 2) % 7), 'unknown']
+    assert loaded['empty_then_int'].isna().sum() == rows - 1
+    report = {row['column']: row for row in stored.memory_report}
+    assert report['int_then_text']['dtype_after'] == 'category'
@@ -0,0 +1,37 @@
+import pyarrow as pa
+import pytest
+
+from dtype_compaction import compact_table, pandas_memory
+
+
+def exact_memory(column):
+    series = pa.table({'column': column}).to_pandas()['column']
+    return int(series.memory_usage(deep=True, index=False)), str(series.dtype)
+
+
+@pytest.mark.parametrize('column', [
+    pa.array(list(range(100_000))),
+    pa.array([1] * 99_999 + [None]),
+    pa.array(['x' * (i % 40) for i in range(100_000)]),
+    pa.array(['ذكر', 'أنثى', None] * 30_000).dictionary_encode(),
+    pa.chunked_array([pa.array([1.5] * 50_000), pa.array([2.5] * 50_000)]),
+])
+def test_pandas_memory_estimate_matches_conversion(column):
+    estimate, dtype = pandas_memory(column)
+    exact, exact_dtype = exact_memory(column)
+    assert dtype == exact_dtype
+    assert estimate == pytest.approx(exact, rel=0.02)
+
+
+def test_compact_table_report():
+    table = pa.table({'hours': list(range(50)) * 100, 'gender': ['Male', 'Female'] * 2500,
+                      'score': [60.5] * 5000})
+    compacted, report = compact_table(table)
+    by_column = {row['column']: row for row in report}
+
+    assert compacted.schema.field('hours').type == pa.int8()
+    assert pa.types.is_dictionary(compacted.schema.field('gender').type)
+    assert compacted.schema.field('score').type == pa.float32()
+    assert all(row['bytes_after'] < row['bytes_before'] for row in report)
+    assert by_column['gender']['dtype_after'] == 'category'
+    assert compacted.to_pandas()['hours'].tolist() == table.to_pandas()['hours'].tolist()
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from goal_seeking import (
+    LEVER_COLUMNS, STEP_COST, _seek_grid, _seek_separable, next_targets, prepare, seek_target, seek_targets,
+)
+from scoring import clip_scores
+
+
+class ConstantModel:
+    """نموذج عام (بلا معاملات ولا عوامل نواة) لا تغيّره أي زيادة"""
+
+    def predict(self, X):
+        return np.full(len(X), 50.0)
+
+
+@pytest.fixture(scope='module')
+def svr_engine(training_data):
+    from sklearn.svm import SVR
+    from svr_engine import SVREngine
+
+    X, y = training_data
+    return SVREngine.from_sklearn(SVR(C=10.0).fit(X, y))
+
+
+@pytest.fixture(scope='module')
+def students(training_data):
+    X, _ = training_data
+    # طلاب بقيم منخفضة حتى يبعد المستوى التالي بعدة خطوات
+    low = X[:40].copy()
+    low[:, LEVER_COLUMNS] = np.floor(low[:, LEVER_COLUMNS] * [0.3, 0.7, 0.3])
+    return low
+
+
+def plan_cost(steps):
+    return steps @ STEP_COST
+
+
+def test_next_targets():
+    np.testing.assert_array_equal(next_targets(np.array([10, 59.99, 60, 80, 95])), [60, 60, 75, 90, np.nan])
+
+
+def test_linear_plans_reach_their_targets(linear_model, students):
+    plan = seek_targets(linear_model, students)
+    reached = plan['status'] == 'reached'
+    assert reached.any()
+    assert (plan['expected_score'][reached] >= plan['target'][reached] - 1e-6).all()
+    assert (plan['recommended_hours'][reached] >= students[reached, 0]).all()
+
+    planned = students.copy()
+    planned[:, LEVER_COLUMNS] = np.column_stack([plan['recommended_hours'], plan['recommended_attendance'],
+                                                 plan['recommended_tutoring']])
+    np.testing.assert_allclose(clip_scores(linear_model.predict(planned[reached])), plan['expected_score'][reached])
+
+
+def test_separable_search_matches_brute_force(svr_engine, students):
+    scores = clip_scores(svr_engine.predict(students))
+    targets = next_targets(scores)
+    fast_steps, fast_scores, fast_unsettled = _seek_separable(svr_engine, students, targets, np.inf)
+    grid_steps, grid_scores, grid_unsettled = _seek_grid(svr_engine, students, targets, np.inf)
+
+    assert not fast_unsettled.any() and not grid_unsettled.any()
+    np.testing.assert_array_equal(np.isnan(fast_steps[:, 0]), np.isnan(grid_steps[:, 0]))
+    found = ~np.isnan(grid_steps[:, 0])
+    assert found.any()
+    np.testing.assert_allclose(plan_cost(fast_steps[found]), plan_cost(grid_steps[found]), atol=1e-9)
+    assert (fast_scores[found] >= targets[found] - 1e-9).all()
+
+
+def test_top_band_keeps_current_values(linear_model):
+    plan = seek_target(linear_model, [40, 100, 100, 10, 5], score=95)
+    assert plan['status'] == 'top_band'
+    assert (plan['recommended_hours'], plan['recommended_attendance'], plan['recommended_tutoring']) == (40, 100, 10)
+    assert plan['expected_score'] is None
+
+
+def test_unreachable_and_out_of_budget():
+    X = np.array([[10, 70, 60, 1, 3], [20, 80, 70, 2, 3]], dtype=float)
+    model = ConstantModel()
+    assert list(seek_targets(model, X, budget=10)['status']) == ['unreachable'] * 2
+    plan = seek_targets(model, X, budget=0)
+    assert list(plan['status']) == ['out_of_budget'] * 2
+    assert np.isnan(plan['recommended_hours']).all()
+
+
+def test_budget_is_respected(svr_engine, training_data):
+    import time
+
+    X, _ = training_data
+    X = np.repeat(X, 5, axis=0)
+    prepare(svr_engine)
+    start = time.perf_counter()
+    plan = seek_targets(svr_engine, X, budget=0.05)
+    assert time.perf_counter() - start < 0.05 + 0.5
+    assert set(plan['status']) <= {'reached', 'top_band', 'unreachable', 'out_of_budget'}
@@ -0,0 +1,74 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from incremental_training import publish, to_linear_regression, train_incremental, update_sample
+from prediction_intervals import BOOTSTRAP_FILE
+
+
+@pytest.fixture
+def sorted_csvs(tmp_path, training_data):
+    # ملفان مرتبان حسب ساعات الدراسة: متوسطات الدفعات الأولى بعيدة عن متوسط البيانات كلها
+    X, y = training_data
+    order = np.argsort(X[:, 0])
+    frame = pd.DataFrame(X[order], columns=['Hours_Studied', 'Attendance', 'Previous_Scores',
+                                            'Tutoring_Sessions', 'Peer_Influence'])
+    frame['Exam_Score'] = y[order]
+    paths = []
+    for index, part in enumerate([frame.iloc[:len(frame) // 2], frame.iloc[len(frame) // 2:]]):
+        path = tmp_path / f"part{index}.csv"
+        part.to_csv(path, index=False)
+        paths.append(str(path))
+    return paths
+
+
+def test_scaler_is_frozen_before_training(sorted_csvs, registry, training_data):
+    X, y = training_data
+    state = train_incremental(sorted_csvs, epochs=3, chunksize=50, checkpoint='checkpoint.pkl',
+                              sample_rows=120, stream=io.StringIO())
+
+    # المقياس من قراءة كاملة قبل أي خطوة تدرج، فالنموذج المطوي يطابق خط المعايرة + SGD
+    np.testing.assert_allclose(state.scaler.mean_, X.mean(axis=0))
+    folded = to_linear_regression(state)
+    np.testing.assert_allclose(folded.predict(X), state.model.predict(state.scaler.transform(X)), atol=1e-9)
+    assert state.chunk_mae[-1] < state.chunk_mae[0]
+
+    assert state.sample_seen == len(y)
+    assert state.sample_X.shape == (120, 5)
+
+    version = publish(state)
+    directory = registry.directory('linear')
+    assert directory.name == version
+    assert os.path.exists(directory / BOOTSTRAP_FILE)
+    assert registry.metadata('linear', version)['sample_rows'] == 120
+
+
+def test_resume_finishes_the_same_run(sorted_csvs, registry):
+    first = train_incremental(sorted_csvs, epochs=1, chunksize=50, checkpoint='checkpoint.pkl',
+                              stream=io.StringIO())
+    resumed = train_incremental(sorted_csvs, epochs=2, chunksize=50, checkpoint='checkpoint.pkl',
+                                stream=io.StringIO())
+    assert resumed.rows_seen == 2 * first.rows_seen
+    np.testing.assert_array_equal(resumed.scaler.mean_, first.scaler.mean_)
+    assert resumed.sample_epoch == 1
+
+
+def test_update_sample_is_uniform():
+    class State:
+        sample_X = sample_y = None
+        sample_seen = 0
+
+    rng = np.random.default_rng(0)
+    hits = np.zeros(1000)
+    for _ in range(400):
+        state = State()
+        for start in range(0, 1000, 70):
+            values = np.arange(start, min(start + 70, 1000), dtype=float)
+            update_sample(state, values[:, None], values, rng, size=100)
+        hits[state.sample_y.astype(int)] += 1
+    # كل صف يدخل العينة باحتمال 100/1000
+    assert abs(hits[:500].mean() - hits[500:].mean()) < 4
+    assert hits.sum() == 400 * 100
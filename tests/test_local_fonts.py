@@ -0,0 +1,29 @@
+import local_fonts
+
+
+def test_system_fonts_without_local_fonts(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_fonts, 'FONTS_DIR', tmp_path)
+    assert local_fonts.font_links() == ''
+
+
+def test_local_stylesheet_and_preloads(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_fonts, 'FONTS_DIR', tmp_path)
+    (tmp_path / local_fonts.STYLESHEET_NAME).write_text(local_fonts.build_stylesheet([('Tajawal', 400)]))
+    (tmp_path / local_fonts.font_filename('Tajawal', 400)).write_bytes(b'')
+    links = local_fonts.font_links()
+    assert 'googleapis' not in links
+    assert links.count('rel="preload"') == 1
+    assert f'{local_fonts.STATIC_URL}/{local_fonts.STYLESHEET_NAME}' in links
+
+
+def test_page_makes_no_external_font_request(monkeypatch, tmp_path):
+    import app
+
+    monkeypatch.setattr(local_fonts, 'FONTS_DIR', tmp_path)
+    app.build_comprehensive_css.cache_clear()
+    try:
+        css = app.build_comprehensive_css()
+    finally:
+        app.build_comprehensive_css.cache_clear()
+    assert 'https://' not in css
+    assert local_fonts.SYSTEM_FONTS in css
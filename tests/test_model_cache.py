@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+
+import pytest
+
+from model_cache import ModelCache
+
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_reload_only_when_content_changes(tmp_path):
+    path = write(tmp_path / 'model.txt', 'a')
+    loads = []
+    cache = ModelCache(loader=lambda p: loads.append(p) or open(p).read())
+
+    assert cache.get(path) == 'a'
+    assert cache.get(path) == 'a'
+    assert len(loads) == 1
+
+    # وقت تعديل جديد بالمحتوى نفسه: لا إعادة تحميل
+    os.utime(path, ns=(time.time_ns() + 10**9,) * 2)
+    assert cache.get(path) == 'a'
+    assert len(loads) == 1
+
+    write(tmp_path / 'model.txt', 'bb')
+    assert cache.get(path) == 'bb'
+    assert len(loads) == 2
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['reloads']) == (2, 2, 1)
+
+
+def test_concurrent_gets_load_once(tmp_path):
+    path = write(tmp_path / 'model.txt', 'a')
+    loads = []
+
+    def slow_loader(p):
+        loads.append(p)
+        time.sleep(0.1)
+        return open(p).read()
+
+    cache = ModelCache(loader=slow_loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(path))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['a'] * 8
+    assert len(loads) == 1
+
+
+def test_slow_load_does_not_block_other_paths(tmp_path):
+    slow_path = write(tmp_path / 'slow.txt', 'slow')
+    fast_path = write(tmp_path / 'fast.txt', 'fast')
+    started, release = threading.Event(), threading.Event()
+
+    def loader(p):
+        if p == slow_path:
+            started.set()
+            release.wait(5)
+        return open(p).read()
+
+    cache = ModelCache(loader=loader)
+    thread = threading.Thread(target=cache.get, args=(slow_path,))
+    thread.start()
+    try:
+        assert started.wait(5)
+        begin = time.perf_counter()
+        assert cache.get(fast_path) == 'fast'
+        assert time.perf_counter() - begin < 1
+    finally:
+        release.set()
+        thread.join()
+    assert cache.get(slow_path) == 'slow'
+    assert not cache._loading
+
+
+def test_failed_load_is_not_cached(tmp_path):
+    path = write(tmp_path / 'model.txt', 'a')
+    attempts = []
+
+    def loader(p):
+        attempts.append(p)
+        if len(attempts) == 1:
+            raise OSError('boom')
+        return open(p).read()
+
+    cache = ModelCache(loader=loader)
+    with pytest.raises(OSError):
+        cache.get(path)
+    assert cache.get(path) == 'a'
+    assert len(attempts) == 2
@@ -0,0 +1,54 @@
+import io
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.svm import SVR
+
+import model_export
+from model_backends import BACKENDS
+from model_training import publish_estimator
+from prediction_intervals import BOOTSTRAP_FILE
+from scoring import FEATURE_COLUMNS
+
+
+@pytest.fixture
+def published(registry, training_data):
+    X, y = training_data
+    publish_estimator('linear', LinearRegression().fit(X, y), data=(X, y))
+    publish_estimator('svr', {'model': SVR().fit(X, y), 'X_columns': list(FEATURE_COLUMNS)})
+    return registry
+
+
+def test_export_all_publishes_new_versions(published, training_data):
+    X, _ = training_data
+    before = {key: BACKENDS[key].load().predict(X) for key in BACKENDS}
+
+    versions = model_export.export_all(stream=io.StringIO())
+
+    assert versions == {'linear': 'v0002', 'svr': 'v0002'}
+    for key, backend in BACKENDS.items():
+        assert published.current(key) == 'v0002'
+        assert published.metadata(key, 'v0002')['source'] == 'export'
+        assert published.metadata(key, 'v0002')['exported_from'] == 'v0001'
+        assert backend.uses_export
+        np.testing.assert_allclose(backend.load().predict(X), before[key], atol=1e-6)
+    # ملفات الإصدار غير المُصدَّرة تنتقل معه
+    assert BOOTSTRAP_FILE in published.metadata('linear', 'v0002')['files']
+
+
+def test_failed_verification_leaves_nothing_behind(published, monkeypatch, tmp_path):
+    monkeypatch.setattr(model_export, 'EXPORT_TOLERANCE', -1.0)
+
+    with pytest.raises(ValueError):
+        model_export.export_all(stream=io.StringIO())
+
+    for key in BACKENDS:
+        assert published.versions(key) == ['v0001']
+        assert published.current(key) == 'v0001'
+        assert not [path for path in (published.root / key).iterdir() if path.name.startswith('.staging')]
+    assert list((tmp_path / 'work').iterdir()) == []
+
+
+def test_export_all_without_models(registry):
+    assert model_export.export_all(stream=io.StringIO()) == {}
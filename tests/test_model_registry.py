@@ -0,0 +1,96 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from model_backends import BACKENDS
+from model_training import publish_estimator
+
+
+@pytest.fixture
+def linear_published(registry, training_data):
+    from sklearn.linear_model import LinearRegression
+
+    X, y = training_data
+    publish_estimator('linear', LinearRegression().fit(X, y))
+    return registry
+
+
+def test_publish_and_rollback(linear_published, training_data):
+    X, y = training_data
+    from sklearn.linear_model import LinearRegression
+
+    backend = BACKENDS['linear']
+    first = backend.fingerprint()
+    assert publish_estimator('linear', LinearRegression().fit(X[:100], y[:100])) == 'v0002'
+    assert backend.fingerprint() != first
+
+    assert linear_published.rollback('linear') == 'v0001'
+    assert backend.fingerprint() == first
+    with pytest.raises(ValueError):
+        linear_published.rollback('linear')
+
+
+def test_served_reads_current_once_per_call(linear_published, monkeypatch):
+    backend = BACKENDS['linear']
+    calls = []
+    original = linear_published.current
+    monkeypatch.setattr(linear_published, 'current', lambda key: calls.append(key) or original(key))
+
+    backend.load()
+    assert calls == ['linear']
+    calls.clear()
+    assert backend.uses_export
+    assert backend.available
+    assert calls == ['linear', 'linear']
+
+
+@pytest.mark.parametrize('keep, expected', [(0, ['v0003']), (1, ['v0003']), (2, ['v0002', 'v0003']),
+                                            (5, ['v0001', 'v0002', 'v0003'])])
+def test_prune_keeps_current(linear_published, training_data, keep, expected):
+    from sklearn.linear_model import LinearRegression
+
+    X, y = training_data
+    for _ in range(2):
+        publish_estimator('linear', LinearRegression().fit(X, y))
+    linear_published._prune('linear', keep=keep)
+    assert linear_published.versions('linear') == expected
+    assert linear_published.current('linear') == 'v0003'
+
+    with pytest.raises(ValueError):
+        linear_published._prune('linear', keep=-1)
+
+
+def test_legacy_import_builds_exports(registry, linear_model):
+    import shutil
+
+    from tests.conftest import ROOT
+
+    shutil.copy2(ROOT / 'regression_model.pkl', 'regression_model.pkl')
+    backend = BACKENDS['linear']
+    assert backend.uses_export
+    directory = registry.directory('linear')
+    assert registry.current('linear') == 'v0001'
+    assert json.loads((directory / 'exports.json').read_text())['exports'] == ['regression_model.json']
+    np.testing.assert_allclose(backend.load().coef, linear_model.coef)
+
+
+def test_export_selection_follows_source_hash_not_mtimes(linear_published):
+    backend = BACKENDS['linear']
+    directory = linear_published.directory('linear')
+    assert backend.path == str(directory / 'regression_model.json')
+
+    # أوقات التعديل بعد git clone مجرد ترتيب كتابة: ملف مُصدَّر أقدم من pickle يبقى صالحاً
+    os.utime(directory / 'regression_model.json', (0, 0))
+    backend._served_in = None
+    assert backend.uses_export
+
+    # وملف مُصدَّر من pickle آخر لا يُخدم مهما كان أحدث
+    manifest = directory / 'exports.json'
+    stale = dict(json.loads(manifest.read_text()), source_sha256='0' * 64)
+    manifest.write_text(json.dumps(stale))
+    os.utime(directory / 'regression_model.json')
+    backend._served_in = None
+    assert not backend.uses_export
+    assert backend.path == str(directory / 'regression_model.pkl')
@@ -0,0 +1,30 @@
+import pickle
+
+import pandas as pd
+
+from parallel_ingest import ingest_one, merge_profiles
+
+
+def csv_bytes(start, stop):
+    # صف مكرر واحد في كل ملف، وصفوف مشتركة بين الملفين
+    rows = list(range(start, stop)) + [start]
+    return pd.DataFrame({'Hours_Studied': [i % 40 for i in rows], 'Attendance': rows}).to_csv(index=False).encode()
+
+
+def test_ingest_one_returns_compacted_profile(tmp_path):
+    profile = ingest_one(str(tmp_path), 'a' * 64, 'a.csv', csv_bytes(0, 300))
+    assert profile._hashes == []
+    assert profile.rows == 301
+    assert profile.duplicate_count == 1
+
+    # الملف المحفوظ يُحلَّل من المكتبة دون إعادة إرسال البايتات
+    again = pickle.loads(pickle.dumps(ingest_one(str(tmp_path), 'a' * 64, 'a.csv')))
+    assert again.rows == profile.rows
+
+
+def test_merge_profiles_counts_cross_file_duplicates(tmp_path):
+    first = ingest_one(str(tmp_path), 'a' * 64, 'a.csv', csv_bytes(0, 300))
+    second = ingest_one(str(tmp_path), 'b' * 64, 'b.csv', csv_bytes(200, 400))
+    merged = merge_profiles([first, second])
+    assert merged.rows == 502
+    assert merged.duplicate_count == 2 + 100
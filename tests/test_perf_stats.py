@@ -0,0 +1,89 @@
+import re
+
+import pytest
+
+from perf_stats import BUCKET_BOUNDS_MS, PerfRegistry, StageHistogram
+
+SAMPLE = re.compile(r'^(\w+)\{stage="(\w+)"(?:,le="([^"]+)")?\} (\S+)$')
+
+
+def parse_prometheus(text):
+    """{(اسم المقياس، المرحلة، le): القيمة} من نص Prometheus"""
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith('#'):
+            continue
+        metric, stage, le, value = SAMPLE.match(line).groups()
+        samples[metric, stage, le] = float(value)
+    return samples
+
+
+def test_bucket_bounds_are_inclusive():
+    stage = StageHistogram()
+    for elapsed_ms in (0.05, 1, 1.01, 5000, 9000):
+        stage.observe(elapsed_ms)
+    assert stage.buckets[0] == 1
+    assert stage.buckets[BUCKET_BOUNDS_MS.index(1)] == 1
+    assert stage.buckets[BUCKET_BOUNDS_MS.index(2.5)] == 1
+    assert stage.buckets[len(BUCKET_BOUNDS_MS) - 1] == 1
+    assert stage.buckets[-1] == 1
+    assert stage.max_ms == 9000
+
+
+def test_percentiles_follow_the_moving_window():
+    stage = StageHistogram(window_size=100)
+    for elapsed_ms in range(1, 101):
+        stage.observe(elapsed_ms)
+    assert stage.percentile(50) == 51
+    assert stage.percentile(99) == 99
+    # قياسات جديدة تُخرج القديمة من النافذة، والعدّادات تبقى منذ بدء العملية
+    for _ in range(100):
+        stage.observe(1000)
+    summary = stage.summary()
+    assert summary['p50_ms'] == summary['p99_ms'] == 1000
+    assert summary['count'] == 200
+    assert summary['mean_ms'] == pytest.approx((5050 + 100_000) / 200)
+
+
+def test_prometheus_histogram_is_cumulative():
+    registry = PerfRegistry(enabled=True)
+    observations = {'render': [0.2, 3, 3, 40, 7000], 'predict': [0.5]}
+    for name, values in observations.items():
+        for elapsed_ms in values:
+            registry.observe(name, elapsed_ms)
+
+    text = registry.to_prometheus()
+    assert '# TYPE app_stage_duration_seconds histogram' in text
+    samples = parse_prometheus(text)
+    for name, values in observations.items():
+        buckets = [samples['app_stage_duration_seconds_bucket', name, f"{bound / 1000:g}"]
+                   for bound in BUCKET_BOUNDS_MS]
+        assert buckets == [sum(v <= bound for v in values) for bound in BUCKET_BOUNDS_MS]
+        assert samples['app_stage_duration_seconds_bucket', name, '+Inf'] == len(values)
+        assert samples['app_stage_duration_seconds_count', name, None] == len(values)
+        assert samples['app_stage_duration_seconds_sum', name, None] == pytest.approx(sum(values) / 1000)
+
+
+def test_timed_records_failures_and_respects_disabled(tmp_path):
+    registry = PerfRegistry(enabled=True)
+
+    @registry.timed('fails')
+    def fails():
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        fails()
+    with registry.stage('block'):
+        pass
+    assert {name: s['count'] for name, s in registry.snapshot().items()} == {'fails': 1, 'block': 1}
+    assert sum(registry.window_histogram('fails').values()) == 1
+
+    path = registry.write_prometheus(tmp_path / 'metrics.prom')
+    assert path.read_text(encoding='utf-8') == registry.to_prometheus()
+    assert [p.name for p in tmp_path.iterdir()] == ['metrics.prom']
+
+    disabled = PerfRegistry(enabled=False)
+    with disabled.stage('block'):
+        pass
+    assert disabled.timed('f')(lambda: 42)() == 42
+    assert disabled.snapshot() == {}
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from tests.conftest import StaticBackend
+from prediction_intervals import (
+    BOOTSTRAP_FILE, bootstrap_members, coverage, export_bootstrap, fit_bootstrap, interval_bounds, load_bootstrap,
+)
+
+
+@pytest.fixture(scope='module')
+def members(training_data):
+    X, y = training_data
+    return fit_bootstrap(X[:300], y[:300], n_members=200, block_rows=128)
+
+
+def test_members_center_on_least_squares(members, training_data):
+    X, y = training_data
+    augmented = np.column_stack([X[:300], np.ones(300)])
+    coef = np.linalg.lstsq(augmented, y[:300], rcond=None)[0]
+    np.testing.assert_allclose(np.median(members[:, :-1], axis=0), coef[:-1], atol=0.05)
+
+
+def test_bounds_match_quantiles_and_cover_held_out_rows(members, training_data):
+    X, y = training_data
+    lower, upper = interval_bounds(members, X[300:], confidence=80, block_rows=32)
+    predictions = X[300:] @ members[:, :-1].T + members[:, -1]
+    expected = np.quantile(predictions, [0.1, 0.9], axis=1)
+    np.testing.assert_allclose(lower, expected[0], atol=0.005 + 1e-9)
+    np.testing.assert_allclose(upper, expected[1], atol=0.005 + 1e-9)
+    assert (lower <= upper).all()
+    assert 0.6 <= coverage(members, X[300:], y[300:], confidence=80) <= 0.95
+
+
+def test_export_round_trip(members, tmp_path):
+    path = tmp_path / BOOTSTRAP_FILE
+    export_bootstrap(members, path)
+    loaded = load_bootstrap(path)
+    assert loaded.dtype == np.float32 and not loaded.flags.writeable
+    np.testing.assert_allclose(loaded, members, rtol=1e-6)
+
+
+def test_bootstrap_members_only_for_linear_with_ensemble(linear_model):
+    assert bootstrap_members(StaticBackend(linear_model, key='svr')) is None
+
+    class NoEnsemble(StaticBackend):
+        def artifact_path(self, name):
+            return f"/nonexistent/{name}"
+
+    assert bootstrap_members(NoEnsemble(linear_model)) is None
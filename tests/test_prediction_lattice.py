@@ -0,0 +1,101 @@
+import time
+
+import numpy as np
+import pytest
+
+from prediction_lattice import LATTICE_ATOL, PREV_SCORES_STEP, LatticeStore, PredictionLattice
+
+
+class LatticeBackend:
+    """نموذج قابل للخدمة بأقل واجهة يحتاجها LatticeStore: بصمة وتحميل"""
+
+    def __init__(self, model, sha256, key='model', default_peer=3):
+        self.model = model
+        self.sha256 = sha256
+        self.key = key
+        self.default_peer = default_peer
+
+    def fingerprint(self):
+        return self.sha256
+
+    def load(self):
+        return self.model
+
+
+class Kinked:
+    """سطح بانكسار حاد عند 52.5 في الدرجات السابقة: لا تكفيه أي خطوة"""
+
+    def predict(self, X):
+        return np.abs(np.asarray(X, dtype=float)[:, 2] - 52.5)
+
+
+@pytest.fixture
+def svr_model(training_data):
+    """SVR صغير بانحناء كافٍ لتتجاوز عُقد كل 5 درجات السماحية (النموذج المشحون أبطأ من اختبار)"""
+    from sklearn.svm import SVR
+
+    X, y = training_data
+    return SVR(gamma=1e-3, C=10).fit(X[:60], y[:60])
+
+
+def wait_built(store, backend, timeout=60):
+    deadline = time.monotonic() + timeout
+    while store.is_building(backend):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    return store.get(backend)
+
+
+def test_linear_lookup_matches_predict(linear_model):
+    lattice = PredictionLattice.build(linear_model, 3)
+    assert lattice.prev_step == PREV_SCORES_STEP
+
+    X = np.array([[0, 0, 0, 0, 3], [12, 85, 65, 4, 3], [40, 100, 100, 10, 3], [7, 61, 72.4, 2, 3]], dtype=float)
+    found = [lattice.lookup(*row[:4]) for row in X]
+    np.testing.assert_allclose(found, linear_model.predict(X), atol=1e-4)
+
+
+def test_svr_is_refined_until_within_tolerance(svr_model):
+    lattice = PredictionLattice.build(svr_model, 3)
+    # عُقد كل 5 درجات تنحرف عن هذا النموذج أكثر من السماحية
+    assert lattice.prev_step < PREV_SCORES_STEP
+    assert lattice.check_against(svr_model, 3, points=2000, seed=1) <= LATTICE_ATOL
+    with pytest.raises(ValueError):
+        PredictionLattice.compute(svr_model, 3).check_against(svr_model, 3)
+
+
+def test_off_grid_inputs_fall_back_to_model(linear_model):
+    lattice = PredictionLattice.build(linear_model, 3)
+    assert lattice.lookup(12.5, 85, 65, 4) is None
+    assert lattice.lookup(41, 85, 65, 4) is None
+    assert lattice.lookup(12, 85, 100.5, 4) is None
+    assert lattice.lookup(12, 85, 65, -1) is None
+
+
+def test_store_refuses_a_lattice_outside_tolerance(tmp_path):
+    store = LatticeStore(tmp_path)
+    backend = LatticeBackend(Kinked(), 'k' * 64)
+    assert store.get(backend) is None
+    assert wait_built(store, backend) is None
+    assert not store.is_building(backend)
+    assert list(tmp_path.glob('*.npy')) == []
+
+
+def test_store_rebuilds_when_fingerprint_changes(tmp_path, linear_model):
+    from model_export import LinearModel
+
+    store = LatticeStore(tmp_path)
+    backend = LatticeBackend(linear_model, 'a' * 64)
+    assert store.get(backend) is None
+    first = wait_built(store, backend)
+    assert first is not None and store.get(backend) is first
+
+    backend.model = LinearModel(linear_model.coef * 2, linear_model.intercept - 10)
+    backend.sha256 = 'b' * 64
+    assert store.get(backend) is None
+    second = wait_built(store, backend)
+    assert second is not None and second is not first
+    assert [path.name for path in tmp_path.glob('*.npy')] == [store.path_for(backend, backend.sha256).name]
+
+    row = np.array([[10, 90, 70, 3, 3]], dtype=float)
+    assert second.lookup(10, 90, 70, 3) == pytest.approx(backend.model.predict(row)[0], abs=1e-4)
@@ -0,0 +1,68 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from prediction_service import MicroBatcher, PredictionHandler, PredictionServer, ServiceMetrics
+
+
+STUDENT = {'Hours_Studied': 20, 'Attendance': 85, 'Previous_Scores': 75, 'Tutoring_Sessions': 2}
+
+
+@pytest.fixture
+def server(linear_backend):
+    server = PredictionServer(('127.0.0.1', 0), PredictionHandler)
+    server.metrics = ServiceMetrics()
+    server.batcher = MicroBatcher(linear_backend, server.metrics, max_wait=0.001)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(server, body):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=10)
+    try:
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        connection.request('POST', '/predict', data, {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def test_single_and_batch(server, linear_model):
+    status, result = post(server, STUDENT)
+    assert status == 200
+    assert result['score'] == pytest.approx(float(linear_model.predict([[20, 85, 75, 2, 3]])[0]), abs=0.01)
+    assert 'plan_status' not in result
+
+    status, results = post(server, {'records': [STUDENT, dict(STUDENT, Peer_Influence=5)]})
+    assert status == 200
+    assert len(results) == 2
+
+
+def test_plan_is_opt_in(server):
+    status, result = post(server, dict(STUDENT, plan=True))
+    assert status == 200
+    assert result['plan_status'] == 'reached'
+    assert result['expected_score'] >= result['target'] > result['score']
+
+
+@pytest.mark.parametrize('body', [
+    dict(STUDENT, Attendance='nan'),
+    dict(STUDENT, Hours_Studied='inf'),
+    dict(STUDENT, Peer_Influence='-inf'),
+    {'Hours_Studied': 20},
+    {'records': []},
+    [1, 2],
+    b'{not json',
+    b'{"Hours_Studied": NaN, "Attendance": 85, "Previous_Scores": 75, "Tutoring_Sessions": 2}',
+])
+def test_bad_requests_are_rejected(server, body):
+    status, result = post(server, body)
+    assert status == 400
+    assert 'error' in result
+    assert server.metrics.snapshot()['errors'] == 1
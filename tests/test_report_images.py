@@ -0,0 +1,53 @@
+import io
+import zipfile
+
+import pytest
+
+from report_images import ImageArchive
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def png_bytes(color, size=(64, 48)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def write_archive(path, members):
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    path = tmp_path / 'images.zip'
+    write_archive(path, {'b_chart.png': png_bytes('red'), 'plots/a_chart.png': png_bytes('blue'),
+                         'notes.txt': b'not an image'})
+    return ImageArchive(path, tmp_path / 'thumbs', thumbnail_size=16)
+
+
+def test_index_is_built_without_reading_members(archive, monkeypatch):
+    monkeypatch.setattr(zipfile.ZipFile, 'read', lambda *args, **kwargs: pytest.fail('member decompressed'))
+    images = archive.images()
+    assert [image.name for image in images] == ['a_chart.png', 'b_chart.png']
+    assert images[0].caption == 'a chart'
+    assert images[0].key != images[1].key
+
+
+def test_thumbnail_is_cached_and_keyed_on_content(archive, tmp_path):
+    image = archive.images()[1]
+    data = archive.thumbnail(image)
+    with Image.open(io.BytesIO(data)) as thumb:
+        assert thumb.format == 'WEBP'
+        assert max(thumb.size) <= 16
+    assert archive.thumbnail_path(image).read_bytes() == data
+
+    # محتوى جديد بالاسم نفسه يغيّر CRC فيُولّد صورة مصغّرة جديدة
+    write_archive(archive.path, {'b_chart.png': png_bytes('green', (80, 40))})
+    replaced = archive.images()[0]
+    assert replaced.key != image.key
+    assert archive.thumbnail_path(replaced) != archive.thumbnail_path(image)
+    with Image.open(io.BytesIO(archive.thumbnail(replaced))) as thumb:
+        assert thumb.getpixel((0, 0))[:3] == pytest.approx((0, 128, 0), abs=8)
@@ -0,0 +1,54 @@
+import io
+import json
+
+import pytest
+
+from score_cli import batched, parse_json_record, read_jsonl, score_batches
+from scoring import REQUIRED_COLUMNS
+
+
+VALID = {'Hours_Studied': 5, 'Attendance': 60, 'Previous_Scores': 55, 'Tutoring_Sessions': 0}
+
+
+def score_lines(lines, backend, **kwargs):
+    records = read_jsonl(io.StringIO('\n'.join(lines) + '\n'))
+    return list(score_batches(batched(records, 2), backend, parse=parse_json_record, **kwargs))
+
+
+def test_malformed_lines_become_error_records(linear_backend):
+    lines = [json.dumps(VALID), '{bad', '[1, 2]', '"text"', json.dumps({**VALID, 'Hours_Studied': 7})]
+    results = score_lines(lines, linear_backend)
+
+    assert len(results) == len(lines)
+    assert [('error' in record) for record in results] == [False, True, True, True, False]
+    assert results[1]['input'] == '{bad'
+    assert 'list' in results[2]['error']
+    assert results[4]['score'] > results[0]['score']
+
+
+def test_invalid_values_keep_the_record(linear_backend):
+    results = score_lines([json.dumps({**VALID, 'Hours_Studied': [1]}), json.dumps({'Attendance': 60})],
+                          linear_backend)
+    assert results[0]['Hours_Studied'] == [1] and 'error' in results[0]
+    assert all(col in results[1]['error'] for col in REQUIRED_COLUMNS if col != 'Attendance')
+
+
+def test_non_finite_values_are_errors(linear_backend):
+    results = score_lines([json.dumps({**VALID, 'Attendance': 'nan'}), json.dumps({**VALID, 'Peer_Influence': 'inf'})],
+                          linear_backend)
+    assert 'Attendance' in results[0]['error'] and 'score' not in results[0]
+    assert 'Peer_Influence' in results[1]['error']
+
+
+def test_plans_are_opt_in(linear_backend):
+    plain, = score_lines([json.dumps(VALID)], linear_backend)
+    planned, = score_lines([json.dumps(VALID)], linear_backend, plan=True)
+    assert 'plan_status' not in plain
+    assert planned['plan_status'] == 'reached'
+    assert planned['expected_score'] >= planned['target'] > planned['score']
+
+
+@pytest.mark.parametrize('line', ['{"a": 1', 'null', '3'])
+def test_parse_json_record_rejects_non_objects(line):
+    with pytest.raises(ValueError):
+        parse_json_record(line)
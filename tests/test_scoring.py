@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scoring import build_feature_matrix, record_features, score_frame
+
+
+def test_build_feature_matrix_masks_non_finite_rows():
+    df = pd.DataFrame({
+        'Hours_Studied': [20, 'inf', 20, 20, 20],
+        'Attendance': [85, 85, 'nan', 85, 85],
+        'Previous_Scores': [75, 75, 75, '-inf', 75],
+        'Tutoring_Sessions': [2, 2, 2, 2, 2],
+        'Peer_Influence': [None, 4, 4, 4, np.inf],
+    })
+    X = build_feature_matrix(df, default_peer=3)
+    assert X[0].tolist() == [20, 85, 75, 2, 3]
+    assert np.isnan(X[1:]).any(axis=1).all()
+
+
+def test_score_frame_leaves_invalid_rows_unscored(linear_model):
+    df = pd.DataFrame({'Hours_Studied': [20, 'inf'], 'Attendance': [85, 85],
+                       'Previous_Scores': [75, 75], 'Tutoring_Sessions': [2, 2]})
+    scored = score_frame(linear_model, df, default_peer=3)
+    assert scored['Predicted_Score'].notna().tolist() == [True, False]
+    assert scored['Grade'].iloc[1] != 'ممتاز'
+
+
+@pytest.mark.parametrize('value', ['nan', 'inf', float('-inf')])
+def test_record_features_rejects_non_finite(value):
+    with pytest.raises(ValueError):
+        record_features({'Hours_Studied': value, 'Attendance': 85, 'Previous_Scores': 75, 'Tutoring_Sessions': 2})
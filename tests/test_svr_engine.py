@@ -0,0 +1,76 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.svm import SVR
+
+from scoring import FEATURE_COLUMNS
+from svr_engine import DEFAULT_TOLERANCE, SVREngine, load_bundle_engine
+
+
+@pytest.fixture(scope='module')
+def svr():
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.integers(0, 41, 300), rng.integers(60, 101, 300), rng.uniform(50, 100, 300),
+                         rng.integers(0, 9, 300), rng.integers(1, 6, 300)])
+    y = 40 + 0.3 * X[:, 0] + 0.2 * X[:, 1] + 0.05 * X[:, 2] + 0.5 * X[:, 3] + rng.normal(0, 1, 300)
+    return SVR(C=10.0, epsilon=0.5).fit(X, y)
+
+
+@pytest.fixture(scope='module')
+def points():
+    rng = np.random.default_rng(1)
+    return np.column_stack([rng.uniform(0, 40, 1000), rng.uniform(0, 100, 1000), rng.uniform(0, 100, 1000),
+                            rng.uniform(0, 10, 1000), rng.uniform(1, 5, 1000)])
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_matches_sklearn(svr, points, dtype):
+    engine = SVREngine.from_sklearn(svr, dtype=dtype)
+    expected = svr.predict(points)
+    # كتل صغيرة حتى تمر الصفوف عبر أكثر من كتلة
+    np.testing.assert_allclose(engine.predict(points, block_rows=128), expected, atol=DEFAULT_TOLERANCE[dtype])
+    assert engine.check_against(svr, points) <= DEFAULT_TOLERANCE[dtype]
+    assert engine.predict(points[0]).shape == (1,)
+
+
+def test_pruning_error_is_bounded_by_dropped_coefficients(svr, points):
+    alpha = np.abs(svr.dual_coef_.ravel())
+    prune_tol = np.quantile(alpha, 0.3)
+    engine = SVREngine.from_sklearn(svr, prune_tol=prune_tol)
+
+    dropped = alpha[alpha <= prune_tol]
+    assert engine.n_pruned == len(dropped) > 0
+    assert engine.n_support == len(alpha) - len(dropped)
+    # قيمة النواة لا تتجاوز 1، فالخطأ لا يتجاوز مجموع المعاملات المحذوفة
+    error = np.abs(engine.predict(points) - svr.predict(points))
+    assert error.max() <= dropped.sum() + 1e-9
+
+
+def test_check_against_raises_outside_tolerance(svr, points):
+    engine = SVREngine.from_sklearn(svr, prune_tol=np.quantile(np.abs(svr.dual_coef_), 0.5))
+    with pytest.raises(ValueError):
+        engine.check_against(svr, points, atol=1e-9)
+
+
+def test_state_round_trip(svr, points):
+    engine = SVREngine.from_sklearn(svr, dtype=np.float32)
+    restored = SVREngine.from_state(engine.state())
+    assert restored.dtype is np.float32
+    np.testing.assert_array_equal(restored.predict(points), engine.predict(points))
+
+
+def test_load_bundle_engine(svr, points, tmp_path):
+    path = tmp_path / 'bundle.pkl'
+    joblib.dump({'model': svr, 'X_columns': list(FEATURE_COLUMNS)}, path)
+    engine = load_bundle_engine(path, dtype=np.float32)
+    assert engine.feature_names == list(FEATURE_COLUMNS)
+    np.testing.assert_allclose(engine.predict(points), svr.predict(points), atol=DEFAULT_TOLERANCE[np.float32])
+
+    with pytest.raises(ValueError):
+        load_bundle_engine(path, prune_tol=np.inf)
+
+
+def test_rejects_non_rbf_kernel(svr):
+    X = svr.support_vectors_
+    with pytest.raises(ValueError):
+        SVREngine.from_sklearn(SVR(kernel='linear').fit(X, X[:, 0]))
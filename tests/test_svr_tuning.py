@@ -0,0 +1,32 @@
+import numpy as np
+
+from svr_tuning import candidate_grid, r2_score, select_candidate, tune_svr
+
+
+def test_parallel_pairs_match_serial(tmp_path, training_data):
+    X, y = training_data
+    X, y = X[:150], y[:150]
+    candidates = candidate_grid(X, gamma_factors=(0.3, 1.0), c_values=(10.0,), epsilon_values=(0.5, 1.0))
+    progress = []
+    serial = tune_svr(X, y, candidates, n_folds=3, workers=1, root=tmp_path, progress=progress.append)
+    parallel = tune_svr(X, y, candidates, n_folds=3, workers=2, root=tmp_path)
+
+    # مهمة لكل زوج (طية، gamma)
+    assert len(progress) == 3 * 2 and progress[-1] == 1
+    assert len(serial) == len(candidates)
+    key = lambda row: (row['gamma'], row['epsilon'])
+    for a, b in zip(sorted(serial, key=key), sorted(parallel, key=key)):
+        assert a['mae'] == b['mae'] and a['n_support'] == b['n_support']
+    assert select_candidate(serial)['frontier']
+
+
+def test_r2_without_variance():
+    assert np.isnan(r2_score(np.full(5, 70.0), np.ones(5)))
+    assert r2_score(np.array([1.0, 3.0]), np.zeros(2)) == 1.0
+
+
+def test_constant_fold_r2_is_skipped(tmp_path, training_data):
+    X, _ = training_data
+    results = tune_svr(X[:60], np.full(60, 70.0), candidate_grid(X[:60], (1.0,), (1.0,), (0.5,)),
+                       n_folds=2, workers=1, root=tmp_path)
+    assert results[0]['r2'] is None
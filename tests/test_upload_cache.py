@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from upload_cache import UploadCache, bytes_digest, estimate_nbytes
+
+
+def block(kb):
+    return np.zeros(kb * 128)  # kb كيلوبايت من float64
+
+
+def test_lru_eviction_within_byte_budget():
+    cache = UploadCache(max_bytes=3 * 1024)
+    computed = []
+
+    def compute(name, kb=1):
+        return lambda: computed.append(name) or block(kb)
+
+    for name in 'abc':
+        cache.get(name, 'profile', compute(name))
+    # الاستخدام يجعل a الأحدث، فيُخرج b (الأقدم استخداماً) عند إضافة d
+    cache.get('a', 'profile', compute('a'))
+    cache.get('d', 'profile', compute('d'))
+    assert computed == ['a', 'b', 'c', 'd']
+    assert cache.peek('b', 'profile') is None
+    assert all(cache.peek(name, 'profile') is not None for name in 'acd')
+
+    stats = cache.stats()
+    assert stats['current_bytes'] == 3 * 1024 <= stats['max_bytes']
+    assert stats['entries'] == 3
+    assert stats['evictions'] == 1
+    assert (stats['hits'], stats['misses']) == (4, 4)
+    assert stats['hit_rate'] == 0.5
+
+    # نتيجة كبيرة تُخرج عدة نتائج دفعة واحدة
+    cache.get('e', 'profile', compute('e', kb=2))
+    assert cache.stats()['current_bytes'] == 3 * 1024
+    assert [name for name in 'acde' if cache.peek(name, 'profile') is not None] == ['d', 'e']
+
+
+def test_result_larger_than_budget_is_not_stored():
+    cache = UploadCache(max_bytes=1024)
+    cache.get('small', 'profile', lambda: block(1))
+    value = cache.get('huge', 'profile', lambda: block(4))
+    assert len(value) == 512
+    assert cache.peek('huge', 'profile') is None
+    assert cache.peek('small', 'profile') is not None
+    assert cache.stats()['current_bytes'] == 1024
+
+
+def test_kinds_are_separate_and_invalidate_by_digest():
+    cache = UploadCache(max_bytes=1 << 20)
+    digest = bytes_digest(b'hours,score\n1,2\n')
+    assert digest == bytes_digest(b'hours,score\n1,2\n') != bytes_digest(b'hours,score\n1,3\n')
+
+    cache.get(digest, 'frame', lambda: block(1))
+    cache.get(digest, 'describe', lambda: block(2))
+    cache.get('other', 'frame', lambda: block(1))
+    assert cache.stats()['current_bytes'] == 4 * 1024
+
+    cache.invalidate(digest)
+    assert cache.peek(digest, 'frame') is None and cache.peek(digest, 'describe') is None
+    assert cache.stats()['current_bytes'] == 1024
+    cache.invalidate()
+    assert cache.stats()['entries'] == cache.stats()['current_bytes'] == 0
+
+
+def test_estimate_nbytes_counts_string_columns():
+    df = pd.DataFrame({'x': np.arange(100), 'name': ['طالب'] * 100})
+    assert estimate_nbytes(df) == df.memory_usage(deep=True).sum()
+    assert estimate_nbytes(df['x']) == df['x'].memory_usage(deep=True)
+    assert estimate_nbytes(block(2)) == 2048
+    assert estimate_nbytes(object()) == 1024
+
+
+def test_failed_compute_is_not_cached():
+    cache = UploadCache(max_bytes=1 << 20)
+
+    def fail():
+        raise ValueError('bad csv')
+
+    with pytest.raises(ValueError):
+        cache.get('bad', 'frame', fail)
+    assert cache.peek('bad', 'frame') is None
+    assert cache.get('bad', 'frame', lambda: block(1)) is not None
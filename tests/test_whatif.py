@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.svm import SVR
+
+import whatif
+from model_backends import BACKENDS
+from model_training import publish_estimator
+from scoring import FEATURE_COLUMNS, clip_scores
+
+STUDENT = (12, 85, 70.5, 3)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    whatif._cached_curves.cache_clear()
+    yield
+    whatif._cached_curves.cache_clear()
+
+
+@pytest.mark.parametrize('key', ['linear', 'svr'])
+def test_curves_match_pointwise_predictions(registry, training_data, key):
+    X, y = training_data
+    model = LinearRegression().fit(X, y) if key == 'linear' else SVR(C=10.0).fit(X, y)
+    publish_estimator(key, model if key == 'linear' else {'model': model, 'X_columns': list(FEATURE_COLUMNS)})
+    backend = BACKENDS[key]
+
+    curves = whatif.sensitivity_curves(backend, *STUDENT)
+    assert set(curves) == set(whatif.CURVE_COLUMNS)
+    base = np.array([*STUDENT, backend.default_peer], dtype=float)
+    for name, (values, scores) in curves.items():
+        X_curve = np.tile(base, (len(values), 1))
+        X_curve[:, whatif.CURVE_COLUMNS[name]] = values
+        np.testing.assert_allclose(scores, clip_scores(model.predict(X_curve)), atol=1e-6)
+        assert not scores.flags.writeable and not values.flags.writeable
+    # المنحنى يمر بالطالب الحالي نفسه
+    hours, scores = curves['hours']
+    assert scores[int(STUDENT[0])] == pytest.approx(clip_scores(model.predict(base[None]))[0], abs=1e-6)
+
+
+def test_new_model_version_invalidates_curves(registry, training_data):
+    X, y = training_data
+    publish_estimator('linear', LinearRegression().fit(X, y))
+    backend = BACKENDS['linear']
+
+    first = whatif.sensitivity_curves(backend, *STUDENT)
+    assert whatif.sensitivity_curves(backend, *STUDENT) is first
+    assert whatif.cache_info().hits == 1
+
+    # نموذج جديد بنفس المدخلات: بصمة مختلفة فمنحنيات جديدة دون مسح الذاكرة يدوياً
+    publish_estimator('linear', LinearRegression().fit(X, y + 5))
+    second = whatif.sensitivity_curves(backend, *STUDENT)
+    assert second is not first
+    np.testing.assert_allclose(second['hours'][1], np.minimum(first['hours'][1] + 5, 100), atol=0.011)
+
+    # الرجوع إلى الإصدار السابق يعيد منحنياته المخزّنة
+    registry.rollback('linear')
+    assert whatif.sensitivity_curves(backend, *STUDENT) is first
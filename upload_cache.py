@@ -0,0 +1,147 @@
+"""
+🗃️ ذاكرة الملفات المرفوعة على مستوى العملية
+نتائج تحليل الملف (الملف المحلَّل والإحصائيات المشتقة منه) تُخزّن ببصمة محتواه،
+فلا تُعاد قراءته عند كل تفاعل مع الصفحة. الحجم الكلي محدود بميزانية ذاكرة
+مع إخراج الأقل استخداماً (LRU) عند تجاوزها.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+# ============================================================================
+# 1. تقدير الحجم
+# ============================================================================
+def estimate_nbytes(value):
+    """حجم تقريبي بالبايت لنتيجة مخزّنة (DataFrame أو Series أو مصفوفة أو كائن بخاصية nbytes)"""
+    memory_usage = getattr(value, 'memory_usage', None)
+    if callable(memory_usage):
+        usage = memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, 'sum') else usage)
+    nbytes = getattr(value, 'nbytes', None)
+    if nbytes is not None:
+        return int(nbytes)
+    return 1024
+
+
+def bytes_digest(data):
+    """بصمة SHA-256 لمحتوى الملف المرفوع"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class _CachedResult:
+    __slots__ = ('value', 'nbytes', 'compute_seconds')
+
+    def __init__(self, value, nbytes, compute_seconds):
+        self.value = value
+        self.nbytes = nbytes
+        self.compute_seconds = compute_seconds
+
+
+# ============================================================================
+# 2. الذاكرة
+# ============================================================================
+class UploadCache:
+    """
+    ذاكرة آمنة للخيوط مفتاحها (بصمة الملف، نوع النتيجة).
+    الحساب يتم خارج القفل حتى لا يوقف تحليل ملف كبير بقية الجلسات.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_compute_seconds = 0.0
+
+    def get(self, digest, kind, compute, sizeof=estimate_nbytes):
+        """النتيجة المخزّنة للمفتاح (digest, kind)، أو حسابها بـ compute() وتخزينها"""
+        key = (digest, kind)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+            self.misses += 1
+
+        start = time.perf_counter()
+        value = compute()
+        compute_seconds = time.perf_counter() - start
+        nbytes = sizeof(value)
+
+        with self._lock:
+            self.total_compute_seconds += compute_seconds
+            # نتيجة أكبر من الميزانية كلها تُرجع دون تخزين
+            if nbytes > self.max_bytes:
+                return value
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous.nbytes
+            self._entries[key] = _CachedResult(value, nbytes, compute_seconds)
+            self.current_bytes += nbytes
+            self._evict()
+        return value
+
+    def peek(self, digest, kind):
+        """النتيجة المخزّنة أو None دون حساب (للتحقق قبل توزيع العمل على العمليات)"""
+        with self._lock:
+            entry = self._entries.get((digest, kind))
+            if entry is None:
+                return None
+            self._entries.move_to_end((digest, kind))
+            self.hits += 1
+            return entry.value
+
+    def _evict(self):
+        """إخراج النتائج الأقل استخداماً حتى يعود الحجم ضمن الميزانية"""
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self.current_bytes -= entry.nbytes
+            self.evictions += 1
+
+    def invalidate(self, digest=None):
+        """حذف نتائج ملف محدد أو جميع النتائج"""
+        with self._lock:
+            for key in [key for key in self._entries if digest is None or key[0] == digest]:
+                self.current_bytes -= self._entries.pop(key).nbytes
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'current_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'total_compute_seconds': self.total_compute_seconds,
+            }
+
+
+# ============================================================================
+# 3. النسخة المشتركة للعملية
+# ============================================================================
+# ميزانية الذاكرة بالميغابايت (قابلة للتعديل عبر متغير البيئة)
+UPLOAD_CACHE_MAX_MB = int(os.environ.get('UPLOAD_CACHE_MAX_MB', 256))
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_upload_cache():
+    """إرجاع ذاكرة الملفات المرفوعة المشتركة بين جميع جلسات العملية"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                _shared_cache = UploadCache(max_bytes=UPLOAD_CACHE_MAX_MB * 1024 * 1024)
+    return _shared_cache
@@ -0,0 +1,86 @@
+"""
+🔍 منحنيات "ماذا لو؟" حول الطالب الحالي
+تغيير خاصية واحدة على مداها الكامل مع تثبيت البقية (اعتماد جزئي)، لكل من ساعات الدراسة
+والحضور والدروس الخصوصية وتأثير الأقران. نقاط كل المنحنيات تُجمع في مصفوفة واحدة
+وتُحسب باستدعاء predict واحد، والنتيجة مخزّنة حسب النموذج والمدخلات.
+"""
+
+import functools
+
+import numpy as np
+
+from model_backends import BACKENDS
+from prediction_lattice import ATTENDANCE_MAX, HOURS_MAX, TUTORING_MAX
+from scoring import clip_scores
+
+
+CACHE_SIZE = 512
+
+# الخاصية ← رقم عمودها في مصفوفة الميزات
+CURVE_COLUMNS = {
+    'hours': 0,
+    'attendance': 1,
+    'tutoring': 3,
+    'peer': 4,
+}
+
+
+# ============================================================================
+# 1. شبكة النقاط
+# ============================================================================
+@functools.lru_cache(maxsize=None)
+def curve_grid(key):
+    """قيم كل خاصية على مداها (تأثير الأقران بمقياس النموذج)"""
+    from model_training import PEER_CODES
+
+    codes = PEER_CODES[key].values()
+    grid = {
+        'hours': np.arange(HOURS_MAX + 1, dtype=float),
+        'attendance': np.arange(ATTENDANCE_MAX + 1, dtype=float),
+        'tutoring': np.arange(TUTORING_MAX + 1, dtype=float),
+        'peer': np.arange(min(codes), max(codes) + 1, dtype=float),
+    }
+    for values in grid.values():
+        values.setflags(write=False)
+    return grid
+
+
+def curve_matrix(key, hours, attendance, prev_scores, tutoring):
+    """مصفوفة واحدة لكل نقاط المنحنيات مع موضع كل منحنى فيها"""
+    grid = curve_grid(key)
+    base = np.array([hours, attendance, prev_scores, tutoring, BACKENDS[key].default_peer], dtype=float)
+    X = np.tile(base, (sum(len(values) for values in grid.values()), 1))
+
+    slices, start = {}, 0
+    for name, values in grid.items():
+        stop = start + len(values)
+        X[start:stop, CURVE_COLUMNS[name]] = values
+        slices[name] = slice(start, stop)
+        start = stop
+    return X, slices
+
+
+# ============================================================================
+# 2. المنحنيات
+# ============================================================================
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _cached_curves(key, fingerprint, hours, attendance, prev_scores, tutoring):
+    # بصمة ملف النموذج جزء من المفتاح: إصدار جديد يعني منحنيات جديدة
+    X, slices = curve_matrix(key, hours, attendance, prev_scores, tutoring)
+    scores = clip_scores(BACKENDS[key].load().predict(X))
+    scores.setflags(write=False)
+    grid = curve_grid(key)
+    return {name: (grid[name], scores[part]) for name, part in slices.items()}
+
+
+def sensitivity_curves(backend, hours, attendance, prev_scores, tutoring):
+    """
+    {'hours' | 'attendance' | 'tutoring' | 'peer': (القيم، الدرجات المتوقعة)}
+    المصفوفات للقراءة فقط لأنها مشتركة بين الجلسات.
+    """
+    return _cached_curves(backend.key, backend.fingerprint(), float(hours), float(attendance),
+                          float(prev_scores), float(tutoring))
+
+
+def cache_info():
+    return _cached_curves.cache_info()